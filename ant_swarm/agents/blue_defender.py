@@ -1,72 +1,89 @@
 import os
-import glob
 import random
-import math
 import logging
-import json
 from ant_swarm.core.ooda import OODALoop
 from ant_swarm.core.hive import SignalBus
+from ant_swarm.memory.checkpoint import load_table
 from ant_swarm.tools.blue_tools import ProcessAuditor, BeaconHunter, ArtifactScanner
 from ant_swarm.tools.threat_intel import ThreatIntel
+from ant_swarm.tools.artifact_watcher import ArtifactWatcher
+from ant_swarm.tools.entropy import scorer as entropy_scorer
 
 logger = logging.getLogger("BlueDefender")
 WATCH_DIR = "/tmp"
 Q_TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../", "blue_q_table.json")
+Q_CHECKPOINT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../", "blue_q_table.qck")
+SAVE_INTERVAL = 10  # learning steps between checkpoint deltas
+ACTIONS = [
+    "SIGNATURE_SCAN", "HEURISTIC_SCAN", "OBSERVE", "IGNORE",
+    "WIFI_DEFENSE", "WEB_WAF", "NET_IDS", "NETWORK_HUNT"
+]
 
 class BlueDefender(OODALoop):
-    def __init__(self):
-        super().__init__("BlueDefender", cycle_time=1.0)
-        self.actions = [
-            "SIGNATURE_SCAN", "HEURISTIC_SCAN", "OBSERVE", "IGNORE",
-            "WIFI_DEFENSE", "WEB_WAF", "NET_IDS", "NETWORK_HUNT"
-        ]
+    def __init__(self, watch_dir=WATCH_DIR, name="BlueDefender", memory=None,
+                 checkpoint_path=Q_CHECKPOINT_FILE, json_path=Q_TABLE_FILE):
+        # memory: a SharedQTable when several BlueDefenders learn into one table
+        super().__init__(name, cycle_time=1.0)
+        self.memory = memory
+        self.checkpoint_path = checkpoint_path
+        self.json_path = json_path
+        self.watch_dir = watch_dir
+        self.actions = list(ACTIONS)
         self.q_table = self._load_memory()
         self.alpha = 0.4
         self.epsilon = 0.3
+        self.autosave = True
+        self.learn_steps = 0
 
         # Tools
         self.auditor = ProcessAuditor()
         self.hunter = BeaconHunter()
-        self.scanner = ArtifactScanner()
+        self.scanner = ArtifactScanner(watch_dir)
         self.ti = ThreatIntel() # For validating IPs
+        self.watcher = ArtifactWatcher(watch_dir, on_new=self.wake)
 
         # Subscribe to relevant events
         self.bus.subscribe("THREAT_DETECTED", self.handle_threat_alert)
 
+    def start(self):
+        super().start()
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.close()
+        super().stop()
+
     def handle_threat_alert(self, data):
         logger.info(f"Received Threat Alert: {data}")
 
     def observe(self):
-        visible_threats = glob.glob(os.path.join(WATCH_DIR, 'malware_*'))
-        hidden_threats = glob.glob(os.path.join(WATCH_DIR, '.sys_*'))
+        threats = self.watcher.snapshot()
         state = self.hive.get_state()
         return {
-            "threats": visible_threats + hidden_threats,
+            "threats": threats,
             "defcon": state["defcon"],
             "alert_level": state["blue_level"]
         }
 
     def orient(self, obs):
-        threat_count = len(obs["threats"])
-        web_threats = [t for t in obs["threats"] if t.endswith('.php')]
-        wifi_threats = [t for t in obs["threats"] if 'handshake' in t]
+        threats = obs["threats"]
+        threat_count = len(threats.all)
 
+        state_key = f"{obs['alert_level']}_{threat_count}"
         return {
-            "state_key": f"{obs['alert_level']}_{threat_count}",
+            "state_key": state_key,
+            "state_id": self.q_table.state_id(state_key),
             "threat_count": threat_count,
-            "web_threats": web_threats,
-            "wifi_threats": wifi_threats,
-            "all_threats": obs["threats"]
+            "web_threats": threats.web,
+            "wifi_threats": threats.wifi,
+            "all_threats": threats.all
         }
 
     def decide(self, orientation):
-        state_key = orientation["state_key"]
-
         if random.random() < self.epsilon:
             action = random.choice(self.actions)
         else:
-            known = {a: self.q_table.get(f"{state_key}_{a}", 0) for a in self.actions}
-            action = max(known, key=known.get) if known else random.choice(self.actions)
+            action = self.actions[self.q_table.argmax(orientation["state_id"])]
 
         return action, orientation
 
@@ -111,8 +128,10 @@ class BlueDefender(OODALoop):
                  logger.info(f"ProcessAuditor found suspicious procs: {suspicious}")
                  mitigated += len(suspicious)
 
+             # Hidden artifacts are removed on sight; score the rest in one batch.
+             scores = entropy_scorer.score_many(t for t in orientation["all_threats"] if ".sys" not in t)
              for t in orientation["all_threats"]:
-                if ".sys" in t or self._calculate_entropy(t) > 3.5:
+                if ".sys" in t or scores[t] > 3.5:
                     try: os.remove(t); mitigated += 1
                     except: pass
 
@@ -124,40 +143,34 @@ class BlueDefender(OODALoop):
         reward = mitigated * 10
         if action == "IGNORE" and orientation["threat_count"] > 0: reward -= 10
 
-        self._learn(orientation["state_key"], action, reward)
+        self._learn(orientation["state_id"], action, reward)
 
         if mitigated > 0:
             self.bus.publish("THREAT_MITIGATED", {"count": mitigated, "action": action})
             logger.info(f"Action: {action} | Mitigated: {mitigated}")
 
-    def _learn(self, state, action, reward):
-        old = self.q_table.get(f"{state}_{action}", 0)
-        self.q_table[f"{state}_{action}"] = old + self.alpha * (reward - old)
+    def _learn(self, state_id, action, reward):
+        self.q_table.update(state_id, self.q_table.action_index[action], reward, self.alpha)
 
-        if random.random() < 0.1:
+        self.learn_steps += 1
+        if self.autosave and self.learn_steps % SAVE_INTERVAL == 0:
             self._save_memory()
 
     def _load_memory(self):
-        if os.path.exists(Q_TABLE_FILE):
-            try:
-                with open(Q_TABLE_FILE, 'r') as f: return json.load(f)
-            except: return {}
-        return {}
+        if self.memory is not None:
+            self.checkpoint = self.memory.checkpoint
+            return self.memory.table
+        table, self.checkpoint = load_table(self.checkpoint_path, self.json_path, self.actions)
+        return table
 
     def _save_memory(self):
-        try:
-            with open(Q_TABLE_FILE, 'w') as f: json.dump(self.q_table, f, indent=4)
+        if self.memory is not None:
+            # The shared table saves one snapshot at a time; skip if another agent is mid-save.
+            try: self.memory.save(blocking=False)
+            except: pass
+            return
+        try: self.checkpoint.save(self.q_table)
         except: pass
 
     def _calculate_entropy(self, filepath):
-        try:
-            with open(filepath, 'rb') as f:
-                data = f.read()
-                if not data: return 0
-                entropy = 0
-                for x in range(256):
-                    p_x = float(data.count(x.to_bytes(1, 'little'))) / len(data)
-                    if p_x > 0:
-                        entropy += - p_x * math.log(p_x, 2)
-                return entropy
-        except: return 0
+        return entropy_scorer.score(filepath)
@@ -1,10 +1,97 @@
+import os
 import threading
 import json
 import time
+import queue
 import logging
+import collections
+from types import MappingProxyType
 
 logger = logging.getLogger("HiveMind")
 
+# Per-subscriber queue bound and how many events a worker delivers to one
+# subscriber before yielding to others.
+SUBSCRIBER_QUEUE_SIZE = 1000
+DELIVERY_BATCH = 32
+
+class _Subscription:
+    __slots__ = ("event_type", "callback", "pending", "scheduled", "lock")
+
+    def __init__(self, event_type, callback):
+        self.event_type = event_type
+        self.callback = callback
+        self.pending = collections.deque()
+        self.scheduled = False
+        self.lock = threading.Lock()
+
+class _TopicStats:
+    __slots__ = ("published", "delivered", "dropped", "errors", "latency_total", "latency_max", "lock")
+
+    def __init__(self):
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self.lock:
+            self.delivered += 1
+            if not ok: self.errors += 1
+            self.latency_total += latency
+            if latency > self.latency_max: self.latency_max = latency
+
+class _Dispatcher:
+    """
+    Worker pool draining per-subscriber queues. A subscription is on the
+    ready queue at most once, so each subscriber sees its events in order
+    and a slow one only ties up the worker currently serving it.
+    """
+    def __init__(self, bus, workers, queue_size):
+        self.bus = bus
+        self.queue_size = queue_size
+        self._ready = queue.SimpleQueue()
+        self._threads = [threading.Thread(target=self._work, daemon=True, name=f"SignalBus-{i}")
+                         for i in range(workers)]
+        for t in self._threads: t.start()
+
+    def submit(self, sub, data):
+        with sub.lock:
+            if len(sub.pending) >= self.queue_size:
+                return False
+            sub.pending.append((data, time.perf_counter()))
+            if sub.scheduled:
+                return True
+            sub.scheduled = True
+        self._ready.put(sub)
+        return True
+
+    def _work(self):
+        while True:
+            sub = self._ready.get()
+            if sub is None:
+                return
+            for _ in range(DELIVERY_BATCH):
+                with sub.lock:
+                    if not sub.pending:
+                        sub.scheduled = False
+                        break
+                    data, queued_at = sub.pending.popleft()
+                self.bus._deliver(sub, data, queued_at)
+            else:
+                self._ready.put(sub)  # more pending: go to the back of the line
+
+    def shutdown(self, subscriptions, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and any(s.pending or s.scheduled for s in subscriptions):
+            time.sleep(0.005)
+        for _ in self._threads:
+            self._ready.put(None)
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
 class SignalBus:
     _instance = None
     _lock = threading.Lock()
@@ -15,23 +102,106 @@ class SignalBus:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super(SignalBus, cls).__new__(cls)
+                    # topic -> tuple of subscriptions, replaced (never mutated) under _sub_lock
                     cls._instance._subscribers = {}
+                    cls._instance._sub_lock = threading.Lock()
+                    cls._instance._stats = {}
+                    cls._instance._dispatcher = None
         return cls._instance
 
     def subscribe(self, event_type, callback):
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        self._subscribers[event_type].append(callback)
+        with self._sub_lock:
+            subs = self._subscribers.get(event_type, ())
+            self._subscribers[event_type] = subs + (_Subscription(event_type, callback),)
         logger.debug(f"Subscribed to {event_type}")
 
+    def unsubscribe(self, event_type, callback):
+        with self._sub_lock:
+            subs = self._subscribers.get(event_type, ())
+            self._subscribers[event_type] = tuple(s for s in subs if s.callback != callback)
+
+    def _topic_stats(self, event_type):
+        stats = self._stats.get(event_type)
+        if stats is None:
+            with self._sub_lock:
+                stats = self._stats.setdefault(event_type, _TopicStats())
+        return stats
+
     def publish(self, event_type, data=None):
-        logger.debug(f"Publishing {event_type}: {data}")
-        if event_type in self._subscribers:
-            for callback in self._subscribers[event_type]:
-                try:
-                    callback(data)
-                except Exception as e:
-                    logger.error(f"Error in subscriber for {event_type}: {e}")
+        logger.debug("Publishing %s: %s", event_type, data)
+        subs = self._subscribers.get(event_type, ())
+        stats = self._topic_stats(event_type)
+        with stats.lock:
+            stats.published += 1
+        dispatcher = self._dispatcher
+        for sub in subs:
+            if dispatcher is None:
+                self._deliver(sub, data, time.perf_counter())
+            elif not dispatcher.submit(sub, data):
+                with stats.lock:
+                    stats.dropped += 1
+
+    def _deliver(self, sub, data, queued_at):
+        ok = True
+        try:
+            sub.callback(data)
+        except Exception as e:
+            ok = False
+            logger.error(f"Error in subscriber for {sub.event_type}: {e}")
+        self._topic_stats(sub.event_type).record(time.perf_counter() - queued_at, ok)
+
+    # --- ASYNC DISPATCH ---
+
+    def enable_async(self, workers=4, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        """Delivers events on a worker pool instead of the publisher's thread."""
+        with self._sub_lock:
+            if self._dispatcher is None:
+                self._dispatcher = _Dispatcher(self, workers, queue_size)
+
+    def disable_async(self, timeout=5.0):
+        """Returns to inline delivery after draining queued events (up to timeout)."""
+        with self._sub_lock:
+            dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher:
+            subs = [s for topic in self._subscribers.values() for s in topic]
+            dispatcher.shutdown(subs, timeout)
+
+    def stats(self):
+        """Per-topic counters: published/delivered/dropped/errors, queue depth, latency (ms)."""
+        report = {}
+        for event_type, stats in list(self._stats.items()):
+            with stats.lock:
+                delivered = stats.delivered
+                report[event_type] = {
+                    "published": stats.published,
+                    "delivered": delivered,
+                    "dropped": stats.dropped,
+                    "errors": stats.errors,
+                    "queue_depth": sum(len(s.pending) for s in self._subscribers.get(event_type, ())),
+                    "avg_latency_ms": stats.latency_total / delivered * 1000 if delivered else 0.0,
+                    "max_latency_ms": stats.latency_max * 1000,
+                }
+        return report
+
+def _default_state():
+    return {
+        "defcon": 5,
+        "mood": "NEUTRAL",
+        "active_threats": (),
+        "blue_level": 1,
+        "red_level": 1
+    }
+
+class HiveSnapshot(collections.namedtuple("HiveSnapshot", ["version", "state", "timestamp"])):
+    """
+    Immutable view of the hive at one version. `state` is a read-only
+    mapping; list values are frozen to tuples.
+    """
+    __slots__ = ()
+
+    def to_dict(self):
+        """A fresh, mutable, JSON-ready copy of `state` (tuples back to lists)."""
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in self.state.items()}
 
 class HiveState:
     _instance = None
@@ -41,31 +211,123 @@ class HiveState:
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super(HiveState, cls).__new__(cls)
-                    cls._instance.state = {
-                        "defcon": 5,
-                        "mood": "NEUTRAL",
-                        "active_threats": [],
-                        "blue_level": 1,
-                        "red_level": 1
-                    }
+                    instance = super(HiveState, cls).__new__(cls)
+                    instance._changed = threading.Condition(threading.Lock())
+                    instance._snapshot = HiveSnapshot(0, MappingProxyType(_default_state()), time.time())
+                    cls._instance = instance
         return cls._instance
 
+    def _commit(self, **changes):
+        """
+        Copy-on-write update: builds the next snapshot and swaps it in.
+        Returns False (and keeps the version) if nothing actually changed.
+        """
+        with self._changed:
+            current = self._snapshot
+            if all(current.state.get(k) == v for k, v in changes.items()):
+                return False
+            state = dict(current.state)
+            state.update(changes)
+            self._snapshot = HiveSnapshot(current.version + 1, MappingProxyType(state), time.time())
+            self._changed.notify_all()
+        return True
+
     def update_defcon(self, level):
-        with self._lock:
-            self.state["defcon"] = level
-            SignalBus().publish("DEFCON_CHANGE", level)
+        self._commit(defcon=level)
+        # Publish outside the lock so subscribers can't stall writers
+        SignalBus().publish("DEFCON_CHANGE", level)
 
     def update_mood(self, mood):
-        with self._lock:
-            self.state["mood"] = mood
-            SignalBus().publish("MOOD_CHANGE", mood)
+        self._commit(mood=mood)
+        SignalBus().publish("MOOD_CHANGE", mood)
+
+    def reset(self):
+        """Restores the initial state (used between simulated episodes)."""
+        self._commit(**_default_state())
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def snapshot(self):
+        """Current HiveSnapshot. A single attribute read, so no lock is needed."""
+        return self._snapshot
 
     def get_state(self):
-        with self._lock:
-            return self.state.copy()
+        """Copy of the current state, safe to mutate or serialize; snapshot() avoids the copy."""
+        return self._snapshot.to_dict()
+
+    def wait_for_version(self, version, timeout=None):
+        """
+        Blocks until the hive moves past `version`. Returns the newest
+        snapshot, which is still at `version` if the timeout expired.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._snapshot.version > version, timeout)
+            return self._snapshot
 
     def set_threats(self, threats):
-        with self._lock:
-            self.state["active_threats"] = threats
-            SignalBus().publish("THREAT_UPDATE", threats)
+        self._commit(active_threats=tuple(threats))
+        SignalBus().publish("THREAT_UPDATE", threats)
+
+
+class HivePersister:
+    """
+    Writes the hive to a JSON file only when its version advances. After a
+    change it waits `coalesce` seconds so a burst of updates lands in one
+    write, and never writes more often than `min_interval`.
+    """
+    def __init__(self, path, hive=None, coalesce=0.1, min_interval=0.5):
+        self.path = path
+        self.hive = hive or HiveState()
+        self.coalesce = coalesce
+        self.min_interval = min_interval
+        self.running = False
+        self.thread = None
+        self.written_version = -1
+        self.writes = 0
+        self._last_write = 0.0
+
+    def start(self):
+        if self.running: return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="HivePersister")
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stops the thread, then writes any version it had not reached yet."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+        self.flush()
+
+    def flush(self):
+        """Writes the current snapshot if it is newer than the last write."""
+        snap = self.hive.snapshot()
+        if snap.version == self.written_version:
+            return False
+        self._write(snap)
+        return True
+
+    def _write(self, snap):
+        # Readers (the API) must never see a half-written file.
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(snap.to_dict(), f)
+        os.replace(tmp, self.path)
+        self.written_version = snap.version
+        self.writes += 1
+        self._last_write = time.monotonic()
+
+    def _loop(self):
+        while self.running:
+            snap = self.hive.wait_for_version(self.written_version, timeout=0.5)
+            if snap.version == self.written_version:
+                continue
+            delay = max(self.coalesce, self._last_write + self.min_interval - time.monotonic())
+            time.sleep(delay)
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"Hive persist failed: {e}")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+OODA Metrics
+Low-overhead timing for agent loops: per-phase and per-action latency
+histograms, cycle and overrun counters, and a Prometheus text renderer.
+
+Histograms are HDR-style: nanosecond values fall into log-linear buckets
+(32 linear sub-buckets per power of two, so every recorded value is kept
+to within ~3%), recording is one bit_length and a dict increment, and
+memory is bounded by the dynamic range rather than the sample count.
+An agent never runs on two threads at once, so each agent's metrics have
+a single writer at a time and the hot path takes no lock; readers work
+from copies.
+
+The hive process mirrors a snapshot into shared memory (MetricsPublisher)
+so API workers in other processes can serve /api/metrics.
+"""
+
+import time
+import logging
+import threading
+
+from ant_swarm.core.shm_state import SharedStateWriter, SharedStateReader
+
+logger = logging.getLogger("Metrics")
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+PHASES = ("observe", "orient", "decide", "act", "cycle")
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+# Prometheus bucket bounds (seconds); counts are exact to the histogram's resolution.
+PROM_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_SHM_NAME = "ant_swarm_metrics"
+METRICS_SHM_SIZE = 512 * 1024
+PUBLISH_INTERVAL = 1.0
+
+
+def bucket_index(value):
+    """HDR bucket for a non-negative integer value."""
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return ((shift + 1) << SUB_BUCKET_BITS) + (value >> shift) - SUB_BUCKETS
+
+
+def bucket_bounds(index):
+    """(lowest, highest) value that maps to `index`."""
+    if index < SUB_BUCKETS:
+        return index, index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    top = (index & (SUB_BUCKETS - 1)) + SUB_BUCKETS
+    return top << shift, ((top + 1) << shift) - 1
+
+
+class Histogram:
+    """Latency histogram over integer nanoseconds."""
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, ns):
+        if ns < 0: ns = 0
+        i = ns if ns < SUB_BUCKETS else (
+            ((ns.bit_length() - SUB_BUCKET_BITS) << SUB_BUCKET_BITS)
+            + (ns >> (ns.bit_length() - SUB_BUCKET_BITS - 1)) - SUB_BUCKETS)
+        counts = self.counts
+        counts[i] = counts.get(i, 0) + 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max: self.max = ns
+        if self.min is None or ns < self.min: self.min = ns
+
+    def percentile(self, q):
+        """Value at quantile q (0..1): the highest value equivalent to that rank's bucket."""
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(bucket_bounds(index)[1], self.max)
+        return self.max
+
+    def count_at_or_below(self, ns):
+        """Number of recorded values whose bucket lies entirely at or below `ns`."""
+        return sum(c for i, c in self.counts.items() if bucket_bounds(i)[1] <= ns)
+
+    def to_dict(self):
+        return {"counts": sorted(self.counts.copy().items()), "count": self.count,
+                "sum": self.total, "min": self.min or 0, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        h = cls()
+        h.counts = {int(i): c for i, c in data["counts"]}
+        h.count, h.total, h.min, h.max = data["count"], data["sum"], data["min"], data["max"]
+        return h
+
+
+class AgentMetrics:
+    """
+    Phase/action histograms and cycle counters for one agent, plus the
+    scheduler's lag/jitter/skipped stats for it (it passes this object as
+    the task's stats).
+    """
+    def __init__(self, agent, cycle_time):
+        self.agent = agent
+        self.cycle_time = cycle_time
+        self.phases = {phase: Histogram() for phase in PHASES}
+        self.actions = {}
+        self.cycles = 0
+        self.overruns = 0
+        self.errors = 0
+        self.last_cycle = 0.0
+        self.lag = Histogram()
+        self.jitter = Histogram()
+        self.skipped = 0
+
+    def record_cycle(self, t0, t1, t2, t3, t4, action=None):
+        """Records one step from perf_counter_ns() stamps taken around each phase."""
+        phases = self.phases
+        phases["observe"].record(t1 - t0)
+        phases["orient"].record(t2 - t1)
+        phases["decide"].record(t3 - t2)
+        phases["act"].record(t4 - t3)
+        total = t4 - t0
+        phases["cycle"].record(total)
+        if action is not None:
+            hist = self.actions.get(action)
+            if hist is None:
+                hist = self.actions[action] = Histogram()
+            hist.record(t4 - t3)
+        self.cycles += 1
+        if total > self.cycle_time * 1e9:
+            self.overruns += 1
+        self.last_cycle = time.time()
+
+    def to_dict(self):
+        return {
+            "cycle_time": self.cycle_time,
+            "cycles": self.cycles,
+            "overruns": self.overruns,
+            "errors": self.errors,
+            "last_cycle": self.last_cycle,
+            "phases": {name: h.to_dict() for name, h in self.phases.items()},
+            "actions": {name: h.to_dict() for name, h in list(self.actions.items())},
+            "lag": self.lag.to_dict(),
+            "jitter": self.jitter.to_dict(),
+            "skipped": self.skipped,
+        }
+
+
+class MetricsRegistry:
+    """Process-wide set of AgentMetrics, keyed by agent name."""
+    def __init__(self):
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def agent(self, name, cycle_time):
+        with self._lock:
+            metrics = self._agents.get(name)
+            if metrics is None:
+                metrics = self._agents[name] = AgentMetrics(name, cycle_time)
+            metrics.cycle_time = cycle_time
+            return metrics
+
+    def snapshot(self):
+        with self._lock:
+            agents = list(self._agents.values())
+        return {"timestamp": time.time(), "agents": {m.agent: m.to_dict() for m in agents}}
+
+    def clear(self):
+        with self._lock:
+            self._agents.clear()
+
+
+registry = MetricsRegistry()
+
+
+# --- EXPOSITION ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name, hist, labels):
+    lines = []
+    for bound in PROM_BUCKETS:
+        count = hist.count_at_or_below(int(bound * 1e9))
+        lines.append(f"{name}_bucket{_labels(**labels, le=repr(bound))} {count}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {hist.total / 1e9:.9f}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+    return lines
+
+
+def _quantile_lines(name, hist, labels):
+    lines = [f"{name}{_labels(**labels, quantile=repr(q))} {hist.percentile(q) / 1e9:.9f}"
+             for q in QUANTILES]
+    lines.append(f"{name}{_labels(**labels, quantile='1.0')} {hist.max / 1e9:.9f}")
+    return lines
+
+
+def render_prometheus(snapshot):
+    """Prometheus text exposition (format 0.0.4) of a registry snapshot."""
+    agents = snapshot.get("agents", {})
+    out = []
+
+    def family(name, kind, help_text, body):
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(body)
+
+    family("ooda_cycles_total", "counter", "Completed observe/orient/decide/act cycles.",
+           [f"ooda_cycles_total{_labels(agent=a)} {m['cycles']}" for a, m in agents.items()])
+    family("ooda_cycle_overruns_total", "counter", "Cycles that took longer than the agent's cycle_time.",
+           [f"ooda_cycle_overruns_total{_labels(agent=a)} {m['overruns']}" for a, m in agents.items()])
+    family("ooda_cycle_errors_total", "counter", "Cycles aborted by an exception.",
+           [f"ooda_cycle_errors_total{_labels(agent=a)} {m.get('errors', 0)}" for a, m in agents.items()])
+    family("ooda_skipped_periods_total", "counter", "Scheduled periods skipped because the previous cycle overran.",
+           [f"ooda_skipped_periods_total{_labels(agent=a)} {m.get('skipped', 0)}" for a, m in agents.items()])
+    family("ooda_cycle_time_seconds", "gauge", "Configured cycle period.",
+           [f"ooda_cycle_time_seconds{_labels(agent=a)} {m['cycle_time']}" for a, m in agents.items()])
+    family("ooda_last_cycle_timestamp_seconds", "gauge", "Unix time the last cycle finished.",
+           [f"ooda_last_cycle_timestamp_seconds{_labels(agent=a)} {m['last_cycle']:.3f}"
+            for a, m in agents.items()])
+
+    phase_hists = [(a, p, Histogram.from_dict(h)) for a, m in agents.items() for p, h in m["phases"].items()]
+    action_hists = [(a, n, Histogram.from_dict(h)) for a, m in agents.items() for n, h in sorted(m["actions"].items())]
+
+    body = []
+    for agent, phase, hist in phase_hists:
+        body += _histogram_lines("ooda_phase_duration_seconds", hist, {"agent": agent, "phase": phase})
+    family("ooda_phase_duration_seconds", "histogram", "Time spent in each OODA phase (phase=\"cycle\" is the whole step).", body)
+
+    body = []
+    for agent, phase, hist in phase_hists:
+        body += _quantile_lines("ooda_phase_duration_quantile_seconds", hist, {"agent": agent, "phase": phase})
+    family("ooda_phase_duration_quantile_seconds", "gauge", "Phase latency quantiles since start (quantile=\"1.0\" is the max).", body)
+
+    body = []
+    for agent, action, hist in action_hists:
+        body += _histogram_lines("ooda_action_duration_seconds", hist, {"agent": agent, "action": action})
+    family("ooda_action_duration_seconds", "histogram", "Time spent in act() per chosen action.", body)
+
+    body = []
+    for agent, action, hist in action_hists:
+        body += _quantile_lines("ooda_action_duration_quantile_seconds", hist, {"agent": agent, "action": action})
+    family("ooda_action_duration_quantile_seconds", "gauge", "Action latency quantiles since start (quantile=\"1.0\" is the max).", body)
+
+    for metric, key, help_text in (
+            ("ooda_schedule_lag_seconds", "lag", "Delay between a cycle's deadline and its start."),
+            ("ooda_schedule_jitter_seconds", "jitter", "Change in lag between consecutive cycles.")):
+        body = []
+        for agent, m in agents.items():
+            if key in m:
+                body += _histogram_lines(metric, Histogram.from_dict(m[key]), {"agent": agent})
+        family(metric, "histogram", help_text, body)
+
+    family("ooda_metrics_timestamp_seconds", "gauge", "When this snapshot was taken.",
+           [f"ooda_metrics_timestamp_seconds {snapshot.get('timestamp', 0):.3f}"])
+    return "\n".join(out) + "\n"
+
+
+# --- CROSS-PROCESS ---
+
+class MetricsPublisher:
+    """Copies the registry into a shared segment every `interval` seconds."""
+    def __init__(self, metrics=None, name=METRICS_SHM_NAME, size=METRICS_SHM_SIZE, interval=PUBLISH_INTERVAL):
+        self.registry = metrics or registry
+        self.writer = SharedStateWriter(name, size)
+        self.interval = interval
+        self._stop = threading.Event()
+        self.thread = None
+
+    def publish(self):
+        return self.writer.publish(self.registry.snapshot())
+
+    def start(self):
+        if self.thread: return
+        self._stop.clear()
+        self.publish()
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="MetricsPublisher")
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.writer.close()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Metrics publish failed: {e}")
+
+
+class MetricsReader:
+    """Latest published snapshot, or this process's own registry if no hive is publishing."""
+    def __init__(self, name=METRICS_SHM_NAME, fallback=None):
+        self.reader = SharedStateReader(name)
+        self.fallback = fallback or registry
+
+    def snapshot(self):
+        shared = self.reader.read()
+        return shared if shared is not None else self.fallback.snapshot()
+
+    def render(self):
+        return render_prometheus(self.snapshot())
@@ -1,6 +1,9 @@
 import time
-import threading
 from ant_swarm.core.hive import SignalBus, HiveState
+from ant_swarm.core.metrics import registry as metrics_registry
+from ant_swarm.core.scheduler import get_scheduler
+
+_now_ns = time.perf_counter_ns
 
 class OODALoop:
     """
@@ -12,23 +15,66 @@ class OODALoop:
         self.bus = SignalBus()
         self.hive = HiveState()
         self.running = False
-        self.thread = None
+        # Scheduler that drives start(); None means the process-wide one.
+        self.scheduler = None
+        self.task = None
+        # Swappable time source so a virtual clock can drive the agent.
+        self.clock = time.time
+        # Per-phase timings; set to None to turn instrumentation off.
+        self.metrics = metrics_registry.agent(agent_name, cycle_time)
 
     def start(self):
+        """Steps the agent every cycle_time on the scheduler (first cycle immediately)."""
+        if self.task is not None: return
         self.running = True
-        self.thread = threading.Thread(target=self._loop, daemon=True)
-        self.thread.start()
+        scheduler = self.scheduler or get_scheduler()
+        self.task = scheduler.add(self._tick, self.cycle_time, name=self.agent_name, stats=self.metrics)
 
     def stop(self):
         self.running = False
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def wake(self):
+        """Starts the next cycle now instead of at its deadline."""
+        task = self.task
+        if task is not None:
+            task.wake()
+
+    def _tick(self):
+        if self.running:
+            self.step()
 
-    def _loop(self):
-        while self.running:
+    def step(self):
+        """Runs one full observe/orient/decide/act cycle."""
+        metrics = self.metrics
+        if metrics is None:
+            decision = self.decide(self.orient(self.observe()))
+            self.act(decision)
+            return decision
+
+        t0 = _now_ns()
+        try:
             observations = self.observe()
+            t1 = _now_ns()
             orientation = self.orient(observations)
+            t2 = _now_ns()
             decision = self.decide(orientation)
+            t3 = _now_ns()
             self.act(decision)
-            time.sleep(self.cycle_time)
+            t4 = _now_ns()
+        except Exception:
+            metrics.errors += 1
+            raise
+        metrics.record_cycle(t0, t1, t2, t3, t4, self.action_name(decision))
+        return decision
+
+    def action_name(self, decision):
+        """Label for per-action latency: the decision itself, or the first item of a tuple."""
+        if isinstance(decision, tuple) and decision:
+            decision = decision[0]
+        return decision if isinstance(decision, str) else None
 
     def observe(self):
         # Base implementation or override
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Scheduler
+One timer thread and a small worker pool drive every periodic task
+(OODA agents) instead of a sleeping thread per agent. Deadlines live in a
+heap and advance by a fixed period from the previous deadline, not from
+when the work finished, so the period holds regardless of how long a
+cycle takes. A task that overruns skips the periods it missed rather than
+running back to back to catch up. A task never runs concurrently with
+itself.
+
+Each run records its lag (start time minus deadline) and jitter (change
+in lag since the previous run) into HDR histograms.
+"""
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ant_swarm.core.metrics import Histogram
+
+logger = logging.getLogger("Scheduler")
+
+DEFAULT_WORKERS = 4
+
+
+class TaskStats:
+    """Scheduling stats for a task; AgentMetrics offers the same attributes."""
+    def __init__(self):
+        self.lag = Histogram()
+        self.jitter = Histogram()
+        self.skipped = 0
+
+
+class ScheduledTask:
+    def __init__(self, scheduler, fn, period, name, stats):
+        self.scheduler = scheduler
+        self.fn = fn
+        self.period = period
+        self.name = name
+        self.stats = stats if stats is not None else TaskStats()
+        self.deadline = None
+        self.generation = 0        # bumped to invalidate a queued heap entry
+        self.running = False
+        self.cancelled = False
+        self.wake_pending = False
+        self.runs = 0
+        self._last_lag = None
+
+    def wake(self):
+        """Runs the task as soon as possible, then keeps its period from there."""
+        self.scheduler._wake(self)
+
+    def cancel(self):
+        """Stops future runs. A run already in progress is left to finish."""
+        self.scheduler._cancel(self)
+
+
+class Scheduler:
+    def __init__(self, workers=DEFAULT_WORKERS, clock=time.monotonic):
+        self.workers = workers
+        self.clock = clock
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._tasks = set()
+        self._pool = None
+        self._thread = None
+        self._running = False
+
+    # --- LIFECYCLE ---
+
+    def start(self):
+        with self._cond:
+            if self._running: return self
+            self._running = True
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sched")
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="Scheduler")
+            self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        with self._cond:
+            if not self._running: return
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
+        self._pool.shutdown(wait=wait)
+        self._thread = self._pool = None
+
+    # --- TASKS ---
+
+    def add(self, fn, period, name=None, stats=None, delay=0.0):
+        """Calls fn() every `period` seconds, first after `delay`. Returns the ScheduledTask."""
+        task = ScheduledTask(self, fn, period, name or getattr(fn, "__name__", "task"), stats)
+        with self._cond:
+            self._tasks.add(task)
+            self._push(task, self.clock() + delay)
+        return task
+
+    def tasks(self):
+        with self._cond:
+            return list(self._tasks)
+
+    def _push(self, task, deadline):
+        # Caller holds self._cond.
+        task.deadline = deadline
+        task.generation += 1
+        heapq.heappush(self._heap, (deadline, next(self._seq), task.generation, task))
+        if self._heap[0][3] is task:
+            self._cond.notify()
+
+    def _wake(self, task):
+        with self._cond:
+            if task.cancelled: return
+            if task.running:
+                task.wake_pending = True
+            else:
+                self._push(task, self.clock())
+
+    def _cancel(self, task):
+        with self._cond:
+            task.cancelled = True
+            task.generation += 1
+            self._tasks.discard(task)
+
+    # --- DISPATCH ---
+
+    def _loop(self):
+        with self._cond:
+            while self._running:
+                now = self.clock()
+                while self._heap and self._heap[0][0] <= now:
+                    deadline, _, generation, task = heapq.heappop(self._heap)
+                    if generation != task.generation or task.cancelled:
+                        continue   # superseded by a wake or a cancel
+                    task.running = True
+                    self._pool.submit(self._run, task, deadline)
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._cond.wait(timeout)
+
+    def _run(self, task, deadline):
+        start = self.clock()
+        stats = task.stats
+        lag = int((start - deadline) * 1e9)
+        stats.lag.record(lag)
+        if task._last_lag is not None:
+            stats.jitter.record(abs(lag - task._last_lag))
+        task._last_lag = lag
+        try:
+            task.fn()
+        except Exception as e:
+            logger.exception(f"Task {task.name} failed: {e}")
+        finally:
+            task.runs += 1
+            self._reschedule(task, deadline)
+
+    def _reschedule(self, task, deadline):
+        with self._cond:
+            task.running = False
+            if task.cancelled or not self._running:
+                return
+            now = self.clock()
+            if task.wake_pending:
+                task.wake_pending = False
+                self._push(task, now)
+                return
+            # Fixed rate: next deadline is one period after this one, not after the work.
+            next_deadline = deadline + task.period
+            if next_deadline < now:
+                missed = int((now - next_deadline) // task.period) + 1
+                task.stats.skipped += missed
+                next_deadline += missed * task.period
+            self._push(task, next_deadline)
+
+    def stats(self):
+        """{task name: runs, skipped, lag and jitter quantiles in seconds}."""
+        report = {}
+        for task in self.tasks():
+            s = task.stats
+            report[task.name] = {
+                "period": task.period,
+                "runs": task.runs,
+                "skipped": s.skipped,
+                "lag_p50": s.lag.percentile(0.5) / 1e9,
+                "lag_p99": s.lag.percentile(0.99) / 1e9,
+                "lag_max": s.lag.max / 1e9,
+                "jitter_p50": s.jitter.percentile(0.5) / 1e9,
+                "jitter_p99": s.jitter.percentile(0.99) / 1e9,
+                "jitter_max": s.jitter.max / 1e9,
+            }
+        return report
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler():
+    """The process-wide scheduler, started on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Scheduler().start()
+        return _shared
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Hive State
+The hive process publishes each HiveState snapshot into a named
+multiprocessing.shared_memory segment guarded by a seqlock: the writer
+bumps the sequence to odd, copies the payload, then bumps it to even.
+Readers in any process copy the payload between two sequence reads and
+retry if they differ, so they never take a lock or touch the filesystem.
+
+Layout: header '<4sHHQI' (magic, layout version, flags, seq, payload
+length) followed by the JSON payload.
+"""
+
+import os
+import mmap
+import json
+import time
+import struct
+import logging
+import threading
+from multiprocessing import shared_memory
+
+try:
+    import _posixshmem
+except ImportError:
+    _posixshmem = None
+
+logger = logging.getLogger("SharedHive")
+
+SHM_NAME = os.environ.get("ANT_SWARM_SHM", "ant_swarm_hive")
+SHM_SIZE = 64 * 1024
+MAGIC = b"AHSM"
+LAYOUT_VERSION = 1
+FLAG_CLOSED = 1
+
+HEADER = struct.Struct('<4sHHQI')
+SEQ = struct.Struct('<Q')
+SEQ_OFFSET = 8
+LENGTH = struct.Struct('<I')
+LENGTH_OFFSET = 16
+READ_RETRIES = 1000
+REATTACH_INTERVAL = 1.0
+
+
+class _Mapping:
+    """
+    Read-only view of an existing segment. On POSIX it is a plain
+    shm_open + mmap: going through SharedMemory would register the segment
+    with a resource tracker that may be the writer's own (fork/spawn
+    children share it), and unregistering it there breaks the writer's
+    cleanup.
+    """
+    def __init__(self, name):
+        if _posixshmem is None:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.buf = self._shm.buf
+            return
+        self._shm = None
+        fd = _posixshmem.shm_open("/" + name, os.O_RDONLY, mode=0o600)
+        try:
+            self.buf = mmap.mmap(fd, os.fstat(fd).st_size, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+        else:
+            self.buf.close()
+
+
+class SharedStateWriter:
+    """Single writer. Owns (creates and unlinks) the segment."""
+    def __init__(self, name=SHM_NAME, size=SHM_SIZE):
+        self.name = name
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a writer that crashed; readers re-attach on FLAG_CLOSED.
+            stale = shared_memory.SharedMemory(name=name)
+            stale.buf[:HEADER.size] = HEADER.pack(MAGIC, LAYOUT_VERSION, FLAG_CLOSED, 0, 0)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.capacity = self.shm.size - HEADER.size
+        self.seq = 0
+        self.shm.buf[:HEADER.size] = HEADER.pack(MAGIC, LAYOUT_VERSION, 0, 0, 0)
+
+    def publish(self, data):
+        """Writes a JSON-serializable value. Returns False if it does not fit."""
+        payload = json.dumps(data, separators=(',', ':')).encode()
+        if len(payload) > self.capacity:
+            logger.error(f"Hive state ({len(payload)} bytes) exceeds shared segment capacity")
+            return False
+        buf = self.shm.buf
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq + 1)          # odd: write in progress
+        LENGTH.pack_into(buf, LENGTH_OFFSET, len(payload))
+        buf[HEADER.size:HEADER.size + len(payload)] = payload
+        self.seq += 2
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)              # even: consistent
+        return True
+
+    def close(self, unlink=True):
+        if self.shm is None: return
+        self.shm.buf[:HEADER.size] = HEADER.pack(MAGIC, LAYOUT_VERSION, FLAG_CLOSED, self.seq, 0)
+        self.shm.close()
+        if unlink:
+            try: self.shm.unlink()
+            except FileNotFoundError: pass
+        self.shm = None
+
+
+class SharedStateReader:
+    """
+    Reader that never blocks the writer (the lock only guards this object's
+    cache between threads). Attaches lazily, re-attaches after the writer
+    restarts, and only re-parses the payload when the sequence has moved.
+    """
+    def __init__(self, name=SHM_NAME):
+        self.name = name
+        self.shm = None
+        self._pid = None
+        self._next_attach = 0.0
+        self._seq = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def _ensure_attached(self):
+        # Never reuse a mapping inherited across fork().
+        if self.shm is not None and self._pid == os.getpid():
+            return True
+        self.shm = None
+        now = time.monotonic()
+        if now < self._next_attach:
+            return False
+        try:
+            self.shm = _Mapping(self.name)
+            self._pid = os.getpid()
+            self._seq = None
+            return True
+        except FileNotFoundError:
+            self._next_attach = now + REATTACH_INTERVAL
+            return False
+
+    def _detach(self):
+        try: self.shm.close()
+        except Exception: pass
+        self.shm = None
+
+    def read(self):
+        """Latest published value, or None if no writer is running."""
+        with self._lock:
+            if not self._ensure_attached():
+                return None
+            buf = self.shm.buf
+            for _ in range(READ_RETRIES):
+                magic, layout, flags, seq, length = HEADER.unpack_from(buf, 0)
+                if magic != MAGIC or layout != LAYOUT_VERSION or flags & FLAG_CLOSED:
+                    self._detach()
+                    return None
+                if seq & 1:
+                    continue
+                if seq == self._seq:
+                    return self._value
+                if seq == 0:
+                    return None
+                payload = bytes(buf[HEADER.size:HEADER.size + length])
+                if SEQ.unpack_from(buf, SEQ_OFFSET)[0] != seq:
+                    continue
+                self._seq = seq
+                self._value = json.loads(payload)
+                return self._value
+            return None
+
+    @property
+    def seq(self):
+        """Sequence number of the last value read (None before the first)."""
+        return self._seq
+
+    def close(self):
+        with self._lock:
+            if self.shm is not None:
+                self._detach()
+
+
+class SharedHivePublisher:
+    """Mirrors every HiveState version into a shared segment."""
+    def __init__(self, hive, name=SHM_NAME, size=SHM_SIZE):
+        self.hive = hive
+        self.writer = SharedStateWriter(name, size)
+        self.published_version = -1
+        self.running = False
+        self.thread = None
+
+    def publish(self, snap):
+        self.writer.publish({"version": snap.version, "timestamp": snap.timestamp, "state": snap.to_dict()})
+        # Advance even if it did not fit, so an oversized state can't spin the loop.
+        self.published_version = snap.version
+
+    def start(self):
+        if self.running: return
+        self.running = True
+        self.publish(self.hive.snapshot())
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="SharedHivePublisher")
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.writer.close()
+
+    def _loop(self):
+        while self.running:
+            snap = self.hive.wait_for_version(self.published_version, timeout=0.5)
+            if snap.version != self.published_version:
+                self.publish(snap)
@@ -0,0 +1,151 @@
+import os
+import heapq
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+from ant_swarm.core.hive import HiveState
+from ant_swarm.tools.offline_tools import make_headless
+
+logger = logging.getLogger("Simulation")
+
+# Virtual seconds per episode: 30 Blue cycles and 20 Red cycles.
+EPISODE_LENGTH = 30.0
+
+
+class VirtualClock:
+    """
+    Simulated time source. Only moves when the engine advances it.
+    """
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+
+class SimulationEngine:
+    """
+    Steps OODA agents on a virtual clock instead of sleeping.
+
+    Each agent runs at its own cycle_time (Blue 1.0s, Red 1.5s), so the
+    relative cadence of the live hive is kept while wall time is spent
+    only on the agents' observe/orient/decide/act work.
+    """
+    def __init__(self, agents, artifact_dir, headless=True, seed=None):
+        self.agents = list(agents)
+        self.artifact_dir = artifact_dir
+        self.clock = VirtualClock()
+        self.hive = HiveState()
+        self.steps = 0
+        self.episodes = 0
+        self._queue = []
+
+        if seed is not None:
+            random.seed(seed)
+
+        for agent in self.agents:
+            agent.clock = self.clock.time
+            agent.autosave = False
+            if headless:
+                make_headless(agent)
+        self._schedule()
+
+    def _schedule(self):
+        # (deadline, order, agent): order keeps ties in registration order.
+        self._queue = [(self.clock.now, i, agent) for i, agent in enumerate(self.agents)]
+        heapq.heapify(self._queue)
+
+    def run(self, duration):
+        """Advances virtual time by `duration`, stepping every agent that falls due."""
+        end = self.clock.now + duration
+        queue = self._queue
+        while queue and queue[0][0] < end:
+            deadline, order, agent = heapq.heappop(queue)
+            self.clock.now = deadline
+            agent.step()
+            self.steps += 1
+            heapq.heappush(queue, (deadline + agent.cycle_time, order, agent))
+        self.clock.now = end
+
+    def reset(self):
+        """Starts a fresh episode: default hive state and an empty artifact dir."""
+        self.hive.reset()
+        for entry in os.scandir(self.artifact_dir):
+            try: os.remove(entry.path)
+            except OSError: pass
+        self.clock.now = 0.0
+        self._schedule()
+
+    def run_episodes(self, count, episode_length=EPISODE_LENGTH):
+        start = time.perf_counter()
+        steps_before = self.steps
+        for _ in range(count):
+            self.reset()
+            self.run(episode_length)
+            self.episodes += 1
+        elapsed = time.perf_counter() - start
+        return {
+            "episodes": count,
+            "steps": self.steps - steps_before,
+            "elapsed": elapsed,
+            "episodes_per_hour": count / elapsed * 3600 if elapsed else 0.0
+        }
+
+
+def quiet_agent_logging():
+    """Agents log every action at INFO; far too chatty when run flat out."""
+    logging.disable(logging.INFO)
+
+
+def build_match(artifact_dir, headless=True, seed=None, blue=1, red=1, memory_dir=None):
+    """
+    Creates a Blue/Red pair sharing `artifact_dir` and wraps them in an
+    engine. With more than one agent per side, each team learns into one
+    shared table (Blues first in engine.agents, then Reds). Q-tables come
+    from `memory_dir` if given, else the agents' usual files.
+    """
+    if blue != 1 or red != 1:
+        from ant_swarm.swarm import build_swarm
+        agents, _ = build_swarm(blue, red, artifact_dir, memory_dir=memory_dir)
+        return SimulationEngine(agents, artifact_dir, headless=headless, seed=seed)
+
+    from ant_swarm.agents import blue_defender
+    from ant_swarm.red import red_teamer
+    from ant_swarm.memory.checkpoint import agent_paths
+
+    blue_ckpt, blue_json = agent_paths(blue_defender, memory_dir)
+    red_ckpt, red_json = agent_paths(red_teamer, memory_dir)
+    blue = blue_defender.BlueDefender(watch_dir=artifact_dir, checkpoint_path=blue_ckpt, json_path=blue_json)
+    red = red_teamer.RedTeamer(target_dir=artifact_dir, checkpoint_path=red_ckpt, json_path=red_json)
+    return SimulationEngine([blue, red], artifact_dir, headless=headless, seed=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Red/Blue training run")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--length", type=float, default=EPISODE_LENGTH, help="virtual seconds per episode")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--save", action="store_true", help="persist learned Q-tables when done")
+    parser.add_argument("--blue", type=int, default=1, help="Blue agents (one shared table)")
+    parser.add_argument("--red", type=int, default=1, help="Red agents (one shared table)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    artifact_dir = tempfile.mkdtemp(prefix="war_room_sim_")
+    try:
+        engine = build_match(artifact_dir, seed=args.seed, blue=args.blue, red=args.red)
+        stats = engine.run_episodes(args.episodes, args.length)
+        print(f"[Simulation] {stats['episodes']} episodes / {stats['steps']} steps in {stats['elapsed']:.2f}s "
+              f"({stats['episodes_per_hour']:,.0f} episodes/hour)")
+        if args.save:
+            for agent in engine.agents:
+                agent._save_memory()
+    finally:
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,83 @@
 import time
-import json
 import os
 import logging
-from ant_swarm.agents.blue_defender import BlueDefender
-from ant_swarm.red.red_teamer import RedTeamer
-from ant_swarm.core.hive import HiveState
+import argparse
+from ant_swarm.core.hive import HiveState, HivePersister, SignalBus
+from ant_swarm.core.shm_state import SharedHivePublisher
+from ant_swarm.core.metrics import MetricsPublisher
+from ant_swarm.core.scheduler import get_scheduler
+from ant_swarm.tools.db_manager import DatabaseManager
+from ant_swarm.tools.event_writer import EventLogWriter
+from ant_swarm.tools.ioc_maintenance import IOCMaintenance
+from ant_swarm.tools.threat_intel import ThreatIntel
+from ant_swarm.memory.sharded import DEFAULT_SHARDS
+from ant_swarm.swarm import build_swarm, learn_steps
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(name)s] %(levelname)s: %(message)s')
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the Ant Swarm hive")
+    parser.add_argument("--blue", type=int, default=1, help="Blue agents sharing one Q-table")
+    parser.add_argument("--red", type=int, default=1, help="Red agents sharing one Q-table")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS, help="lock shards per shared Q-table")
+    args = parser.parse_args()
+
     print("Initializing Ant Swarm Hive Mind...")
 
     # Init Hive
     hive = HiveState()
+    # Deliver bus events on worker threads so slow subscribers never stall agents
+    SignalBus().enable_async(workers=2)
+
+    # Persist attack/mitigation events in batches off the agents' threads
+    events = EventLogWriter(DatabaseManager())
+    events.subscribe(SignalBus())
+    events.start()
+
+    # Age out stale IOCs in small chunks and keep the DB file compact
+    maintenance = IOCMaintenance(DatabaseManager(), on_pruned=lambda n: ThreatIntel().rebuild_index())
+    maintenance.start()
 
-    # Init Agents
-    blue = BlueDefender()
-    red = RedTeamer()
+    # Init Agents: each team learns into one sharded table with a single checkpoint owner
+    agents, memories = build_swarm(args.blue, args.red, shards=args.shards)
 
-    print("Deploying Agents...")
-    blue.start()
-    red.start()
+    print(f"Deploying Agents ({args.blue} Blue, {args.red} Red)...")
+    for agent in agents:
+        agent.start()
+    started = time.perf_counter()
 
+    # Rewrite hive_state.json only when the hive's version advances
     state_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hive_state.json")
+    persister = HivePersister(state_file, hive)
+    persister.start()
+    # API workers read live state from shared memory; the file is the fallback
+    shared = SharedHivePublisher(hive)
+    shared.start()
+    # Loop timings for /api/metrics
+    metrics = MetricsPublisher()
+    metrics.start()
 
     try:
         while True:
             time.sleep(1)
-            state = hive.get_state()
-            with open(state_file, 'w') as f:
-                json.dump(state, f)
     except KeyboardInterrupt:
         print("Shutting down Hive...")
-        blue.stop()
-        red.stop()
+        for agent in agents:
+            agent.stop()
+        get_scheduler().stop()
+        for memory in memories.values():
+            try: memory.save()
+            except OSError as e: print(f"Q-table save failed: {e}")
+        elapsed = time.perf_counter() - started
+        steps = learn_steps(memories)
+        print(f"Learning: {steps} steps in {elapsed:.0f}s ({steps / elapsed:.1f} steps/sec)")
+        persister.stop()
+        shared.stop()
+        metrics.stop()
+        SignalBus().disable_async()
+        events.stop()
+        maintenance.stop()
+        print(f"Event log: {events.metrics()}")
 
 if __name__ == "__main__":
     main()
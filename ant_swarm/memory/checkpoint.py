@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Q-Table Checkpoints
+Binary snapshot + append-only delta log for QTable persistence.
+
+  <name>.qck      base snapshot, replaced atomically (temp file + fsync + rename)
+  <name>.qck.log  delta frames appended between compactions
+
+The base header and every delta frame trailer carry precomputed stats
+(states, entries, mean, max), so readers such as the API can report them
+from a fixed-size read at either end of a file instead of loading the table.
+"""
+
+import os
+import json
+import struct
+import zlib
+import argparse
+from .q_table import QTable
+
+BASE_MAGIC = b'WRQC'
+LOG_MAGIC = b'WRQL'
+FRAME_MAGIC = b'QDLT'
+TRAILER_MAGIC = b'QEND'
+VERSION = 1
+EXTRA_ACTION = 0xFFFF  # cell record whose "state" is a full legacy key
+
+# magic, version, width, generation, states, entries, mean, max, body length, body crc32
+BASE_HEADER = struct.Struct('<4sHHIIIddII')
+# magic, generation of the base this log applies to
+LOG_HEADER = struct.Struct('<4sI')
+# magic, payload length, payload crc32
+FRAME_HEADER = struct.Struct('<4sII')
+# states, entries, mean, max, magic
+TRAILER = struct.Struct('<IIdd4s')
+CELL = struct.Struct('<Hd')
+NAME_LEN = struct.Struct('<H')
+
+# Compact once the log outgrows the base (and is at least this big).
+MIN_COMPACT_BYTES = 64 * 1024
+
+
+def _encode_name(buf, name):
+    raw = name.encode('utf-8')
+    buf += NAME_LEN.pack(len(raw))
+    buf += raw
+
+
+def _decode_cells(payload, offset=0):
+    """Yields (name, action index, value) records from a cell payload."""
+    end = len(payload)
+    while offset < end:
+        (n,) = NAME_LEN.unpack_from(payload, offset)
+        offset += NAME_LEN.size
+        name = payload[offset:offset + n].decode('utf-8')
+        offset += n
+        aid, value = CELL.unpack_from(payload, offset)
+        offset += CELL.size
+        yield name, aid, value
+
+
+def _encode_cells(table, cells):
+    buf = bytearray()
+    w = table.width
+    for i in cells:
+        _encode_name(buf, table.states[i // w])
+        buf += CELL.pack(i % w, table.values[i])
+    return buf
+
+
+def _all_cells(table):
+    return [i for i, k in enumerate(table.known) if k]
+
+
+class QCheckpoint:
+    def __init__(self, path, min_compact_bytes=MIN_COMPACT_BYTES):
+        self.path = path
+        self.log_path = path + ".log"
+        self.min_compact_bytes = min_compact_bytes
+        self.generation = 0
+        self._base_size = 0
+        # Set when the base on disk can't be trusted: the next save rewrites it.
+        self.needs_compaction = False
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # --- LOADING ---
+
+    def load(self, actions):
+        """Rebuilds a QTable from the base snapshot plus any matching delta frames."""
+        table = QTable(actions)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        magic, version, width, generation, _, _, _, _, body_len, body_crc = BASE_HEADER.unpack_from(data, 0)
+        if magic != BASE_MAGIC or version != VERSION:
+            raise ValueError(f"{self.path}: not a Q-table checkpoint")
+
+        offset = BASE_HEADER.size
+        stored_actions = []
+        for _ in range(width):
+            (n,) = NAME_LEN.unpack_from(data, offset)
+            offset += NAME_LEN.size
+            stored_actions.append(data[offset:offset + n].decode('utf-8'))
+            offset += n
+
+        body = data[offset:offset + body_len]
+        if len(body) != body_len or zlib.crc32(body) != body_crc:
+            raise ValueError(f"{self.path}: checkpoint body is corrupt")
+
+        self.generation = generation
+        self._base_size = len(data)
+        self._apply(table, stored_actions, body)
+        self._replay_log(table, stored_actions)
+        table.dirty.clear()
+        return table
+
+    def _apply(self, table, stored_actions, payload):
+        for name, aid, value in _decode_cells(payload):
+            if aid == EXTRA_ACTION:
+                table.extra[name] = value
+                continue
+            action = stored_actions[aid]
+            if action in table.action_index:
+                table.set(table.state_id(name), table.action_index[action], value)
+            else:
+                table.extra[f"{name}_{action}"] = value
+
+    def _replay_log(self, table, stored_actions):
+        try:
+            with open(self.log_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        if len(data) < LOG_HEADER.size:
+            return
+        magic, generation = LOG_HEADER.unpack_from(data, 0)
+        # A log left behind by an interrupted compaction predates the base.
+        if magic != LOG_MAGIC or generation != self.generation:
+            try: os.remove(self.log_path)
+            except OSError: pass
+            return
+
+        offset = LOG_HEADER.size
+        while offset + FRAME_HEADER.size <= len(data):
+            magic, length, crc = FRAME_HEADER.unpack_from(data, offset)
+            start = offset + FRAME_HEADER.size
+            end = start + length + TRAILER.size
+            payload = data[start:start + length]
+            if (magic != FRAME_MAGIC or end > len(data) or zlib.crc32(payload) != crc
+                    or data[end - 4:end] != TRAILER_MAGIC):
+                break  # torn tail from a crash mid-append
+            self._apply(table, stored_actions, payload)
+            offset = end
+
+        # Cut the torn tail off, or frames appended after it would never replay.
+        if offset < len(data):
+            os.truncate(self.log_path, offset)
+
+    # --- SAVING ---
+
+    def save(self, table):
+        """Appends the table's dirty cells as one delta frame, compacting when the log grows."""
+        if self.needs_compaction or not self.exists():
+            self.compact(table)
+            return
+        if not table.dirty:
+            return
+        if not self._base_size:
+            self._read_base_header()
+
+        payload = _encode_cells(table, sorted(table.dirty))
+        states, entries, mean, top = table.stats()
+        frame = bytearray(FRAME_HEADER.pack(FRAME_MAGIC, len(payload), zlib.crc32(payload)))
+        frame += payload
+        frame += TRAILER.pack(states, entries, mean, top, TRAILER_MAGIC)
+
+        fresh = not os.path.exists(self.log_path)
+        with open(self.log_path, 'ab') as f:
+            if fresh or f.tell() == 0:
+                f.write(LOG_HEADER.pack(LOG_MAGIC, self.generation))
+            f.write(frame)
+            log_size = f.tell()
+        table.dirty.clear()
+
+        if log_size > max(self.min_compact_bytes, self._base_size):
+            self.compact(table)
+
+    def _read_base_header(self):
+        with open(self.path, 'rb') as f:
+            header = BASE_HEADER.unpack(f.read(BASE_HEADER.size))
+        self.generation = header[3]
+        self._base_size = os.path.getsize(self.path)
+
+    def compact(self, table):
+        """Writes a full snapshot atomically and drops the delta log."""
+        buf = bytearray()
+        for action in table.actions:
+            _encode_name(buf, action)
+        body = _encode_cells(table, _all_cells(table))
+        for key, value in table.extra.items():
+            _encode_name(body, key)
+            body += CELL.pack(EXTRA_ACTION, value)
+
+        generation = self.generation + 1
+        states, entries, mean, top = table.stats()
+        header = BASE_HEADER.pack(BASE_MAGIC, VERSION, table.width, generation,
+                                  states, entries, mean, top, len(body), zlib.crc32(body))
+
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(buf)
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self.generation = generation
+        self._base_size = len(header) + len(buf) + len(body)
+        self.needs_compaction = False
+        try: os.remove(self.log_path)
+        except FileNotFoundError: pass
+        table.dirty.clear()
+
+
+def read_stats(path):
+    """
+    Returns {"states", "entries", "mean", "max"} for a checkpoint without
+    loading it: the newest delta trailer if valid, else the base header.
+    Returns None if there is no readable checkpoint.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(BASE_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < BASE_HEADER.size:
+        return None
+    magic, version, _, generation, states, entries, mean, top, _, _ = BASE_HEADER.unpack(header)
+    if magic != BASE_MAGIC or version != VERSION:
+        return None
+
+    try:
+        with open(path + ".log", 'rb') as f:
+            log_magic, log_gen = LOG_HEADER.unpack(f.read(LOG_HEADER.size))
+            f.seek(-TRAILER.size, os.SEEK_END)
+            s, e, m, t, tail_magic = TRAILER.unpack(f.read(TRAILER.size))
+            if log_magic == LOG_MAGIC and log_gen == generation and tail_magic == TRAILER_MAGIC:
+                states, entries, mean, top = s, e, m, t
+    except (OSError, struct.error):
+        pass
+
+    return {"states": states, "entries": entries, "mean": mean, "max": top}
+
+
+def load_table(checkpoint_path, json_path, actions):
+    """
+    Loads an agent's table from its checkpoint, falling back to the legacy
+    JSON file. Writes nothing: a table read from JSON becomes a checkpoint
+    on its first save, which replaces any unreadable base and its log.
+    Returns (QTable, QCheckpoint).
+    """
+    checkpoint = QCheckpoint(checkpoint_path)
+    if checkpoint.exists():
+        try:
+            return checkpoint.load(actions), checkpoint
+        except (OSError, ValueError, struct.error):
+            checkpoint.needs_compaction = True
+    return QTable.load(json_path, actions), checkpoint
+
+
+def agent_paths(module, memory_dir=None):
+    """
+    (checkpoint path, JSON path) for an agent module's Q-table: its usual
+    files, or files of the same names in `memory_dir`.
+    """
+    if memory_dir is None:
+        return module.Q_CHECKPOINT_FILE, module.Q_TABLE_FILE
+    return (os.path.join(memory_dir, os.path.basename(module.Q_CHECKPOINT_FILE)),
+            os.path.join(memory_dir, os.path.basename(module.Q_TABLE_FILE)))
+
+
+def convert(json_path, checkpoint_path, actions):
+    """One-shot conversion of a legacy JSON Q-table to a checkpoint."""
+    with open(json_path, 'r') as f:
+        table = QTable.from_dict(json.load(f), actions)
+    checkpoint = QCheckpoint(checkpoint_path)
+    checkpoint.compact(table)
+    return len(table)
+
+
+def main():
+    from ant_swarm.agents import blue_defender
+    from ant_swarm.red import red_teamer
+
+    parser = argparse.ArgumentParser(description="Convert legacy JSON Q-tables to binary checkpoints")
+    parser.add_argument("--stats", action="store_true", help="print checkpoint header stats instead of converting")
+    args = parser.parse_args()
+
+    for module in (blue_defender, red_teamer):
+        if args.stats:
+            print(f"{module.Q_CHECKPOINT_FILE}: {read_stats(module.Q_CHECKPOINT_FILE)}")
+            continue
+        if not os.path.exists(module.Q_TABLE_FILE):
+            print(f"[Checkpoint] Skipping {module.Q_TABLE_FILE}: not found")
+            continue
+        count = convert(module.Q_TABLE_FILE, module.Q_CHECKPOINT_FILE, module.ACTIONS)
+        print(f"[Checkpoint] {module.Q_TABLE_FILE} -> {module.Q_CHECKPOINT_FILE} ({count} entries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Q-Table
+Dense, array-backed action-value table. States are interned to integer
+row IDs; each row is a contiguous run of doubles, one column per action.
+"""
+
+import json
+from array import array
+from itertools import compress
+
+
+class QTable:
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.width = len(self.actions)
+        self.action_index = {a: i for i, a in enumerate(self.actions)}
+        self.state_ids = {}     # state -> row
+        self.states = []        # row -> state
+        self.values = array('d')
+        self.known = bytearray()  # 1 where a cell was written; keeps file round-trips exact
+        self.visits = array('L')  # updates per cell, used to weight merges
+        self.extra = {}         # entries for actions this agent no longer has
+        self.dirty = set()      # cells written since the last checkpoint
+        self._zero_row = array('d', [0.0] * self.width)
+        self._zero_visits = array('L', [0] * self.width)
+
+    # --- INDEXING ---
+
+    def state_id(self, state):
+        """Interns a state key, growing the table by one zeroed row if new."""
+        sid = self.state_ids.get(state)
+        if sid is None:
+            sid = len(self.states)
+            self.state_ids[state] = sid
+            self.states.append(state)
+            self.values.extend(self._zero_row)
+            self.known.extend(bytes(self.width))
+            self.visits.extend(self._zero_visits)
+        return sid
+
+    def get(self, sid, aid):
+        return self.values[sid * self.width + aid]
+
+    def set(self, sid, aid, value):
+        i = sid * self.width + aid
+        self.values[i] = value
+        self.known[i] = 1
+        self.dirty.add(i)
+
+    def update(self, sid, aid, target, alpha):
+        """Moves Q(s, a) a step of size alpha towards target."""
+        i = sid * self.width + aid
+        old = self.values[i]
+        self.values[i] = old + alpha * (target - old)
+        self.known[i] = 1
+        self.visits[i] += 1
+        self.dirty.add(i)
+
+    def row(self, sid):
+        start = sid * self.width
+        return self.values[start:start + self.width]
+
+    def row_max(self, sid):
+        return max(self.row(sid))
+
+    def argmax(self, sid):
+        """Index of the best action; ties go to the earliest action, as before."""
+        row = self.row(sid)
+        return row.index(max(row))
+
+    def reset_visits(self):
+        self.visits = array('L', bytes(self.visits.itemsize * len(self.visits)))
+
+    def merge(self, tables):
+        """
+        Folds other tables (same actions) into this one. Each cell becomes
+        the visit-weighted mean of the tables that updated it; cells nobody
+        visited keep their current value.
+        """
+        totals = {}
+        for table in tables:
+            w = table.width
+            visits, values = table.visits, table.values
+            for sid, state in enumerate(table.states):
+                base = sid * w
+                for aid in range(w):
+                    n = visits[base + aid]
+                    if n:
+                        acc = totals.setdefault((state, aid), [0.0, 0])
+                        acc[0] += values[base + aid] * n
+                        acc[1] += n
+
+        for (state, aid), (weighted, n) in totals.items():
+            sid = self.state_id(state)
+            self.set(sid, aid, weighted / n)
+            self.visits[sid * self.width + aid] += n
+        return len(totals)
+
+    def __len__(self):
+        return self.known.count(1) + len(self.extra)
+
+    def stats(self):
+        """(state count, entry count, mean, max) over written cells, as the API reports them."""
+        written = list(compress(self.values, self.known)) + list(self.extra.values())
+        if not written:
+            return len(self.states), 0, 0.0, 0.0
+        return len(self.states), len(written), sum(written) / len(written), max(written)
+
+    # --- SERIALIZATION ---
+
+    def _split_key(self, key):
+        # "{state}_{action}": actions may themselves contain underscores,
+        # so take the longest suffix that names a known action.
+        pos = key.find('_')
+        while pos != -1:
+            if key[pos + 1:] in self.action_index:
+                return key[:pos], key[pos + 1:]
+            pos = key.find('_', pos + 1)
+        return None, None
+
+    def items(self):
+        """Yields ("{state}_{action}", value) for every written cell."""
+        w = self.width
+        for sid, state in enumerate(self.states):
+            base = sid * w
+            for aid in range(w):
+                if self.known[base + aid]:
+                    yield f"{state}_{self.actions[aid]}", self.values[base + aid]
+        yield from self.extra.items()
+
+    def to_dict(self):
+        return dict(self.items())
+
+    @classmethod
+    def from_dict(cls, data, actions):
+        table = cls(actions)
+        for key, value in data.items():
+            state, action = table._split_key(key)
+            if state is None:
+                table.extra[key] = value
+            else:
+                table.set(table.state_id(state), table.action_index[action], float(value))
+        return table
+
+    @classmethod
+    def load(cls, path, actions):
+        """Reads the legacy JSON layout; a missing or corrupt file yields an empty table."""
+        try:
+            with open(path, 'r') as f:
+                return cls.from_dict(json.load(f), actions)
+        except (OSError, ValueError, AttributeError):
+            return cls(actions)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=4)
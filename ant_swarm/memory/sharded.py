@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Sharded Q-Table
+One action-value table shared by every agent of a team. States are
+spread over independent QTable shards by a stable hash, each with its own
+lock, so agents learning about different states never contend. A state
+id encodes its shard (sid = row * shards + shard), so lookups after
+state_id() go straight to the right shard without hashing again.
+
+SharedQTable owns the table's checkpoint: it loads once, before any agent
+starts, and saves one snapshot at a time, so concurrent agents can neither
+race a load against a save nor interleave two saves.
+"""
+
+import zlib
+import threading
+from array import array
+
+from .q_table import QTable
+from .checkpoint import load_table
+
+DEFAULT_SHARDS = 16
+
+
+class ShardedQTable:
+    def __init__(self, actions, shards=DEFAULT_SHARDS):
+        self.actions = list(actions)
+        self.width = len(self.actions)
+        self.action_index = {a: i for i, a in enumerate(self.actions)}
+        self.count = shards
+        self.shards = [QTable(self.actions) for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self.updates = [0] * shards   # per shard, written under its lock
+        self.extra = {}
+
+    @classmethod
+    def from_table(cls, table, shards=DEFAULT_SHARDS):
+        """Distributes a QTable's rows (values, visit counts, legacy extras) over the shards."""
+        sharded = cls(table.actions, shards)
+        w = table.width
+        for sid, state in enumerate(table.states):
+            s = sharded.shard_of(state)
+            shard = sharded.shards[s]
+            row = shard.state_id(state) * w
+            shard.values[row:row + w] = table.values[sid * w:sid * w + w]
+            shard.known[row:row + w] = table.known[sid * w:sid * w + w]
+            shard.visits[row:row + w] = table.visits[sid * w:sid * w + w]
+        sharded.extra = dict(table.extra)
+        return sharded
+
+    def shard_of(self, state):
+        # crc32 rather than hash(): the same state lands on the same shard in every process.
+        return zlib.crc32(state.encode('utf-8')) % self.count
+
+    # --- QTABLE INTERFACE ---
+
+    def state_id(self, state):
+        s = self.shard_of(state)
+        shard = self.shards[s]
+        row = shard.state_ids.get(state)
+        if row is None:
+            with self.locks[s]:
+                row = shard.state_id(state)
+        return row * self.count + s
+
+    def _locate(self, sid):
+        row, s = divmod(sid, self.count)
+        return self.shards[s], row, s
+
+    def get(self, sid, aid):
+        shard, row, _ = self._locate(sid)
+        return shard.get(row, aid)
+
+    def set(self, sid, aid, value):
+        shard, row, s = self._locate(sid)
+        with self.locks[s]:
+            shard.set(row, aid, value)
+
+    def update(self, sid, aid, target, alpha):
+        shard, row, s = self._locate(sid)
+        with self.locks[s]:
+            shard.update(row, aid, target, alpha)
+            self.updates[s] += 1
+
+    # Reads copy the row in one C-level slice, so they need no lock.
+    def row(self, sid):
+        shard, row, _ = self._locate(sid)
+        return shard.row(row)
+
+    def row_max(self, sid):
+        return max(self.row(sid))
+
+    def argmax(self, sid):
+        row = self.row(sid)
+        return row.index(max(row))
+
+    @property
+    def total_updates(self):
+        return sum(self.updates)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards) + len(self.extra)
+
+    def snapshot(self, take_dirty=False):
+        """
+        A plain QTable copy of every shard (each copied under its own lock).
+        With take_dirty, the cells written since the last snapshot are
+        carried over as the copy's dirty set and cleared in the shards.
+        """
+        table = QTable(self.actions)
+        w = self.width
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                remap = array('L')
+                for row, state in enumerate(shard.states):
+                    sid = table.state_id(state)
+                    remap.append(sid)
+                    table.values[sid * w:sid * w + w] = shard.values[row * w:row * w + w]
+                    table.known[sid * w:sid * w + w] = shard.known[row * w:row * w + w]
+                    table.visits[sid * w:sid * w + w] = shard.visits[row * w:row * w + w]
+                if take_dirty:
+                    table.dirty.update(remap[i // w] * w + i % w for i in shard.dirty)
+                    shard.dirty.clear()
+        table.extra = dict(self.extra)
+        return table
+
+    def mark_dirty(self, snapshot, cells):
+        """Re-marks a snapshot's cells as unsaved in the shards they came from."""
+        w = self.width
+        for i in cells:
+            state = snapshot.states[i // w]
+            s = self.shard_of(state)
+            with self.locks[s]:
+                self.shards[s].dirty.add(self.shards[s].state_ids[state] * w + i % w)
+
+    def stats(self):
+        return self.snapshot().stats()
+
+    def items(self):
+        return self.snapshot().items()
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class SharedQTable:
+    """A team's ShardedQTable plus the single owner of its checkpoint files."""
+    def __init__(self, checkpoint_path, json_path, actions, shards=DEFAULT_SHARDS):
+        table, self.checkpoint = load_table(checkpoint_path, json_path, actions)
+        self.table = ShardedQTable.from_table(table, shards)
+        self._save_lock = threading.Lock()
+        self.saves = 0
+
+    def save(self, blocking=True):
+        """
+        Appends everything learned since the last save. With blocking=False
+        a save already in progress makes this a no-op (returns False), so
+        agents never queue up behind each other's checkpoint I/O.
+        """
+        if not self._save_lock.acquire(blocking):
+            return False
+        try:
+            snapshot = self.table.snapshot(take_dirty=True)
+            cells = set(snapshot.dirty)
+            try:
+                self.checkpoint.save(snapshot)
+            except OSError:
+                self.table.mark_dirty(snapshot, cells)   # retried by the next save
+                raise
+            self.saves += 1
+            return True
+        finally:
+            self._save_lock.release()
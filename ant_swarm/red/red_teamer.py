@@ -1,9 +1,8 @@
 import os
-import time
-import json
 import random
 import logging
 from ant_swarm.core.ooda import OODALoop
+from ant_swarm.memory.checkpoint import load_table
 from ant_swarm.tools.red_tools import (
     SystemSurveyor, NetworkSniffer, TrafficGenerator,
     LateralMover, PrivEsc, ExfiltrationEngine, DGA, PersistenceManager
@@ -13,28 +12,39 @@ from ant_swarm.tools.threat_intel import ThreatIntel
 logger = logging.getLogger("RedTeamer")
 TARGET_DIR = "/tmp"
 Q_TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../", "red_q_table.json")
+Q_CHECKPOINT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../", "red_q_table.qck")
+SAVE_INTERVAL = 10  # learning steps between checkpoint deltas
+ACTIONS = [
+    "T1046_RECON", "T1027_OBFUSCATE", "T1003_ROOTKIT", "T1589_LURK",
+    "T1046_WIFI_SCAN", "T1046_NET_SCAN", "T1190_WEB_EXPLOIT",
+    "T1071_C2_BEACON", "T1547_PERSIST"
+]
 
 class RedTeamer(OODALoop):
-    def __init__(self):
-        super().__init__("RedTeamer", cycle_time=1.5)
-        self.actions = [
-            "T1046_RECON", "T1027_OBFUSCATE", "T1003_ROOTKIT", "T1589_LURK",
-            "T1046_WIFI_SCAN", "T1046_NET_SCAN", "T1190_WEB_EXPLOIT",
-            "T1071_C2_BEACON", "T1547_PERSIST"
-        ]
+    def __init__(self, target_dir=TARGET_DIR, name="RedTeamer", memory=None,
+                 checkpoint_path=Q_CHECKPOINT_FILE, json_path=Q_TABLE_FILE):
+        # memory: a SharedQTable when several RedTeamers learn into one table
+        super().__init__(name, cycle_time=1.5)
+        self.memory = memory
+        self.checkpoint_path = checkpoint_path
+        self.json_path = json_path
+        self.target_dir = target_dir
+        self.actions = list(ACTIONS)
         self.q_table = self._load_memory()
         self.epsilon = 0.3
         self.alpha = 0.4
         self.gamma = 0.9
         self.last_state = None
         self.last_action = None
+        self.autosave = True
+        self.learn_steps = 0
 
         # Initialize Advanced Tools
         self.surveyor = SystemSurveyor()
         self.sniffer = NetworkSniffer()
         self.traffic = TrafficGenerator()
         self.lateral = LateralMover()
-        self.persist = PersistenceManager()
+        self.persist = PersistenceManager(target_dir)
         self.ti = ThreatIntel() # Can be used to fetch IPs
 
         # Reward Config
@@ -57,8 +67,7 @@ class RedTeamer(OODALoop):
         if random.random() < self.epsilon:
             action = random.choice(self.actions)
         else:
-            known = {a: self.q_table.get(f"{state}_{a}", 0) for a in self.actions}
-            action = max(known, key=known.get) if known else random.choice(self.actions)
+            action = self.actions[self.q_table.argmax(self.q_table.state_id(state))]
 
         self.last_action = action
         return action
@@ -74,7 +83,7 @@ class RedTeamer(OODALoop):
                 info = self.surveyor.collect_system_info()
                 logger.info(f"Recon Data: {info}")
                 # Still drop bait for Blue to find
-                fname = f"malware_bait_{int(time.time())}.sh"
+                fname = f"malware_bait_{int(self.clock())}.sh"
                 content = f"echo 'Target: {info.get('hostname')}'"
                 impact = 1
 
@@ -98,22 +107,22 @@ class RedTeamer(OODALoop):
                     impact = 5
 
             elif action == "T1027_OBFUSCATE":
-                fname = f"malware_crypt_{int(time.time())}.bin"
+                fname = f"malware_crypt_{int(self.clock())}.bin"
                 content = os.urandom(1024)
                 impact = 3
 
             elif action == "T1003_ROOTKIT":
-                fname = f".sys_shadow_{int(time.time())}"
+                fname = f".sys_shadow_{int(self.clock())}"
                 content = "uid=0(root)"
                 impact = 5
 
             elif action == "T1190_WEB_EXPLOIT":
-                fname = f"malware_webshell_{int(time.time())}.php"
+                fname = f"malware_webshell_{int(self.clock())}.php"
                 content = "<?php system($_GET['cmd']); ?>"
                 impact = 7
 
             elif action == "T1046_WIFI_SCAN":
-                 fname = f"handshake_{int(time.time())}.cap"
+                 fname = f"handshake_{int(self.clock())}.cap"
                  content = b"handshake_data"
                  impact = 2
 
@@ -121,7 +130,7 @@ class RedTeamer(OODALoop):
                 impact = 0
 
             if fname:
-                path = os.path.join(TARGET_DIR, fname)
+                path = os.path.join(self.target_dir, fname)
                 mode = 'wb' if isinstance(content, bytes) else 'w'
                 with open(path, mode) as f: f.write(content)
                 logger.info(f"Executed {action}: Dropped {fname}")
@@ -142,23 +151,27 @@ class RedTeamer(OODALoop):
 
         self.epsilon = max(0.01, self.epsilon * 0.995)
 
-        if random.random() < 0.1:
+        self.learn_steps += 1
+        if self.autosave and self.learn_steps % SAVE_INTERVAL == 0:
             self._save_memory()
 
     def _learn(self, state, action, reward, next_state):
-        old_val = self.q_table.get(f"{state}_{action}", 0)
-        next_max = max([self.q_table.get(f"{next_state}_{a}", 0) for a in self.actions])
-        new_val = old_val + self.alpha * (reward + self.gamma * next_max - old_val)
-        self.q_table[f"{state}_{action}"] = new_val
+        q = self.q_table
+        next_max = q.row_max(q.state_id(next_state))
+        q.update(q.state_id(state), q.action_index[action], reward + self.gamma * next_max, self.alpha)
 
     def _load_memory(self):
-        if os.path.exists(Q_TABLE_FILE):
-            try:
-                with open(Q_TABLE_FILE, 'r') as f: return json.load(f)
-            except: return {}
-        return {}
+        if self.memory is not None:
+            self.checkpoint = self.memory.checkpoint
+            return self.memory.table
+        table, self.checkpoint = load_table(self.checkpoint_path, self.json_path, self.actions)
+        return table
 
     def _save_memory(self):
-        try:
-            with open(Q_TABLE_FILE, 'w') as f: json.dump(self.q_table, f, indent=4)
+        if self.memory is not None:
+            # The shared table saves one snapshot at a time; skip if another agent is mid-save.
+            try: self.memory.save(blocking=False)
+            except: pass
+            return
+        try: self.checkpoint.save(self.q_table)
         except: pass
@@ -0,0 +1,119 @@
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+from ant_swarm.memory.sharded import SharedQTable, DEFAULT_SHARDS
+from ant_swarm.memory.checkpoint import agent_paths
+from ant_swarm.core.simulation import quiet_agent_logging
+from ant_swarm.tools.offline_tools import make_headless
+from ant_swarm.agents import blue_defender
+from ant_swarm.red import red_teamer
+
+logger = logging.getLogger("Swarm")
+
+
+def team_memories(shards=DEFAULT_SHARDS, memory_dir=None):
+    """One SharedQTable per team, from the agents' usual Q-table files or those in `memory_dir`."""
+    return {
+        "blue": SharedQTable(*agent_paths(blue_defender, memory_dir), blue_defender.ACTIONS, shards),
+        "red": SharedQTable(*agent_paths(red_teamer, memory_dir), red_teamer.ACTIONS, shards),
+    }
+
+
+def _names(base, count):
+    # A lone agent keeps its usual name (and metrics labels).
+    return [base] if count == 1 else [f"{base}-{i}" for i in range(1, count + 1)]
+
+
+def build_swarm(blue=1, red=1, artifact_dir=None, memories=None, shards=DEFAULT_SHARDS, memory_dir=None):
+    """
+    Creates `blue` BlueDefenders and `red` RedTeamers. Every agent of a team
+    learns into the team's SharedQTable. Returns (agents, memories).
+    """
+    memories = memories or team_memories(shards, memory_dir)
+    blue_kw = {"watch_dir": artifact_dir} if artifact_dir else {}
+    red_kw = {"target_dir": artifact_dir} if artifact_dir else {}
+    agents = [blue_defender.BlueDefender(name=name, memory=memories["blue"], **blue_kw)
+              for name in _names("BlueDefender", blue)]
+    agents += [red_teamer.RedTeamer(name=name, memory=memories["red"], **red_kw)
+               for name in _names("RedTeamer", red)]
+    return agents, memories
+
+
+def learn_steps(memories):
+    return sum(memory.table.total_updates for memory in memories.values())
+
+
+def measure(blue, red, seconds, shards=DEFAULT_SHARDS):
+    """
+    Runs a headless swarm flat out (no cycle_time pacing), one thread per
+    agent, for `seconds`. Nothing is written to the checkpoints.
+    """
+    artifact_dir = tempfile.mkdtemp(prefix="war_room_swarm_")
+    try:
+        agents, memories = build_swarm(blue, red, artifact_dir, shards=shards)
+        for agent in agents:
+            agent.autosave = False
+            make_headless(agent)
+        stop = threading.Event()
+        errors = []
+
+        def drive(agent):
+            while not stop.is_set():
+                try:
+                    agent.step()
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=drive, args=(agent,), daemon=True) for agent in agents]
+        before = learn_steps(memories)
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        steps = learn_steps(memories) - before
+        return {
+            "blue": blue,
+            "red": red,
+            "shards": shards,
+            "steps": steps,
+            "elapsed": elapsed,
+            "steps_per_sec": steps / elapsed if elapsed else 0.0,
+            "errors": len(errors),
+        }
+    finally:
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+
+
+def parse_scale(text):
+    """'1x1,2x2,4x8' -> [(1, 1), (2, 2), (4, 8)] as (blue, red) counts."""
+    pairs = []
+    for item in text.split(","):
+        blue, _, red = item.strip().lower().partition("x")
+        pairs.append((int(blue), int(red or blue)))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate learning throughput of a shared-table swarm")
+    parser.add_argument("--scale", default="1x1,2x2,4x4,8x8", help="comma-separated BLUExRED agent counts")
+    parser.add_argument("--seconds", type=float, default=3.0, help="run time per configuration")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+    args = parser.parse_args()
+
+    quiet_agent_logging()
+    print(f"{'blue':>5} {'red':>5} {'shards':>6} {'steps':>10} {'steps/sec':>12} {'per agent':>10}")
+    for blue, red in parse_scale(args.scale):
+        r = measure(blue, red, args.seconds, args.shards)
+        print(f"{blue:>5} {red:>5} {args.shards:>6} {r['steps']:>10} {r['steps_per_sec']:>12,.0f} "
+              f"{r['steps_per_sec'] / (blue + red):>10,.0f}" + (f"  ({r['errors']} errors)" if r['errors'] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Artifact Watcher
+Keeps a live, categorized set of Red Team artifacts in a directory,
+updated from inotify events (via ctypes) with an mtime/scandir fallback.
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger("ArtifactWatcher")
+
+# Same files BlueDefender used to glob for: malware_* and .sys_*
+THREAT_PREFIXES = ("malware_", ".sys_")
+
+# all / web / wifi: tuples of full paths
+ThreatSnapshot = namedtuple("ThreatSnapshot", ["all", "web", "wifi"])
+EMPTY_SNAPSHOT = ThreatSnapshot((), (), ())
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+# Directory mtimes tick at kernel-timer granularity; inside this window a
+# second change can land without moving the mtime, so rescan regardless.
+RACY_WINDOW_NS = 50_000_000
+POLL_INTERVAL = 0.1
+
+
+def _is_threat(name):
+    return name.startswith(THREAT_PREFIXES)
+
+
+class _Inotify:
+    """Minimal non-blocking inotify binding for a single directory."""
+    _libc = None
+
+    def __init__(self, path):
+        if self._libc is None:
+            _Inotify._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {path}")
+
+    def read(self):
+        """Returns [(mask, name)] for all pending events, never blocking."""
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(buf):
+                _, mask, _, length = EVENT.unpack_from(buf, offset)
+                offset += EVENT.size
+                name = buf[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+                offset += length
+                events.append((mask, name))
+
+    def wait(self, timeout):
+        try:
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+            return bool(readable)
+        except (OSError, ValueError):
+            return False
+
+    def close(self):
+        try: os.close(self.fd)
+        except OSError: pass
+
+
+class ArtifactWatcher:
+    """
+    snapshot() is a cheap read of the current categorized threat set: with
+    inotify it drains pending events (one non-blocking read when idle), with
+    the fallback it costs one stat of the directory unless it changed.
+    start() adds a background thread that calls on_new as soon as a new
+    artifact appears.
+    """
+    def __init__(self, watch_dir, on_new=None, use_inotify=True):
+        self.watch_dir = watch_dir
+        self.on_new = on_new
+        self._names = set()
+        self._snapshot = EMPTY_SNAPSHOT
+        self._lock = threading.Lock()
+        self._mtime_ns = None
+        self._thread = None
+        self._running = False
+
+        self._inotify = None
+        if use_inotify:
+            try:
+                self._inotify = _Inotify(watch_dir)
+            except (OSError, AttributeError) as e:
+                logger.info(f"inotify unavailable ({e}); falling back to mtime polling")
+        self._rescan()
+
+    @property
+    def backend(self):
+        return "inotify" if self._inotify else "poll"
+
+    def snapshot(self):
+        self.poll()
+        return self._snapshot
+
+    def poll(self):
+        """Applies pending changes. Returns the set of newly added names."""
+        with self._lock:
+            if self._inotify:
+                return self._apply_events(self._inotify.read())
+            return self._poll_mtime()
+
+    # --- CHANGE TRACKING ---
+
+    def _apply_events(self, events):
+        if not events:
+            return set()
+        before = set(self._names)
+        for mask, name in events:
+            if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                # Lost events or the directory itself went away: start over.
+                self._scan_names()
+                break
+            if not _is_threat(name):
+                continue
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._names.add(name)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._names.discard(name)
+        if self._names != before:
+            self._publish()
+        return self._names - before
+
+    def _poll_mtime(self):
+        try:
+            mtime_ns = os.stat(self.watch_dir).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns == self._mtime_ns and (mtime_ns is None or time.time_ns() - mtime_ns > RACY_WINDOW_NS):
+            return set()
+        before = set(self._names)
+        self._mtime_ns = mtime_ns
+        self._scan_names()
+        if self._names != before:
+            self._publish()
+        return self._names - before
+
+    def _scan_names(self):
+        try:
+            with os.scandir(self.watch_dir) as it:
+                self._names = {e.name for e in it if _is_threat(e.name)}
+        except OSError:
+            self._names = set()
+
+    def _rescan(self):
+        with self._lock:
+            try: self._mtime_ns = os.stat(self.watch_dir).st_mtime_ns
+            except OSError: self._mtime_ns = None
+            self._scan_names()
+            self._publish()
+
+    def _publish(self):
+        # Visible (malware_*) before hidden (.sys_*), as the two globs returned them.
+        ordered = sorted(self._names, key=lambda n: (n.startswith('.'), n))
+        paths = tuple(os.path.join(self.watch_dir, n) for n in ordered)
+        self._snapshot = ThreatSnapshot(
+            paths,
+            tuple(p for p in paths if p.endswith('.php')),
+            tuple(p for p in paths if 'handshake' in p)
+        )
+
+    # --- BACKGROUND WAKE-UPS ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def close(self):
+        """Stops the thread and releases the inotify fd; snapshot() keeps
+        working afterwards by polling the directory mtime."""
+        self.stop()
+        # Let the thread leave select() before its fd number can be reused.
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(POLL_INTERVAL * 2)
+        with self._lock:  # not while a snapshot() is reading it
+            inotify, self._inotify = self._inotify, None
+        if inotify:
+            inotify.close()
+
+    def _watch(self):
+        while self._running:
+            if self._inotify:
+                if not self._inotify.wait(POLL_INTERVAL):
+                    continue
+            else:
+                time.sleep(POLL_INTERVAL)
+            try:
+                added = self.poll()
+            except OSError as e:
+                if e.errno != errno.EBADF:
+                    logger.error(f"Watcher error: {e}")
+                break
+            if added and self.on_new:
+                self.on_new()
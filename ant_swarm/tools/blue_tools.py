@@ -10,6 +10,8 @@ import subprocess
 import time
 import collections
 
+CONNECTION_RE = re.compile(r'\s+(\d+\.\d+\.\d+\.\d+):(\d+)\s+users:\(\(".*?",pid=(\d+)')
+
 class ProcessAuditor:
     def scan_proc(self):
         """
@@ -52,31 +54,39 @@ class BeaconHunter:
         hits = []
         try:
             output = subprocess.check_output(["ss", "-tunap"], text=True)
+            connections = []
             for line in output.splitlines():
                 # Extract Remote IP
-                match = re.search(r'\s+(\d+\.\d+\.\d+\.\d+):(\d+)\s+users:\(\(".*?",pid=(\d+)', line)
+                match = CONNECTION_RE.search(line)
                 if match:
-                    remote_ip = match.group(1)
-                    pid = int(match.group(3))
+                    connections.append((int(match.group(3)), match.group(1)))
 
-                    if ti_module.is_known_threat(remote_ip):
-                        hits.append({'pid': pid, 'ip': remote_ip, 'type': 'Known IOC'})
+            # One batch lookup for the whole table instead of one per line
+            known = ti_module.lookup_many({ip for _, ip in connections})
+            for pid, remote_ip in connections:
+                if remote_ip in known:
+                    hits.append({'pid': pid, 'ip': remote_ip, 'type': 'Known IOC'})
         except Exception:
             pass
         return hits
 
 class ArtifactScanner:
+    def __init__(self, base_dir="/tmp"):
+        self.base_dir = base_dir
+
     def scan_persistence(self):
         """Checks for the Red Team's known persistence artifacts."""
         artifacts = []
 
         # Cron
-        if os.path.exists("/tmp/malicious.cron"):
-            artifacts.append("/tmp/malicious.cron")
+        cron = os.path.join(self.base_dir, "malicious.cron")
+        if os.path.exists(cron):
+            artifacts.append(cron)
 
         # Bashrc
-        if os.path.exists("/tmp/.bashrc_backdoor"):
-            artifacts.append("/tmp/.bashrc_backdoor")
+        bashrc = os.path.join(self.base_dir, ".bashrc_backdoor")
+        if os.path.exists(bashrc):
+            artifacts.append(bashrc)
 
         return artifacts
 
@@ -38,6 +38,22 @@ THREAT_FEEDS = {
     "Bambenek_C2": "https://osint.bambenekconsulting.com/feeds/c2-ipmasterlist.txt"
 }
 
+# IOC Aging (seconds). Sources not listed keep IOCs for IOC_DEFAULT_TTL
+# after they were last seen; confidence halves every half-life.
+IOC_DEFAULT_TTL = 7 * 86400
+IOC_SOURCE_TTLS = {
+    "Tor_Exit_Nodes": 1 * 86400,       # exit list churns daily
+    "OpenPhish": 2 * 86400,
+    "CINS_Army": 2 * 86400,
+    "GreenSnow": 2 * 86400,
+    "Blocklist_DE": 2 * 86400,
+    "IPSum_Aggregator": 3 * 86400,
+    "ThreatFox": 14 * 86400,
+    "MalwareBazaar": 30 * 86400,       # hashes don't go stale like IPs
+}
+IOC_CONFIDENCE_HALF_LIFE = 3 * 86400
+IOC_MAINTENANCE_INTERVAL = 600
+
 # AI Hyperparameters
 ALPHA = 0.4
 GAMMA = 0.9
@@ -8,22 +8,120 @@ import sqlite3
 import os
 import json
 import time
+import random
 import threading
+from contextlib import contextmanager
+from . import ip_codec
 
-DB_PATH = "simulation.db"
+# The repo-root database, whatever the working directory. ACE_DB_PATH
+# overrides it (tests and benchmarks point it at a scratch file).
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../", "simulation.db")
+
+# Applied to every pooled connection. WAL lets readers run alongside the
+# single writer; NORMAL sync is crash-safe in WAL mode and skips an fsync
+# per commit. auto_vacuum only takes effect on a new file, and must come
+# before the switch to WAL.
+PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # ~16 MB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+STATEMENT_CACHE_SIZE = 128
+BACKFILL_BATCH = 5000
+IP_BACKFILL_KEY = "schema.ip_columns_backfilled"
+SAMPLE_PROBES = 64    # random ids probed per round in sample_iocs
+SAMPLE_ROUNDS = 4
+MAX_SAMPLE_PROBES = 10000   # stays under SQLite's bound-parameter limit
+BASE_CONFIDENCE = 50   # confidence of a freshly seen IOC; decays with age
+# Bumped in the same transaction as every IOC insert or delete, so other
+# processes holding an in-memory index can tell it has gone stale.
+IOC_GENERATION_KEY = "ioc.generation"
+BUMP_IOC_GENERATION = '''
+    INSERT INTO sim_state (key, value, updated_at) VALUES (?, 1, ?)
+    ON CONFLICT(key) DO UPDATE SET value=value + 1, updated_at=excluded.updated_at
+'''
+
+# Seeing an IOC again refreshes both its age and its confidence.
+UPSERT_IOC = '''
+    INSERT INTO threat_intel (ioc, ioc_type, source, last_seen, confidence, ip_version, ip_lo, ip_hi)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ioc) DO UPDATE SET last_seen=excluded.last_seen, confidence=excluded.confidence
+'''
+
+def _ioc_rows(iocs, ioc_type, source, now):
+    """
+    Rows for UPSERT_IOC. IP and CIDR IOCs also carry their version and
+    16-byte packed first/last address; CIDRs are typed "cidr".
+    """
+    for ioc in iocs:
+        if ioc_type in ("ip", "cidr"):
+            version, lo, hi = ip_codec.encode(ioc)
+            row_type = "cidr" if '/' in ioc else "ip"
+            yield (ioc, row_type, source, now, BASE_CONFIDENCE, version, lo, hi)
+        else:
+            yield (ioc, ioc_type, source, now, BASE_CONFIDENCE, None, None, None)
 
 class DatabaseManager:
-    def __init__(self, db_path=DB_PATH):
-        self.db_path = db_path
-        self.lock = threading.Lock()
+    def __init__(self, db_path=None, pooled=True):
+        self.db_path = db_path or os.environ.get("ACE_DB_PATH", DB_PATH)
+        self.pooled = pooled
+        self.lock = threading.Lock()  # serializes writers only; readers never take it
+        self._local = threading.local()
+        self._sample_ids = {}   # ioc_type -> (IOC generation, ids), for sample_iocs on sparse types
         self._init_db()
 
     def _get_connection(self):
         return sqlite3.connect(self.db_path, check_same_thread=False)
 
-    def _init_db(self):
-        with self.lock:
+    def _open_pooled(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """
+        Yields this thread's persistent connection. With pooled=False it
+        falls back to the old connect-per-call behaviour (kept for benchmarks).
+        """
+        if not self.pooled:
             conn = self._get_connection()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = getattr(self._local, "conn", None)
+        # Never reuse a connection inherited across fork().
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open_pooled()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        yield conn
+
+    @contextmanager
+    def _writer(self):
+        """Connection inside a write transaction, committed on success."""
+        with self.lock, self._connection() as conn:
+            with conn:
+                yield conn
+
+    def close(self):
+        """Closes the calling thread's pooled connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _init_db(self):
+        with self._writer() as conn:
             cursor = conn.cursor()
 
             # Threat Intelligence Table
@@ -38,9 +136,17 @@ class DatabaseManager:
                 )
             ''')
 
+            # Packed address range (ip_lo..ip_hi) for IP and CIDR IOCs
+            columns = {row[1] for row in cursor.execute('PRAGMA table_info(threat_intel)')}
+            for column, decl in (("ip_version", "INTEGER"), ("ip_lo", "BLOB"), ("ip_hi", "BLOB")):
+                if column not in columns:
+                    cursor.execute(f'ALTER TABLE threat_intel ADD COLUMN {column} {decl}')
+
             # Indexes for speed
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_ioc ON threat_intel(ioc)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_type ON threat_intel(ioc_type)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_ip_range ON threat_intel(ip_version, ip_lo, ip_hi)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_source_seen ON threat_intel(source, last_seen)')
 
             # Simulation State Table (Key-Value)
             cursor.execute('''
@@ -62,8 +168,30 @@ class DatabaseManager:
                 )
             ''')
 
-            conn.commit()
-            conn.close()
+        if not self.get_state(IP_BACKFILL_KEY):
+            self._backfill_ip_columns()
+
+    def _backfill_ip_columns(self):
+        """
+        Encodes ip_lo/ip_hi for IP rows written before those columns existed,
+        one batch per transaction, then records that it is done.
+        """
+        last_id = 0
+        while True:
+            with self._writer() as conn:
+                rows = conn.execute('''
+                    SELECT id, ioc FROM threat_intel
+                    WHERE id > ? AND ip_version IS NULL AND ioc_type IN ('ip', 'cidr')
+                    ORDER BY id LIMIT ?
+                ''', (last_id, BACKFILL_BATCH)).fetchall()
+                if not rows: break
+                last_id = rows[-1][0]
+                updates = []
+                for row_id, ioc in rows:
+                    version, lo, hi = ip_codec.encode(ioc)
+                    updates.append((version, lo, hi, "cidr" if version and '/' in ioc else "ip", row_id))
+                conn.executemany('UPDATE threat_intel SET ip_version=?, ip_lo=?, ip_hi=?, ioc_type=? WHERE id=?', updates)
+        self.set_state(IP_BACKFILL_KEY, True)
 
     # --- THREAT INTEL OPS ---
 
@@ -74,58 +202,226 @@ class DatabaseManager:
         """
         if not iocs: return
 
-        with self.lock:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            now = time.time()
-
-            # Prepare data: (ioc, type, source, last_seen)
-            data = [(ioc, ioc_type, source, now) for ioc in iocs]
-
+        now = time.time()
+        with self._writer() as conn:
             # UPSERT logic (SQLite 3.24+)
-            cursor.executemany('''
-                INSERT INTO threat_intel (ioc, ioc_type, source, last_seen)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(ioc) DO UPDATE SET last_seen=excluded.last_seen
-            ''', data)
+            conn.executemany(UPSERT_IOC, _ioc_rows(iocs, ioc_type, source, now))
+            conn.execute(BUMP_IOC_GENERATION, (IOC_GENERATION_KEY, now))
 
-            conn.commit()
-            conn.close()
+    def add_ioc_groups(self, groups):
+        """
+        Bulk insert several IOC lists in one transaction.
+        groups: iterable of (iocs, ioc_type, source)
+        """
+        groups = [group for group in groups if group[0]]
+        if not groups: return  # nothing written, so nothing for the index to rebuild
+
+        now = time.time()
+        with self._writer() as conn:
+            for iocs, ioc_type, source in groups:
+                conn.executemany(UPSERT_IOC, _ioc_rows(iocs, ioc_type, source, now))
+            conn.execute(BUMP_IOC_GENERATION, (IOC_GENERATION_KEY, now))
 
     def get_random_ioc(self, ioc_type="ip"):
         """Get a random IOC of specific type."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT ioc FROM threat_intel WHERE ioc_type=? ORDER BY RANDOM() LIMIT 1', (ioc_type,))
-        row = cursor.fetchone()
-        conn.close()
-        return row[0] if row else None
+        sample = self.sample_iocs(ioc_type, 1)
+        return sample[0] if sample else None
+
+    def sample_iocs(self, ioc_type="ip", k=1):
+        """
+        k IOCs of `ioc_type` drawn with replacement. Random ids between the
+        type's first and last id are probed by primary key and the misses
+        (gaps, other types) rejected, so draws are uniform and no round scans
+        or sorts the table. If the type is too sparse for that, the rest are
+        drawn from the type's ids, read once through idx_type and cached
+        until the IOC generation changes.
+        """
+        if k <= 0: return []
+        with self._connection() as conn:
+            # idx_type holds (ioc_type, rowid), so each end is a single index seek.
+            first = conn.execute('SELECT id FROM threat_intel WHERE ioc_type=? ORDER BY id LIMIT 1',
+                                 (ioc_type,)).fetchone()
+            if first is None: return []
+            last = conn.execute('SELECT id FROM threat_intel WHERE ioc_type=? ORDER BY id DESC LIMIT 1',
+                                (ioc_type,)).fetchone()
+            lo, hi = first[0], last[0]
+            found = []
+            for _ in range(SAMPLE_ROUNDS):
+                probes = min(max(SAMPLE_PROBES, 2 * (k - len(found))), MAX_SAMPLE_PROBES)
+                ids = [random.randint(lo, hi) for _ in range(probes)]
+                # Unary + keeps the planner on rowid lookups instead of scanning idx_type.
+                hits = dict(conn.execute(
+                    f'SELECT id, ioc FROM threat_intel WHERE +ioc_type=? AND id IN ({",".join("?" * len(ids))})',
+                    (ioc_type, *ids)))
+                # Keep duplicate draws so sampling stays with replacement.
+                found.extend(hits[i] for i in ids if i in hits)
+                if len(found) >= k:
+                    return found[:k]
+            for refresh in (False, True):
+                ids = self._type_ids(ioc_type, refresh)
+                if not ids: break
+                draws = random.choices(ids, k=k - len(found))
+                hits = {}
+                unique = list(set(draws))
+                for i in range(0, len(unique), MAX_SAMPLE_PROBES):
+                    chunk = unique[i:i + MAX_SAMPLE_PROBES]
+                    hits.update(conn.execute(
+                        f'SELECT id, ioc FROM threat_intel WHERE id IN ({",".join("?" * len(chunk))})', chunk))
+                found.extend(hits[i] for i in draws if i in hits)
+                if len(found) >= k:
+                    break   # else some cached ids were deleted without a generation bump
+            return found[:k]
+
+    def _type_ids(self, ioc_type, refresh=False):
+        generation = self.ioc_generation()
+        cached = self._sample_ids.get(ioc_type)
+        if refresh or cached is None or cached[0] != generation:
+            with self._connection() as conn:
+                ids = [row[0] for row in conn.execute('SELECT id FROM threat_intel WHERE ioc_type=?', (ioc_type,))]
+            cached = self._sample_ids[ioc_type] = (generation, ids)
+        return cached[1]
 
     def is_malicious(self, ioc):
         """Check if IOC exists in DB."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT 1 FROM threat_intel WHERE ioc=? LIMIT 1', (ioc,))
-        exists = cursor.fetchone() is not None
-        conn.close()
-        return exists
+        with self._connection() as conn:
+            return conn.execute('SELECT 1 FROM threat_intel WHERE ioc=? LIMIT 1', (ioc,)).fetchone() is not None
+
+    def iocs_in_network(self, network):
+        """(ioc, ioc_type) for every IP/CIDR IOC that lies entirely inside `network`."""
+        parsed = ip_codec.parse_network(network)
+        if parsed is None: return []
+        version, first, last = parsed
+        with self._connection() as conn:
+            return conn.execute('''
+                SELECT ioc, ioc_type FROM threat_intel
+                WHERE ip_version=? AND ip_lo BETWEEN ? AND ? AND ip_hi <= ?
+            ''', (version, ip_codec.pack(first), ip_codec.pack(last), ip_codec.pack(last))).fetchall()
+
+    def matching_iocs(self, ip):
+        """(ioc, ioc_type) for the IP itself and every CIDR IOC that contains it."""
+        parsed = ip_codec.parse_ip(ip)
+        if parsed is None: return []
+        version, value = parsed
+        packed = ip_codec.pack(value)
+        with self._connection() as conn:
+            return conn.execute('''
+                SELECT ioc, ioc_type FROM threat_intel
+                WHERE ip_version=? AND ip_lo=? AND ip_hi=? AND ioc_type != 'cidr'
+                UNION ALL
+                SELECT ioc, ioc_type FROM threat_intel
+                WHERE ioc_type='cidr' AND ip_version=? AND ip_lo <= ? AND ip_hi >= ?
+            ''', (version, packed, packed, version, packed, packed)).fetchall()
+
+    def iter_iocs(self, batch_size=10000):
+        """Yields (ioc, ioc_type) for every IOC, fetched in batches."""
+        with self._connection() as conn:
+            cursor = conn.execute('SELECT ioc, ioc_type FROM threat_intel')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows: break
+                yield from rows
+
+    def ioc_generation(self):
+        """Counter that changes whenever any process inserts or deletes IOCs."""
+        with self._connection() as conn:
+            row = conn.execute('SELECT value FROM sim_state WHERE key=?', (IOC_GENERATION_KEY,)).fetchone()
+        return int(row[0]) if row else 0
 
     def count_iocs(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM threat_intel')
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        with self._connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM threat_intel').fetchone()[0]
+
+    # --- AGING / MAINTENANCE OPS ---
+    # Each call touches at most `limit` rows in its own short transaction,
+    # so callers can loop without holding the writer lock for long.
+
+    def sources(self):
+        with self._connection() as conn:
+            return [row[0] for row in conn.execute('SELECT DISTINCT source FROM threat_intel')]
+
+    def touch_source(self, source, since, now=None, limit=BACKFILL_BATCH):
+        """
+        Marks every IOC `source` wrote at or after `since` as seen again at
+        `now` (for feeds confirmed unchanged). Returns rows touched.
+        """
+        now = now or time.time()
+        total = 0
+        while True:
+            with self._writer() as conn:
+                n = conn.execute('''
+                    UPDATE threat_intel SET last_seen=?, confidence=? WHERE id IN (
+                        SELECT id FROM threat_intel WHERE source=? AND last_seen >= ? AND last_seen < ? LIMIT ?)
+                ''', (now, BASE_CONFIDENCE, source, since, now, limit)).rowcount
+            total += n
+            if n < limit:
+                return total
+
+    def prune_source(self, source, cutoff, limit=1000):
+        """Deletes up to `limit` IOCs from `source` last seen before `cutoff`. Returns rows deleted."""
+        with self._writer() as conn:
+            n = conn.execute('''
+                DELETE FROM threat_intel WHERE id IN (
+                    SELECT id FROM threat_intel WHERE source=? AND last_seen < ? LIMIT ?)
+            ''', (source, cutoff, limit)).rowcount
+            if n:
+                conn.execute(BUMP_IOC_GENERATION, (IOC_GENERATION_KEY, time.time()))
+            return n
+
+    def set_confidence(self, source, seen_from, seen_to, confidence, limit=1000):
+        """
+        Sets `confidence` on up to `limit` IOCs from `source` with
+        seen_from <= last_seen < seen_to that don't already have it.
+        """
+        with self._writer() as conn:
+            return conn.execute('''
+                UPDATE threat_intel SET confidence=? WHERE id IN (
+                    SELECT id FROM threat_intel
+                    WHERE source=? AND last_seen >= ? AND last_seen < ? AND confidence != ? LIMIT ?)
+            ''', (confidence, source, seen_from, seen_to, confidence, limit)).rowcount
+
+    def incremental_vacuum_enabled(self):
+        with self._connection() as conn:
+            return conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+
+    def enable_incremental_vacuum(self):
+        """
+        Converts a database created without auto_vacuum (one full VACUUM).
+        This holds the write lock for the whole rebuild, so it is an offline
+        step (ioc_maintenance --enable-incremental-vacuum), never run by the
+        hive. Returns True if a conversion ran.
+        """
+        with self.lock, self._connection() as conn:
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+                return False
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('VACUUM')
+            return True
+
+    def incremental_vacuum(self, pages):
+        """
+        Returns up to `pages` free pages to the filesystem. Returns pages
+        freed (always 0 on a database without incremental auto_vacuum).
+        """
+        with self.lock, self._connection() as conn:
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                return 0
+            before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            # execute() steps a pragma only once (one page); a script runs it to completion.
+            conn.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+            return before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+    def storage_stats(self):
+        with self._connection() as conn:
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            pages = conn.execute('PRAGMA page_count').fetchone()[0]
+            free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return {"bytes": page_size * pages, "pages": pages, "free_pages": free, "iocs": self.count_iocs()}
 
     # --- STATE OPS ---
 
     def get_state(self, key, default=None):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT value FROM sim_state WHERE key=?', (key,))
-        row = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            row = conn.execute('SELECT value FROM sim_state WHERE key=?', (key,)).fetchone()
         if row:
             try:
                 return json.loads(row[0])
@@ -134,28 +430,29 @@ class DatabaseManager:
         return default
 
     def set_state(self, key, value):
-        with self.lock:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            val_str = json.dumps(value)
-            cursor.execute('''
+        val_str = json.dumps(value)
+        with self._writer() as conn:
+            conn.execute('''
                 INSERT INTO sim_state (key, value, updated_at)
                 VALUES (?, ?, ?)
                 ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
             ''', (key, val_str, time.time()))
-            conn.commit()
-            conn.close()
 
     # --- LOGGING OPS ---
 
     def log_event(self, team, action, details):
-        with self.lock:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute('INSERT INTO event_log (timestamp, team, action, details) VALUES (?, ?, ?, ?)',
-                           (time.time(), team, action, details))
-            conn.commit()
-            conn.close()
+        with self._writer() as conn:
+            conn.execute('INSERT INTO event_log (timestamp, team, action, details) VALUES (?, ?, ?, ?)',
+                         (time.time(), team, action, details))
+
+    def log_events(self, rows):
+        """
+        Bulk insert event rows in one transaction.
+        rows: list of (timestamp, team, action, details)
+        """
+        if not rows: return
+        with self._writer() as conn:
+            conn.executemany('INSERT INTO event_log (timestamp, team, action, details) VALUES (?, ?, ?, ?)', rows)
 
 if __name__ == "__main__":
     db = DatabaseManager()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Event Log Writer
+Background thread that persists SignalBus events to event_log in large
+single-transaction batches, fed by a bounded queue.
+"""
+
+import json
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger("EventLogWriter")
+
+# Bus topic -> team recorded in event_log
+TOPIC_TEAMS = {
+    "ATTACK_LAUNCHED": "red",
+    "THREAT_MITIGATED": "blue",
+}
+
+
+class EventLogWriter:
+    """
+    Events are flushed when `batch_size` rows are pending or `flush_interval`
+    seconds have passed since the first pending row. When the queue is full,
+    log() waits up to `block_timeout` seconds (backpressure) and then drops
+    the event, counting it in metrics()["dropped"].
+    """
+    def __init__(self, db, max_queue=10000, batch_size=500, flush_interval=0.5, block_timeout=0.0):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._running = False
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    # --- PRODUCERS ---
+
+    def log(self, team, action, details):
+        """Queues one event. Returns False if it was dropped."""
+        row = (time.time(), team, action, details)
+        try:
+            if self.block_timeout > 0:
+                self._queue.put(row, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def subscribe(self, bus):
+        """Persists ATTACK_LAUNCHED / THREAT_MITIGATED events published on `bus`."""
+        for topic, team in TOPIC_TEAMS.items():
+            bus.subscribe(topic, self._handler(team, topic))
+
+    def _handler(self, team, topic):
+        def handle(data):
+            action = data.get("action", topic) if isinstance(data, dict) else topic
+            self.log(team, action, json.dumps(data, default=str))
+        return handle
+
+    # --- CONSUMER ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stops the thread after writing whatever is still queued."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while self._running or not self._queue.empty():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _collect(self):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval))
+        except queue.Empty:
+            return batch
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._running:
+                # Shutting down or out of time: take what is already queued.
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        try:
+            self.db.log_events(batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} events: {e}")
+            with self._stats_lock:
+                self.failed += len(batch)
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self.written += len(batch)
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+
+    def flush(self, timeout=5.0):
+        """Blocks until everything queued so far has been written (or timeout)."""
+        deadline = time.monotonic() + timeout
+        with self._stats_lock:
+            target = self.enqueued
+        while time.monotonic() < deadline:
+            with self._stats_lock:
+                if self.written + self.failed >= target:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def metrics(self):
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "last_flush_ms": self.last_flush_ms,
+                "max_flush_ms": self.max_flush_ms,
+                "avg_flush_ms": self._total_flush_ms / self.flushes if self.flushes else 0.0,
+            }
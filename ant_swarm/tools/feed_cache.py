@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Feed Cache
+Per-feed validators and parse results kept on disk (THREAT_FEED_CACHE) so
+an update can ask servers for changes only and skip feeds whose content
+has not moved.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+SPOOL_CHUNK = 64 * 1024
+
+
+class FeedCache:
+    """
+    {feed name: {url, etag, last_modified, sha256, ioc_type, count,
+    fetched_at, checked_at}}, saved atomically as JSON.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.entries, indent=2, sort_keys=True)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".feedcache-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+
+    def get(self, name, url):
+        """The entry for `name`, or None if it is missing or was for another URL."""
+        with self._lock:
+            entry = self.entries.get(name)
+        if entry and entry.get("url") == url:
+            return dict(entry)
+        return None
+
+    def conditional_headers(self, name, url):
+        entry = self.get(name, url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, name, **fields):
+        with self._lock:
+            entry = self.entries.setdefault(name, {})
+            entry.update(fields)
+            entry["checked_at"] = time.time()
+
+
+def spool(stream, chunk_size=SPOOL_CHUNK):
+    """
+    Copies a response body to an anonymous temp file while hashing it.
+    Returns (file positioned at 0, sha256 hex digest, size).
+    """
+    digest = hashlib.sha256()
+    size = 0
+    f = tempfile.TemporaryFile()
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+        f.seek(0)
+    except BaseException:
+        f.close()
+        raise
+    return f, digest.hexdigest(), size
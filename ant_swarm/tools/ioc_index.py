@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+IOC Index
+In-memory lookup structures for Threat Intel: a hash set per IOC type
+and a binary radix trie for CIDR ranges. Built from the database in one
+pass and swapped in whole. Each type also keeps its IOCs in a list for O(1) uniform sampling.
+"""
+
+import time
+import random
+import ipaddress
+from .ip_codec import parse_ip
+
+
+class CIDRTrie:
+    """
+    Binary radix trie of network prefixes, one root per IP version.
+    A node is [zero child, one child, terminal flag].
+    """
+    def __init__(self):
+        self._roots = {4: [None, None, False], 6: [None, None, False]}
+        self._max_prefix = {4: -1, 6: -1}
+        self.count = 0
+
+    def add(self, network):
+        net = ipaddress.ip_network(network, strict=False)
+        bits = net.max_prefixlen
+        value = int(net.network_address)
+        node = self._roots[net.version]
+        for i in range(net.prefixlen):
+            b = (value >> (bits - 1 - i)) & 1
+            if node[b] is None:
+                node[b] = [None, None, False]
+            node = node[b]
+        node[2] = True
+        self._max_prefix[net.version] = max(self._max_prefix[net.version], net.prefixlen)
+        self.count += 1
+
+    def match(self, version, value):
+        """True if the integer address `value` falls inside any stored prefix."""
+        node = self._roots[version]
+        bits = 32 if version == 4 else 128
+        for i in range(self._max_prefix[version] + 1):
+            if node[2]:
+                return True
+            if i == bits:
+                break
+            node = node[(value >> (bits - 1 - i)) & 1]
+            if node is None:
+                return False
+        return False
+
+
+class IOCIndex:
+    def __init__(self):
+        self.sets = {}          # ioc_type -> set of IOCs
+        self.arrays = {}        # ioc_type -> list of the same IOCs, for sampling
+        self.ranges = CIDRTrie()
+        self.built_at = 0.0
+
+    @classmethod
+    def build(cls, rows):
+        """Builds an index from (ioc, ioc_type) rows."""
+        index = cls()
+        for ioc, ioc_type in rows:
+            if '/' in ioc:
+                try: index.ranges.add(ioc)
+                except ValueError: pass
+            else:
+                index.sets.setdefault(ioc_type, set()).add(ioc)
+
+        index.arrays = {ioc_type: list(iocs) for ioc_type, iocs in index.sets.items()}
+        index.built_at = time.time()
+        return index
+
+    def __len__(self):
+        return sum(len(s) for s in self.sets.values()) + self.ranges.count
+
+    def lookup(self, ioc):
+        """Returns the IOC type of a match ("cidr" for range hits) or None."""
+        for ioc_type, iocs in self.sets.items():
+            if ioc in iocs:
+                return ioc_type
+        if self.ranges.count:
+            parsed = parse_ip(ioc)
+            if parsed and self.ranges.match(*parsed):
+                return "cidr"
+        return None
+
+    def contains(self, ioc):
+        return self.lookup(ioc) is not None
+
+    def lookup_many(self, iocs):
+        """Returns {ioc: ioc_type} for every IOC in `iocs` that is known."""
+        hits = {}
+        for ioc in iocs:
+            if ioc in hits:
+                continue
+            ioc_type = self.lookup(ioc)
+            if ioc_type is not None:
+                hits[ioc] = ioc_type
+        return hits
+
+    def sample(self, ioc_type, k=1):
+        """k IOCs of `ioc_type` drawn uniformly with replacement ([] if there are none)."""
+        iocs = self.arrays.get(ioc_type)
+        if not iocs:
+            return []
+        return random.choices(iocs, k=k)
+
+    def choice(self, ioc_type):
+        """One uniformly random IOC of `ioc_type`, or None."""
+        iocs = self.arrays.get(ioc_type)
+        return iocs[random.randrange(len(iocs))] if iocs else None
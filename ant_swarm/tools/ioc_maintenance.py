@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+IOC Maintenance
+Background aging for the threat_intel table: confidence decays with the
+time since an IOC was last seen, IOCs past their source's TTL are deleted,
+and freed pages are handed back with incremental_vacuum. All work is done
+in small chunks, each in its own transaction, with a pause in between so
+ingest and event writers are never locked out for long.
+
+Databases created before auto_vacuum was enabled are not vacuumed until
+they are converted offline, with the hive stopped:
+
+    python -m ant_swarm.tools.ioc_maintenance --enable-incremental-vacuum
+"""
+
+import math
+import time
+import logging
+import argparse
+import threading
+
+from .db_manager import DatabaseManager, BASE_CONFIDENCE
+
+try:
+    from . import config
+except ImportError:
+    class Config:
+        IOC_DEFAULT_TTL = 7 * 86400
+        IOC_SOURCE_TTLS = {}
+        IOC_CONFIDENCE_HALF_LIFE = 3 * 86400
+        IOC_MAINTENANCE_INTERVAL = 600
+    config = Config()
+
+logger = logging.getLogger("IOCMaintenance")
+
+CHUNK_SIZE = 1000
+VACUUM_PAGES = 256
+CHUNK_PAUSE = 0.01
+
+
+def confidence_bands(half_life, base=BASE_CONFIDENCE):
+    """
+    [(min_age, max_age, confidence)] covering every age, where confidence
+    is round(base * 0.5 ** (age / half_life)).
+    """
+    bands = []
+    lower = 0.0
+    for c in range(base, 0, -1):
+        upper = half_life * math.log2(base / (c - 0.5))
+        bands.append((lower, upper, c))
+        lower = upper
+    bands.append((lower, math.inf, 0))
+    return bands
+
+
+class IOCMaintenance:
+    def __init__(self, db, source_ttls=None, default_ttl=None, half_life=None,
+                 interval=None, chunk_size=CHUNK_SIZE, vacuum_pages=VACUUM_PAGES,
+                 pause=CHUNK_PAUSE, on_pruned=None):
+        self.db = db
+        self.source_ttls = config.IOC_SOURCE_TTLS if source_ttls is None else source_ttls
+        self.default_ttl = default_ttl or config.IOC_DEFAULT_TTL
+        self.half_life = half_life or config.IOC_CONFIDENCE_HALF_LIFE
+        self.interval = interval or config.IOC_MAINTENANCE_INTERVAL
+        self.chunk_size = chunk_size
+        self.vacuum_pages = vacuum_pages
+        self.pause = pause
+        self.on_pruned = on_pruned
+        self.bands = confidence_bands(self.half_life)
+        self._stop = threading.Event()
+        self.thread = None
+        self.last_run = None
+
+    def ttl(self, source):
+        return self.source_ttls.get(source, self.default_ttl)
+
+    def _chunked(self, fn, *args):
+        """Repeats a bounded DB op until it touches fewer than chunk_size rows."""
+        total = 0
+        while not self._stop.is_set():
+            n = fn(*args, limit=self.chunk_size)
+            total += n
+            if n < self.chunk_size:
+                break
+            time.sleep(self.pause)
+        return total
+
+    def decay(self, now):
+        """Brings every IOC's confidence in line with its age. Returns rows updated."""
+        updated = 0
+        for source in self.db.sources():
+            for min_age, max_age, confidence in self.bands:
+                seen_from = now - max_age if max_age != math.inf else -math.inf
+                updated += self._chunked(self.db.set_confidence, source, seen_from, now - min_age, confidence)
+        return updated
+
+    def prune(self, now):
+        """Deletes IOCs past their source's TTL. Returns rows deleted."""
+        return sum(self._chunked(self.db.prune_source, source, now - self.ttl(source))
+                   for source in self.db.sources())
+
+    def vacuum(self):
+        """Frees pages in VACUUM_PAGES steps until the freelist is empty (if the DB supports it)."""
+        freed = 0
+        while not self._stop.is_set():
+            n = self.db.incremental_vacuum(self.vacuum_pages)
+            freed += n
+            if n < self.vacuum_pages:
+                break
+            time.sleep(self.pause)
+        return freed
+
+    def run_once(self, now=None):
+        now = now or time.time()
+        start = time.perf_counter()
+        stats = {"decayed": self.decay(now), "pruned": self.prune(now)}
+        stats["freed_pages"] = self.vacuum()
+        stats.update(self.db.storage_stats())
+        stats["elapsed"] = time.perf_counter() - start
+        self.last_run = stats
+        if stats["pruned"]:
+            logger.info(f"Pruned {stats['pruned']} stale IOCs, freed {stats['freed_pages']} pages")
+            if self.on_pruned:
+                self.on_pruned(stats["pruned"])
+        return stats
+
+    def start(self):
+        if self.thread: return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="IOCMaintenance")
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"IOC maintenance failed: {e}")
+            self._stop.wait(self.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IOC aging and storage maintenance")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="convert a legacy database with one full VACUUM (stop the hive first)")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    if args.enable_incremental_vacuum:
+        converted = db.enable_incremental_vacuum()
+        print("[IOCMaintenance] Converted to incremental auto_vacuum" if converted
+              else "[IOCMaintenance] Incremental auto_vacuum already enabled")
+        return
+    if not db.incremental_vacuum_enabled():
+        print("[IOCMaintenance] auto_vacuum is off: freed pages stay in the file "
+              "until --enable-incremental-vacuum is run")
+    print(f"[IOCMaintenance] {IOCMaintenance(db).run_once()}")
+
+
+if __name__ == "__main__":
+    main()
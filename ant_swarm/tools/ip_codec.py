@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+IP Codec
+Integer/packed encodings for IP and CIDR IOCs, and validation against
+precomputed tables of non-public ranges. The tables are built once from
+the same ranges ipaddress uses, then checked with bisect on plain
+integers, so results match ipaddress without building objects.
+"""
+
+import socket
+import bisect
+import ipaddress
+
+PACKED_LEN = 16  # every address is stored as 16 big-endian bytes
+
+
+def parse_ip(ioc):
+    """(version, int) for an IP literal, or None. inet_pton is far cheaper than ipaddress."""
+    for family, version in ((socket.AF_INET, 4), (socket.AF_INET6, 6)):
+        try:
+            return version, int.from_bytes(socket.inet_pton(family, ioc), 'big')
+        except (OSError, ValueError, TypeError):
+            continue
+    return None
+
+
+def parse_network(ioc):
+    """(version, first, last) for an IP or CIDR literal (host bits ignored), or None."""
+    if '/' not in ioc:
+        parsed = parse_ip(ioc)
+        return parsed and (parsed[0], parsed[1], parsed[1])
+    addr, _, prefix = ioc.partition('/')
+    parsed = parse_ip(addr)
+    if parsed is None or not prefix.isdigit():
+        return None
+    version, value = parsed
+    bits = 32 if version == 4 else 128
+    prefix = int(prefix)
+    if prefix > bits:
+        return None
+    host = (1 << (bits - prefix)) - 1
+    first = value & ~host
+    return version, first, first | host
+
+
+def pack(value):
+    return value.to_bytes(PACKED_LEN, 'big')
+
+
+class RangeTable:
+    """Sorted, merged [first, last] integer ranges with O(log n) lookups."""
+    def __init__(self, networks=()):
+        ranges = sorted((int(n.network_address), int(n.broadcast_address)) for n in networks)
+        merged = []
+        for first, last in ranges:
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+        self.starts = [r[0] for r in merged]
+        self.ends = [r[1] for r in merged]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def contains(self, value):
+        i = bisect.bisect_right(self.starts, value) - 1
+        return i >= 0 and value <= self.ends[i]
+
+    def overlaps(self, first, last):
+        i = bisect.bisect_right(self.starts, last) - 1
+        return i >= 0 and self.ends[i] >= first
+
+
+# Non-public ranges, as the ipaddress is_* properties define them (IANA
+# special-purpose registries, Python 3.11). Kept here rather than read
+# from ipaddress's private _IPv4Constants/_IPv6Constants.
+IPV4_BLOCKED = (   # loopback, link-local, multicast, reserved
+    "127.0.0.0/8", "169.254.0.0/16", "224.0.0.0/4", "240.0.0.0/4",
+)
+IPV4_PRIVATE = (
+    "0.0.0.0/8", "10.0.0.0/8", "127.0.0.0/8", "169.254.0.0/16", "172.16.0.0/12",
+    "192.0.0.0/29", "192.0.0.170/31", "192.0.2.0/24", "192.168.0.0/16", "198.18.0.0/15",
+    "198.51.100.0/24", "203.0.113.0/24", "240.0.0.0/4", "255.255.255.255/32",
+)
+IPV6_BLOCKED = (   # loopback, link-local, multicast, reserved
+    "::1/128", "fe80::/10", "ff00::/8",
+    "::/8", "100::/8", "200::/7", "400::/6", "800::/5", "1000::/4", "4000::/3", "6000::/3",
+    "8000::/3", "a000::/3", "c000::/3", "e000::/4", "f000::/5", "f800::/6", "fe00::/9",
+)
+IPV6_PRIVATE = (
+    "::1/128", "::/128", "::ffff:0:0/96", "100::/64", "2001::/23", "2001:2::/48",
+    "2001:db8::/32", "2001:10::/28", "fc00::/7", "fe80::/10",
+)
+
+
+class _VersionTables:
+    """An address is rejected if it is in `blocked` or in `private`."""
+    def __init__(self, blocked, private):
+        self.blocked = RangeTable(ipaddress.ip_network(n) for n in blocked)
+        self.private = RangeTable(ipaddress.ip_network(n) for n in private)
+
+    def is_private(self, value):
+        return self.private.contains(value)
+
+    def is_public_range(self, first, last):
+        """Conservative: any overlap with a non-public range rejects the whole network."""
+        return not (self.blocked.overlaps(first, last) or self.private.overlaps(first, last))
+
+
+TABLES = {
+    4: _VersionTables(IPV4_BLOCKED, IPV4_PRIVATE),
+    6: _VersionTables(IPV6_BLOCKED, IPV6_PRIVATE),
+}
+
+
+def is_public_ip(ioc):
+    """True for a routable IP literal (same answer as the ipaddress is_* checks)."""
+    parsed = parse_ip(ioc)
+    if parsed is None:
+        return False
+    version, value = parsed
+    if version == 4 and value == 0:
+        return False
+    if TABLES[version].blocked.contains(value):
+        return False
+    if version == 6 and value >> 32 == 0xFFFF:
+        # ipaddress judges IPv4-mapped addresses by their IPv4 privacy.
+        return not TABLES[4].is_private(value & 0xFFFFFFFF)
+    return not TABLES[version].is_private(value)
+
+
+def is_public_network(ioc):
+    """True for a CIDR literal whose whole range is public."""
+    parsed = parse_network(ioc)
+    return parsed is not None and TABLES[parsed[0]].is_public_range(parsed[1], parsed[2])
+
+
+def encode(ioc):
+    """(version, packed first, packed last) for IP/CIDR IOCs, else (None, None, None)."""
+    parsed = parse_network(ioc)
+    if parsed is None:
+        return None, None, None
+    version, first, last = parsed
+    return version, pack(first), pack(last)
@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+Job Manager
+Runs long-lived tool commands off the request thread. Submitting returns a
+job immediately; jobs run on a bounded pool with a concurrency limit per
+tool, stream their stdout line by line, and finished results are cached
+for a TTL. An identical command that is already queued or running is
+joined instead of started again.
+
+With a spool directory, each job also mirrors its status and stdout to
+disk so that sibling worker processes (pre-fork servers) can serve it,
+and any of them can cancel it by dropping a marker file that the owning
+process polls for. The spool also makes the per-tool limits and the
+deduplication hold across those processes: a running job holds a
+<tool>.slot<n> file, and <hash>.key points at the newest job for a
+command. Both are claimed under a lock on the spool directory.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import fcntl
+import hashlib
+import logging
+import threading
+import subprocess
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("JobManager")
+
+MAX_WORKERS = 4
+DEFAULT_TOOL_LIMIT = 1
+RESULT_TTL = 60.0
+JOB_TIMEOUT = 30
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+SPOOL_POLL_INTERVAL = 0.2
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_spool(prefix):
+    for suffix in (".json", ".out", ".cancel"):
+        try: os.remove(prefix + suffix)
+        except OSError: pass
+
+
+class Job:
+    def __init__(self, tool, commands, timeout):
+        self.id = uuid.uuid4().hex
+        self.tool = tool
+        self.commands = commands
+        self.timeout = timeout
+        self.key = (tool, tuple(tuple(c) for c in commands))
+        self.status = QUEUED
+        self.output = []
+        self.result_offset = 0   # where the last command's output starts in `output`
+        self.error = ""
+        self.returncode = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.process = None
+        self.cancelled = False
+        self.pid = os.getpid()
+        self.slot = None         # the concurrency slot this job holds while running
+        self.spool = None
+        self._out = None
+        self._cond = threading.Condition()
+
+    def attach_spool(self, prefix):
+        """Mirrors this job to <prefix>.json (status) and <prefix>.out (stdout)."""
+        self.spool = prefix
+        self._out = open(prefix + ".out", "w", buffering=1)
+        self._write_status()
+
+    def _write_status(self):
+        if self.spool is None: return
+        info = self.to_dict(since=len(self.output))
+        del info["output"]
+        tmp = self.spool + ".json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(info, f)
+        os.replace(tmp, self.spool + ".json")
+
+    def _start(self):
+        self.started = time.time()
+        self.status = RUNNING
+        self._write_status()
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def _begin_command(self):
+        """Output from earlier, failed commands stays streamable but is left out of result()."""
+        with self._cond:
+            self.result_offset = len(self.output)
+
+    def _append(self, line):
+        with self._cond:
+            self.output.append(line)
+            if self._out is not None:
+                self._out.write(line + "\n")
+            self._cond.notify_all()
+
+    def _finish(self, status, returncode=None, error=""):
+        with self._cond:
+            self.status = status
+            self.returncode = returncode
+            self.error = error
+            self.finished = time.time()
+            if self._out is not None:
+                self._out.close()
+                self._out = None
+            # Spool before waking waiters so other processes never lag them.
+            self._write_status()
+            self._cond.notify_all()
+
+    def remove_spool(self):
+        if self.spool is not None:
+            _remove_spool(self.spool)
+
+    def wait(self, timeout=None):
+        """Blocks until the job finishes. Returns True if it did."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.done, timeout)
+
+    def follow(self, since=0, timeout=None):
+        """
+        Yields stdout lines from index `since` as they arrive, until the job
+        finishes. `timeout` bounds each wait for a new line.
+        """
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self.output) > since or self.done, timeout)
+                lines = self.output[since:]
+                finished = self.done
+            if not lines and not finished:
+                return  # timed out waiting
+            yield from lines
+            since += len(lines)
+            if finished and since >= len(self.output):
+                return
+
+    def result(self):
+        """Same shape as api.run_command's result."""
+        return {
+            "success": self.status == DONE,
+            "output": "\n".join(self.output[self.result_offset:]).strip(),
+            "error": self.error
+        }
+
+    def to_dict(self, since=0):
+        with self._cond:
+            return {
+                "job_id": self.id,
+                "tool": self.tool,
+                "pid": self.pid,
+                "status": self.status,
+                "returncode": self.returncode,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+                "offset": len(self.output),
+                "result_offset": self.result_offset,
+                "output": self.output[since:],
+                "error": self.error
+            }
+
+
+class SpooledJob:
+    """
+    Read-only view of a job owned by another process, rebuilt from its
+    spool files. Offers the same read methods as Job, polling for changes.
+    """
+    def __init__(self, prefix):
+        self.spool = prefix
+        self._refresh()
+
+    @classmethod
+    def load(cls, spool_dir, job_id):
+        if not JOB_ID_RE.match(job_id):
+            return None
+        prefix = os.path.join(spool_dir, job_id)
+        try:
+            return cls(prefix)
+        except (OSError, ValueError):
+            return None
+
+    def _refresh(self):
+        with open(self.spool + ".json") as f:
+            self.info = json.load(f)
+        if self.info["status"] not in FINISHED and not _pid_alive(self.info.get("pid", os.getpid())):
+            # Its worker died mid-job; nothing will ever finish it.
+            self.info.update(status=FAILED, error="Worker exited")
+        try:
+            with open(self.spool + ".out") as f:
+                self.output = f.read().splitlines()
+        except OSError:
+            self.output = []
+
+    @property
+    def id(self):
+        return self.info["job_id"]
+
+    @property
+    def status(self):
+        return self.info["status"]
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(SPOOL_POLL_INTERVAL)
+            self._refresh()
+        return True
+
+    def follow(self, since=0, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._refresh()
+            lines = self.output[since:]
+            if lines:
+                yield from lines
+                since += len(lines)
+                deadline = None if timeout is None else time.monotonic() + timeout
+            if self.done and since >= len(self.output):
+                return
+            if not lines:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                time.sleep(SPOOL_POLL_INTERVAL)
+
+    def result(self):
+        return {
+            "success": self.status == DONE,
+            "output": "\n".join(self.output[self.info.get("result_offset", 0):]).strip(),
+            "error": self.info["error"]
+        }
+
+    def to_dict(self, since=0):
+        return {**self.info, "offset": len(self.output), "output": self.output[since:]}
+
+
+class JobManager:
+    def __init__(self, max_workers=MAX_WORKERS, tool_limits=None, default_limit=DEFAULT_TOOL_LIMIT,
+                 result_ttl=RESULT_TTL, timeout=JOB_TIMEOUT, spool_dir=None):
+        self.spool_dir = spool_dir
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+        self.tool_limits = dict(tool_limits or {})
+        self.default_limit = default_limit
+        self.result_ttl = result_ttl
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = {}          # job_id -> Job
+        self._by_key = {}        # (tool, commands) -> newest Job
+        self._running = {}       # tool -> running count (without a spool)
+        self._pending = {}       # tool -> deque of queued Jobs
+        self.stats = {"submitted": 0, "started": 0, "deduped": 0, "cached": 0}
+        self._stopped = threading.Event()
+        self._swept = time.monotonic()
+        if spool_dir:
+            threading.Thread(target=self._watch_spool, daemon=True, name="job-spool").start()
+
+    def submit(self, tool, command, fallbacks=(), timeout=None):
+        """
+        Queues `command` (an argv list) under `tool`'s concurrency limit.
+        `fallbacks` are argv lists tried in order if it fails. Returns the
+        Job, which may be an in-flight or cached one for the same command
+        (a SpooledJob if another process sharing the spool runs it).
+        """
+        commands = [list(command)] + [list(c) for c in fallbacks]
+        timeout = timeout or self.timeout
+        with self._lock, self._spool_lock():
+            self._expire()
+            key = (tool, tuple(tuple(c) for c in commands))
+            existing = self._by_key.get(key) or self._spooled_by_key(key)
+            if existing is not None and not (existing.done and existing.status != DONE):
+                self.stats["cached" if existing.done else "deduped"] += 1
+                return existing
+            job = Job(tool, commands, timeout)
+            if self.spool_dir:
+                job.attach_spool(os.path.join(self.spool_dir, job.id))
+                with open(self._key_path(key), "w") as f:
+                    f.write(job.id)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self.stats["submitted"] += 1
+            self._dispatch(job)
+        return job
+
+    @contextmanager
+    def _spool_lock(self):
+        """Serializes slot and key claims with the other processes sharing the spool."""
+        if not self.spool_dir:
+            yield
+            return
+        with open(os.path.join(self.spool_dir, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _key_path(self, key):
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()
+        return os.path.join(self.spool_dir, digest + ".key")
+
+    def _spooled_by_key(self, key):
+        """Another process's newest job for `key`, if its spool is still there."""
+        if not self.spool_dir:
+            return None
+        try:
+            with open(self._key_path(key)) as f:
+                job_id = f.read().strip()
+        except OSError:
+            return None
+        return SpooledJob.load(self.spool_dir, job_id)
+
+    def get(self, job_id):
+        """The Job, a SpooledJob view if another process owns it, or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.spool_dir:
+            job = SpooledJob.load(self.spool_dir, job_id)
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued or running job. A job owned by another process is
+        cancelled through the spool: a <job_id>.cancel marker that the
+        owner acts on within SPOOL_POLL_INTERVAL.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.spool_dir:
+            return self._request_cancel(job_id)
+        if job is None or job.done:
+            return False
+        with self._lock:
+            job.cancelled = True
+            pending = self._pending.get(job.tool)
+            if pending and job in pending:
+                pending.remove(job)
+                job._finish(CANCELLED, error="Cancelled")
+                return True
+        if job.process is not None:
+            job.process.kill()
+        return True
+
+    def _request_cancel(self, job_id):
+        view = SpooledJob.load(self.spool_dir, job_id)
+        if view is None or view.done:
+            return False
+        try:
+            with open(view.spool + ".cancel", "w"):
+                pass
+        except OSError:
+            return False
+        return True
+
+    def _watch_spool(self):
+        """
+        Every SPOOL_POLL_INTERVAL: acts on cancel markers, starts queued jobs
+        if other processes freed slots, and drops expired results even when
+        no new jobs arrive.
+        """
+        while not self._stopped.wait(SPOOL_POLL_INTERVAL):
+            with self._lock:
+                jobs = [j for j in self._jobs.values() if not j.done]
+                self._expire()
+                if any(self._pending.values()):
+                    with self._spool_lock():
+                        self._dispatch_pending()
+            for job in jobs:
+                if os.path.exists(job.spool + ".cancel"):
+                    self.cancel(job.id)
+            if time.monotonic() - self._swept >= max(self.result_ttl, SPOOL_POLL_INTERVAL):
+                self._swept = time.monotonic()
+                self._sweep_spool()
+
+    def _sweep_spool(self):
+        """Removes expired jobs, and key files, left behind by processes that have exited."""
+        cutoff = time.time() - self.result_ttl
+        for name in os.listdir(self.spool_dir):
+            stem, ext = os.path.splitext(name)
+            path = os.path.join(self.spool_dir, name)
+            try:
+                if ext == ".key":
+                    with open(path) as f:
+                        if not os.path.exists(os.path.join(self.spool_dir, f.read().strip() + ".json")):
+                            os.remove(path)
+                    continue
+                if ext != ".json" or not JOB_ID_RE.match(stem):
+                    continue
+                view = SpooledJob(os.path.join(self.spool_dir, stem))
+                if view.info.get("pid") in (None, os.getpid()) or _pid_alive(view.info["pid"]):
+                    continue   # its owner expires it
+                if (view.info["finished"] or os.path.getmtime(path)) < cutoff:
+                    _remove_spool(view.spool)
+            except (OSError, ValueError):
+                continue
+
+    def shutdown(self, wait=True):
+        self._stopped.set()
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if not j.done]
+        for job in jobs:
+            self.cancel(job.id)
+        self.pool.shutdown(wait=wait)
+
+    def _limit(self, tool):
+        return self.tool_limits.get(tool, self.default_limit)
+
+    def _claim(self, tool):
+        """
+        Takes one of `tool`'s slots, or returns None if all are taken. With a
+        spool a slot is a <tool>.slot<n> file holding the owner's pid, so the
+        limit covers every process sharing it; a dead owner's slot is taken
+        over. Caller holds self._lock and the spool lock.
+        """
+        limit = self._limit(tool)
+        if not self.spool_dir:
+            if self._running.get(tool, 0) >= limit:
+                return None
+            self._running[tool] = self._running.get(tool, 0) + 1
+            return tool
+        for n in range(limit):
+            path = os.path.join(self.spool_dir, f"{tool}.slot{n}")
+            try:
+                with open(path) as f:
+                    owner = int(f.read())
+                if _pid_alive(owner):
+                    continue
+            except (OSError, ValueError):
+                pass
+            with open(path, "w") as f:
+                f.write(str(os.getpid()))
+            return path
+        return None
+
+    def _free(self, job):
+        # Caller holds self._lock.
+        if self.spool_dir:
+            try: os.remove(job.slot)
+            except OSError: pass
+        else:
+            self._running[job.tool] -= 1
+        job.slot = None
+
+    def _dispatch(self, job):
+        # Caller holds self._lock (and the spool lock).
+        pending = self._pending.setdefault(job.tool, deque())
+        pending.append(job)
+        if len(pending) == 1:
+            self._dispatch_pending()
+
+    def _dispatch_pending(self):
+        # Caller holds self._lock and the spool lock. Starts queued jobs, oldest first, while slots last.
+        for pending in self._pending.values():
+            while pending:
+                slot = self._claim(pending[0].tool)
+                if slot is None:
+                    break
+                job = pending.popleft()
+                job.slot = slot
+                self.stats["started"] += 1
+                self.pool.submit(self._run, job)
+
+    def _release(self, job):
+        with self._lock, self._spool_lock():
+            self._free(job)
+            self._dispatch_pending()
+
+    def _expire(self):
+        # Caller holds self._lock. Drops finished jobs older than the TTL.
+        cutoff = time.time() - self.result_ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.finished < cutoff:
+                del self._jobs[job_id]
+                job.remove_spool()
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+                if self.spool_dir:
+                    self._drop_key(job)
+
+    def _drop_key(self, job):
+        path = self._key_path(job.key)
+        try:
+            with open(path) as f:
+                if f.read().strip() == job.id:
+                    os.remove(path)
+        except OSError:
+            pass
+
+    def _run(self, job):
+        job._start()
+        try:
+            status, returncode, error = FAILED, None, ""
+            for command in job.commands:
+                if job.cancelled:
+                    break
+                job._begin_command()
+                status, returncode, error = self._execute(job, command)
+                if status == DONE:
+                    break
+            if job.cancelled:
+                status, error = CANCELLED, "Cancelled"
+            job._finish(status, returncode, error)
+        except Exception as e:
+            logger.error(f"Job {job.id} crashed: {e}")
+            job._finish(FAILED, error=str(e))
+        finally:
+            self._release(job)
+
+    def _execute(self, job, command):
+        logger.info(f"Executing: {' '.join(command)}")
+        try:
+            proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    text=True, bufsize=1)
+        except FileNotFoundError:
+            return FAILED, None, f"Command not found: {command[0]}"
+        except OSError as e:
+            return FAILED, None, str(e)
+
+        job.process = proc
+        if job.cancelled:
+            proc.kill()
+        stderr = []
+        drain = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+        drain.start()
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(job.timeout, expire)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                job._append(line.rstrip("\n"))
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            drain.join()
+            job.process = None
+
+        error = "".join(stderr).strip()
+        if timed_out.is_set():
+            return FAILED, returncode, f"Timed out after {job.timeout}s"
+        return (DONE if returncode == 0 else FAILED), returncode, error
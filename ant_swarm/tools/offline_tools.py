@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Offline Tools
+Headless stand-ins for the host-facing Red/Blue tools. Used by the
+simulation engine so training never shells out, opens sockets or walks /proc.
+"""
+
+import platform
+
+
+class OfflineSurveyor:
+    def collect_system_info(self):
+        return {"os": platform.system(), "hostname": "sim-host", "users": [], "network": []}
+
+
+class OfflineSniffer:
+    def scan_active_services(self):
+        return {}
+
+
+class OfflineTraffic:
+    def send_http_beacon(self, ip, port=443):
+        # Same outcome as the safety interlock's refused sinkhole connection.
+        return 0
+
+
+class OfflineAuditor:
+    def scan_proc(self):
+        return []
+
+
+class OfflineHunter:
+    def analyze_network(self, ti_module):
+        return []
+
+
+class OfflineIntel:
+    C2_IP = "192.0.2.1"  # TEST-NET-1, never routable
+
+    def get_c2_ip(self):
+        return self.C2_IP
+
+    def get_malicious_domain(self):
+        return None
+
+    def is_known_threat(self, ioc):
+        return False
+
+    def lookup_many(self, iocs):
+        return {}
+
+
+# Agent attribute -> offline replacement
+OFFLINE_TOOLS = {
+    "surveyor": OfflineSurveyor,
+    "sniffer": OfflineSniffer,
+    "traffic": OfflineTraffic,
+    "auditor": OfflineAuditor,
+    "hunter": OfflineHunter,
+    "ti": OfflineIntel,
+}
+
+
+def make_headless(agent):
+    """Swaps an agent's host-facing tools for offline stand-ins."""
+    for attr, factory in OFFLINE_TOOLS.items():
+        if hasattr(agent, attr):
+            setattr(agent, attr, factory())
+    return agent
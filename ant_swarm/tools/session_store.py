@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Session Store
+SQLite-backed sessions for utils.manage_session. Each touch is one short
+IMMEDIATE transaction on a single row (primary-key upsert), and expiry is
+an indexed column, so garbage collection only ever visits sessions that
+have actually expired, a bounded batch at a time. Safe across threads
+(one connection each) and processes (SQLite file locking, WAL).
+
+Given a json_path, the store also rewrites that file from its rows after
+every touch, for readers of the old sessions.json; deleting the file
+clears the store, as it used to log everyone out.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger("SessionStore")
+
+DEFAULT_SESSION_TIMEOUT = 1800  # 30 minutes
+SWEEP_BATCH = 256        # expired sessions removed per touch
+BUSY_TIMEOUT = 30.0      # seconds to wait for another process's write lock
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+)
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS sessions (
+           session_id TEXT PRIMARY KEY,
+           created_at REAL NOT NULL,
+           last_accessed REAL NOT NULL,
+           status TEXT NOT NULL,
+           timeout NUMERIC NOT NULL,
+           expires_at REAL NOT NULL
+       ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS idx_sessions_expiry ON sessions(expires_at)',
+)
+
+# Refreshing an existing session keeps its created_at.
+UPSERT_SESSION = '''
+    INSERT INTO sessions (session_id, created_at, last_accessed, status, timeout, expires_at)
+    VALUES (?, ?, ?, 'active', ?, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        last_accessed=excluded.last_accessed, status='active',
+        timeout=excluded.timeout, expires_at=excluded.expires_at
+'''
+
+
+def _as_dict(row):
+    created_at, last_accessed, status, timeout = row
+    return {
+        'created_at': created_at,
+        'last_accessed': last_accessed,
+        'status': status,
+        'timeout': timeout
+    }
+
+
+class SessionStore:
+    def __init__(self, path, sweep_batch=SWEEP_BATCH, json_path=None):
+        self.path = path
+        self.sweep_batch = sweep_batch
+        self.json_path = json_path
+        self._local = threading.local()
+        self._generation = 0
+        with self._transaction() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _open(self):
+        # isolation_level=None: transactions are begun explicitly below.
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                               check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """This thread's connection; reopened after fork() or close()."""
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is None or local.pid != os.getpid() or local.generation != self._generation:
+            conn = self._open()
+            local.conn, local.pid, local.generation = conn, os.getpid(), self._generation
+        yield conn
+
+    @contextmanager
+    def _transaction(self):
+        """
+        BEGIN IMMEDIATE takes the write lock up front, so concurrent touches
+        queue on the busy timeout instead of failing on a lock upgrade.
+        """
+        with self._connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def close(self):
+        """Drops every thread's connection (each reopens on next use)."""
+        self._generation += 1
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def touch(self, session_id, timeout=DEFAULT_SESSION_TIMEOUT, now=None):
+        """
+        Creates or refreshes a session and returns its data. A session that
+        has already expired is replaced by a new one, as if it had been
+        garbage collected first.
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            if self.json_path and not os.path.exists(self.json_path):
+                conn.execute('DELETE FROM sessions')
+            self._sweep(conn, now, self.sweep_batch)
+            conn.execute('DELETE FROM sessions WHERE session_id=? AND expires_at < ?', (session_id, now))
+            conn.execute(UPSERT_SESSION, (session_id, now, now, timeout, now + timeout))
+            row = conn.execute('SELECT created_at, last_accessed, status FROM sessions '
+                               'WHERE session_id=?', (session_id,)).fetchone()
+            if self.json_path:
+                self._write_json(conn)
+        return _as_dict(row + (timeout,))
+
+    def _write_json(self, conn):
+        # Runs inside the write transaction, so processes never interleave renames.
+        rows = conn.execute('SELECT session_id, created_at, last_accessed, status, timeout FROM sessions')
+        sessions = {row[0]: _as_dict(row[1:]) for row in rows}
+        tmp_path = f"{self.json_path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(sessions, f)
+        os.replace(tmp_path, self.json_path)
+
+    def _sweep(self, conn, now, limit):
+        # Walks idx_sessions_expiry from the oldest deadline; stops at `limit`.
+        return conn.execute('''
+            DELETE FROM sessions WHERE session_id IN (
+                SELECT session_id FROM sessions WHERE expires_at < ? ORDER BY expires_at LIMIT ?)
+        ''', (now, limit)).rowcount
+
+    def sweep(self, now=None):
+        """Removes every expired session in SWEEP_BATCH-sized transactions. Returns the count."""
+        now = time.time() if now is None else now
+        total = 0
+        while True:
+            with self._transaction() as conn:
+                n = self._sweep(conn, now, self.sweep_batch)
+            total += n
+            if n < self.sweep_batch:
+                return total
+
+    def get(self, session_id):
+        with self._connection() as conn:
+            row = conn.execute('SELECT created_at, last_accessed, status, timeout FROM sessions '
+                               'WHERE session_id=?', (session_id,)).fetchone()
+        return _as_dict(row) if row else None
+
+    def all(self):
+        """{session_id: data} for every stored session (including not-yet-swept expired ones)."""
+        with self._connection() as conn:
+            rows = conn.execute('SELECT session_id, created_at, last_accessed, status, timeout FROM sessions')
+            return {row[0]: _as_dict(row[1:]) for row in rows}
+
+    def __len__(self):
+        with self._connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def import_json(self, path):
+        """
+        Loads sessions from a legacy sessions.json without overwriting any
+        already in the store. Returns the number imported.
+        """
+        try:
+            with open(path) as f:
+                sessions = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        rows = []
+        for sid, data in sessions.items():
+            try:
+                timeout = data.get('timeout', DEFAULT_SESSION_TIMEOUT)
+                last = data.get('last_accessed', 0)
+                rows.append((sid, data.get('created_at', last), last, data.get('status', 'active'),
+                             timeout, last + timeout))
+            except (AttributeError, TypeError):
+                continue
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO sessions VALUES (?, ?, ?, ?, ?, ?)', rows)
+            imported = conn.total_changes - before
+        if imported:
+            logger.info(f"Imported {imported} sessions from {path}")
+        return imported
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Status Stream
+One shared producer thread that watches the dashboard's status sources and
+fans changes out to any number of Server-Sent Events clients. Sources are
+only re-read when the files behind them change (size/mtime), so client
+count never adds file I/O.
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger("StatusStream")
+
+POLL_INTERVAL = 0.5
+HEARTBEAT_INTERVAL = 15.0
+CLIENT_QUEUE_SIZE = 256
+
+_MISSING = object()
+
+
+def file_signature(paths):
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def diff(old, new):
+    """
+    Delta between two values: changed/added keys of a dict (removed keys map
+    to None), or the new value itself for anything else.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        delta = {k: v for k, v in new.items() if old.get(k, _MISSING) != v}
+        delta.update({k: None for k in old if k not in new})
+        return delta
+    return new
+
+
+def format_event(event, data, event_id=None):
+    """Encodes one SSE frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class _Client:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, size):
+        self.queue = queue.Queue(size)
+        self.dropped = 0
+
+
+class StatusBroadcaster:
+    """
+    sources: {name: (paths, loader)} where loader() returns the current
+    JSON-serializable value and is only called when a path in `paths` changes.
+    `paths` may instead be a callable returning any comparable signature.
+    """
+    def __init__(self, sources, interval=POLL_INTERVAL, client_queue_size=CLIENT_QUEUE_SIZE):
+        self.sources = sources
+        self.interval = interval
+        self.client_queue_size = client_queue_size
+        self._signatures = {}
+        self._values = {}
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.running = False
+        self.thread = None
+        self.reads = 0
+
+    def start(self):
+        with self._lock:
+            if self.running: return
+            self.running = True
+        self.poll()
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="StatusBroadcaster")
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def snapshot(self):
+        """Latest value of every source."""
+        with self._lock:
+            return dict(self._values)
+
+    def subscribe(self):
+        """Registers a client. Its first event is the full current snapshot."""
+        client = _Client(self.client_queue_size)
+        with self._lock:
+            client.queue.put((self._seq, "snapshot", dict(self._values)))
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    def poll(self):
+        """Re-reads changed sources and broadcasts their deltas. Returns the number broadcast."""
+        sent = 0
+        for name, (paths, loader) in self.sources.items():
+            sig = paths() if callable(paths) else file_signature(paths)
+            if self._signatures.get(name) == sig:
+                continue
+            try:
+                value = loader()
+            except Exception as e:
+                # Signature left unrecorded so the next poll retries it.
+                logger.error(f"Status source {name} failed: {e}")
+                continue
+            self._signatures[name] = sig
+            self.reads += 1
+            old = self._values.get(name)
+            if old == value:
+                continue
+            self._broadcast(name, diff(old, value) if old is not None else value, value)
+            sent += 1
+        return sent
+
+    def _broadcast(self, name, delta, value):
+        with self._lock:
+            self._values[name] = value
+            self._seq += 1
+            item = (self._seq, name, delta)
+            for client in self._clients:
+                try:
+                    client.queue.put_nowait(item)
+                except queue.Full:
+                    # A stalled client gets a fresh snapshot instead of a backlog.
+                    client.dropped += 1
+                    self._resync(client)
+
+    def _resync(self, client):
+        while True:
+            try: client.queue.get_nowait()
+            except queue.Empty: break
+        client.queue.put_nowait((self._seq, "snapshot", dict(self._values)))
+
+    def events(self, client, heartbeat=HEARTBEAT_INTERVAL):
+        """Yields SSE frames for one client until the consumer closes the generator."""
+        try:
+            yield f"retry: {int(self.interval * 2000)}\n\n"
+            while True:
+                try:
+                    seq, event, data = client.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event, data, seq)
+        finally:
+            self.unsubscribe(client)
+
+    def _loop(self):
+        while self.running:
+            time.sleep(self.interval)
+            self.poll()
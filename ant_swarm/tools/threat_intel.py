@@ -4,127 +4,356 @@ Threat Intelligence Module 2.0
 Parallel fetching, rigorous validation, and SQLite persistence.
 """
 
+import os
 import json
 import time
 import urllib.request
 import urllib.error
 import concurrent.futures
-import ipaddress
-import re
+import multiprocessing
 import logging
+import threading
+from . import feed_parser
+from .feed_cache import FeedCache, spool
 from .db_manager import DatabaseManager
+from .ioc_index import IOCIndex
 
 try:
     from . import config
 except ImportError:
     class Config:
         THREAT_FEEDS = {}
+        THREAT_FEED_CACHE = None
     config = Config()
 
+# Seconds between the index watcher's checks of the DB's IOC generation.
+# Feeds are usually refreshed by another process (the CLI below); lookups
+# follow within this.
+INDEX_CHECK_INTERVAL = 2.0
+
+logger = logging.getLogger("ThreatIntel")
+
+
+class _SharedIndex:
+    """
+    One database's in-memory IOC index, shared by every ThreatIntel using it.
+    A daemon thread polls the DB's IOC generation and rebuilds off the lookup
+    path; a rebuild swaps the new IOCIndex in with one assignment, so lookups
+    only ever read `index`.
+    """
+    def __init__(self, db):
+        self.db = db
+        self.generation = None
+        self._lock = threading.Lock()
+        self.index = self._build()
+        threading.Thread(target=self._watch, name="IOCIndexWatcher", daemon=True).start()
+
+    def _build(self):
+        # Read first: IOCs written during the build bump it again and trigger another rebuild.
+        generation = self.db.ioc_generation()
+        index = IOCIndex.build(self.db.iter_iocs())
+        self.generation = generation
+        return index
+
+    def rebuild(self):
+        with self._lock:
+            self.index = self._build()
+            return self.index
+
+    def refresh(self):
+        """Rebuilds if the IOC generation moved. Returns True if it rebuilt."""
+        if not self._lock.acquire(blocking=False):
+            return False  # a rebuild is already running
+        try:
+            if self.db.ioc_generation() == self.generation:
+                return False
+            self.index = self._build()
+            return True
+        finally:
+            self._lock.release()
+
+    def _watch(self):
+        # Exits once ThreatIntel forgets this index (tests reset it between runs).
+        while True:
+            time.sleep(INDEX_CHECK_INTERVAL)
+            if ThreatIntel._indexes.get(self.db.db_path) is not self:
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"IOC index refresh failed: {e}")
+
+
 class ThreatIntel:
-    def __init__(self):
+    # One _SharedIndex per database path.
+    _indexes = {}
+    _index_lock = threading.Lock()
+
+    def __init__(self, batch_size=feed_parser.BATCH_SIZE, cache_path=None):
         self.db = DatabaseManager()
+        self.batch_size = batch_size
+        cache_path = cache_path or getattr(config, "THREAT_FEED_CACHE", None)
+        self.cache = FeedCache(cache_path) if cache_path else None
+        with self._index_lock:
+            shared = self._indexes.get(self.db.db_path)
+            if shared is None:
+                shared = self._indexes[self.db.db_path] = _SharedIndex(self.db)
+        self._shared = shared
+
+    @property
+    def index(self):
+        return self._shared.index
+
+    def refresh_index(self):
+        """
+        Rebuilds the index if IOCs were inserted or deleted since it was
+        built, by this or any other process. The watcher thread calls this
+        every INDEX_CHECK_INTERVAL. Returns True if it rebuilt.
+        """
+        return self._shared.refresh()
+
+    def rebuild_index(self):
+        """Builds a fresh index from the DB, then swaps it in with one assignment."""
+        return self._shared.rebuild()
 
     def validate_ip(self, ip):
         """Strict IP validation."""
-        try:
-            ip_obj = ipaddress.ip_address(ip)
-            if ip_obj.is_private or ip_obj.is_loopback or ip_obj.is_link_local or ip_obj.is_multicast or ip_obj.is_reserved:
-                return False
-            if str(ip) == "0.0.0.0": return False
-            return True
-        except ValueError:
-            return False
+        return feed_parser.validate_ip(ip)
 
     def validate_domain(self, domain):
         """Basic Domain validation."""
-        if not domain or len(domain) > 255: return False
-        if domain.count(".") < 1: return False
-        allowed = re.compile(r"(?!-)[A-Z\d-]{1,63}(?<!-)$", re.IGNORECASE)
-        return all(allowed.match(x) for x in domain.split("."))
+        return feed_parser.validate_domain(domain)
 
-    def _fetch_single_feed(self, name, url):
-        """Worker function for concurrent fetching."""
+    def _fetch(self, name, url):
+        """
+        Stage 1 (I/O): asks for the feed conditionally and spools the body
+        to disk while hashing it.
+
+        Returns (report, body, validators). `body` is an open temp file
+        positioned at 0 when the content changed and needs parsing, else
+        None. The report dict has name, status, ioc_type, added, bytes,
+        fetch_s and parse_s. Status is "not_modified", "unchanged" or
+        "error" when there is nothing to parse, else "fetched" until the
+        parse stage settles it as "updated" or "error".
+        """
         print(f"[ThreatIntel] Fetching {name}...")
-        iocs_found = set()
-        ioc_type = "ip" # Default
+        ioc_type = feed_parser.classify(name)
+        report = {"name": name, "status": "error", "ioc_type": ioc_type,
+                  "added": 0, "bytes": 0, "fetch_s": 0.0, "parse_s": 0.0}
+        cached = self.cache.get(name, url) if self.cache else None
+        headers = {'User-Agent': 'WarRoom-Simulation/2.0'}
+        if cached:
+            headers.update(self.cache.conditional_headers(name, url))
 
+        start = time.perf_counter()
+        seen_at = time.time()   # every IOC written for this fetch has last_seen >= seen_at
         try:
-            req = urllib.request.Request(
-                url,
-                headers={'User-Agent': 'WarRoom-Simulation/2.0'}
-            )
-            with urllib.request.urlopen(req, timeout=15) as response:
-                content = response.read().decode('utf-8', errors='ignore')
-
-                # Parsing Logic
-                if "hash" in name.lower() or "malware" in name.lower() or "fox" in name.lower():
-                    ioc_type = "hash"
-                    # Regex for SHA256
-                    hash_pattern = re.compile(r'\b[a-fA-F0-9]{64}\b')
-                    found = hash_pattern.findall(content)
-                    for h in found:
-                        iocs_found.add(h)
-
-                elif "domain" in name.lower() or "url" in name.lower() or "phish" in name.lower():
-                    ioc_type = "domain"
-                    # Simple regex for domains/URLs
-                    # This is rough but fast. Better parsers exist but this is stdlib only.
-                    lines = content.splitlines()
-                    for line in lines:
-                        line = line.strip()
-                        if not line or line.startswith('#'): continue
-                        # Try to extract hostname from URL or just line
-                        # If comma separated, take 2nd or 3rd column?
-                        parts = line.replace('"', '').split(',')
-                        for p in parts:
-                            p = p.strip()
-                            # Check if valid domain
-                            if self.validate_domain(p):
-                                iocs_found.add(p)
-
-                else:
-                    # IP Parsing
-                    ip_pattern = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
-                    found = ip_pattern.findall(content)
-                    for ip in found:
-                        if self.validate_ip(ip):
-                            iocs_found.add(ip)
+            req = urllib.request.Request(url, headers=headers)
+            try:
+                with urllib.request.urlopen(req, timeout=15) as response:
+                    body, digest, size = spool(response)
+                    validators = {"url": url, "etag": response.headers.get("ETag"),
+                                  "last_modified": response.headers.get("Last-Modified"),
+                                  "sha256": digest, "ioc_type": ioc_type, "seen_at": seen_at}
+            except urllib.error.HTTPError as e:
+                if e.code != 304 or not cached:
+                    raise
+                report["fetch_s"] = time.perf_counter() - start
+                report["status"] = "not_modified"
+                self.cache.update(name, seen_at=self._confirm(name, cached))
+                return report, None, None
+        except Exception as e:
+            print(f"[ThreatIntel] Error {name}: {e}")
+            return report, None, None
 
+        report["fetch_s"] = time.perf_counter() - start
+        report["bytes"] = size
+        if cached and cached.get("sha256") == digest:
+            # Server ignored the validators but the content is identical.
+            body.close()
+            report["status"] = "unchanged"
+            validators["seen_at"] = self._confirm(name, cached)
+            self._record(report, validators)
+            return report, None, None
+        report["status"] = "fetched"
+        return report, body, validators
+
+    def _confirm(self, name, cached):
+        """
+        Refreshes last_seen on the IOCs from a feed's last ingest when the
+        feed is confirmed unchanged, so they don't age out while their
+        source still lists them. Returns the new seen_at.
+        """
+        now = time.time()
+        self.db.touch_source(name, since=cached.get("seen_at", 0), now=now)
+        return now
+
+    def _record(self, report, validators):
+        """Stores a finished feed's validators and parse results in the cache."""
+        if not self.cache or validators is None:
+            return
+        fields = dict(validators)
+        if report["status"] == "updated":
+            fields.update(count=report["added"], fetched_at=time.time())
+        self.cache.update(report["name"], **fields)
+
+    def _fetch_single_feed(self, name, url):
+        """
+        Fetches and parses one feed on the calling thread, upserting IOCs in
+        fixed-size batches as they fill. Returns the feed's report.
+        """
+        report, body, validators = self._fetch(name, url)
+        if body is None:
+            return report
+        ioc_type = report["ioc_type"]
+        start = time.perf_counter()
+        try:
+            with body:
+                for batch in feed_parser.iter_batches(feed_parser.iter_lines(body), ioc_type, self.batch_size):
+                    self.db.add_iocs(batch, ioc_type, name)
+                    report["added"] += len(batch)
         except Exception as e:
             print(f"[ThreatIntel] Error {name}: {e}")
-            return None
+            report["status"] = "error"
+            return report
+        report["parse_s"] = time.perf_counter() - start
+        report["status"] = "updated"
+        self._record(report, validators)
+        return report
+
+    def _parse_in_pool(self, fetch_futures, parse_workers):
+        """
+        Stage 2 (CPU): as bodies arrive, splits them into line-aligned chunks
+        parsed in a process pool. Stage 3: whatever chunks have finished are
+        merged and written in one transaction. In-flight chunks are bounded
+        so memory stays flat.
+        """
+        max_inflight = parse_workers * 2
+        pending = {}       # parse future -> feed name
+        queueing = set()   # feeds still being split into chunks
+        feeds = {}         # feed name -> (report, validators)
+
+        def maybe_finish(name):
+            if name in queueing or name in pending.values():
+                return
+            report, validators = feeds[name]
+            if report["status"] != "error":
+                report["status"] = "updated"
+                self._record(report, validators)
+
+        def drain(limit):
+            """Writes finished chunks until at most `limit` are in flight."""
+            while len(pending) > limit:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                groups = []
+                touched = set()
+                for future in done:
+                    name = pending.pop(future)
+                    touched.add(name)
+                    report = feeds[name][0]
+                    try:
+                        iocs, elapsed = future.result()
+                    except Exception as e:
+                        print(f"[ThreatIntel] Error parsing {name}: {e}")
+                        report["status"] = "error"
+                        continue
+                    report["added"] += len(iocs)
+                    report["parse_s"] += elapsed
+                    groups.append((iocs, report["ioc_type"], name))
+                self.db.add_ioc_groups(groups)
+                for name in touched:
+                    maybe_finish(name)
 
-        return (name, list(iocs_found), ioc_type)
+        # Never fork: the fetch threads are already inside urllib/SSL, and a
+        # forked child could inherit one of their locks held.
+        context = multiprocessing.get_context("forkserver")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=parse_workers, mp_context=context) as parsers:
+            for future in concurrent.futures.as_completed(fetch_futures):
+                report, body, validators = future.result()
+                name = report["name"]
+                feeds[name] = (report, validators)
+                if body is None:
+                    continue
+                queueing.add(name)
+                with body:
+                    for chunk in feed_parser.iter_chunks(body, feed_parser.PARSE_CHUNK_SIZE):
+                        drain(max_inflight - 1)
+                        pending[parsers.submit(feed_parser.parse_chunk, chunk, report["ioc_type"])] = name
+                queueing.discard(name)
+                maybe_finish(name)
+            drain(0)
 
-    def update_feeds(self):
-        """Fetch all feeds in parallel and update DB."""
+        return [report for report, _ in feeds.values()]
+
+    def update_feeds(self, parse_workers=None):
+        """
+        Fetch all feeds in parallel and update DB. Fetching runs on threads;
+        with parse_workers > 1 (default: CPU count) parsing runs in a process
+        pool, otherwise inline on the fetch threads. Returns per-feed reports
+        (status "updated", "not_modified", "unchanged" or "error") plus
+        totals and the cache hit rate.
+        """
         print("[ThreatIntel] Starting parallel update...")
         start_time = time.time()
+        if parse_workers is None:
+            parse_workers = os.cpu_count() or 1
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {executor.submit(self._fetch_single_feed, name, url): name for name, url in config.THREAT_FEEDS.items()}
+            if parse_workers > 1:
+                futures = [executor.submit(self._fetch, name, url) for name, url in config.THREAT_FEEDS.items()]
+                reports = self._parse_in_pool(futures, parse_workers)
+            else:
+                futures = [executor.submit(self._fetch_single_feed, name, url) for name, url in config.THREAT_FEEDS.items()]
+                reports = [f.result() for f in concurrent.futures.as_completed(futures)]
+
+        for report in sorted(reports, key=lambda r: r["name"]):
+            name, status = report["name"], report["status"]
+            timing = f"fetch {report['fetch_s']:.2f}s, parse {report['parse_s']:.2f}s"
+            if status == "updated" and report["added"]:
+                print(f"[ThreatIntel] {name}: Added {report['added']} {report['ioc_type']}s ({timing}).")
+            elif status == "updated":
+                print(f"[ThreatIntel] {name}: No valid IOCs found ({timing}).")
+            elif status != "error":
+                print(f"[ThreatIntel] {name}: {status.replace('_', ' ')}, skipped ({timing}).")
 
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result:
-                    name, iocs, ioc_type = result
-                    if iocs:
-                        self.db.add_iocs(iocs, ioc_type, name)
-                        print(f"[ThreatIntel] {name}: Added {len(iocs)} {ioc_type}s.")
-                    else:
-                        print(f"[ThreatIntel] {name}: No valid IOCs found.")
+        if self.cache:
+            try:
+                self.cache.save()
+            except OSError as e:
+                print(f"[ThreatIntel] Could not save feed cache: {e}")
 
-        print(f"[ThreatIntel] Update complete in {time.time() - start_time:.2f}s. Total IOCs: {self.db.count_iocs()}")
+        changed = any(r["status"] == "updated" for r in reports)
+        if changed:
+            self.rebuild_index()
+        hits = sum(1 for r in reports if r["status"] in ("not_modified", "unchanged"))
+        summary = {
+            "feeds": sorted(reports, key=lambda r: r["name"]),
+            "elapsed": time.time() - start_time,
+            "parse_workers": parse_workers,
+            "hits": hits,
+            "hit_rate": hits / len(reports) if reports else 0.0,
+            "errors": sum(1 for r in reports if r["status"] == "error"),
+        }
+        print(f"[ThreatIntel] Update complete in {summary['elapsed']:.2f}s. "
+              f"Cache hits: {hits}/{len(reports)}. Total IOCs: {self.db.count_iocs()}")
+        return summary
+
+    def sample(self, ioc_type, k=1):
+        """k random IOCs of a type from the in-memory index (the DB if the index has none)."""
+        return self.index.sample(ioc_type, k) or self.db.sample_iocs(ioc_type, k)
 
     def get_c2_ip(self):
-        return self.db.get_random_ioc("ip")
+        return self.index.choice("ip") or self.db.get_random_ioc("ip")
 
     def get_malicious_domain(self):
-        return self.db.get_random_ioc("domain")
+        return self.index.choice("domain") or self.db.get_random_ioc("domain")
 
     def is_known_threat(self, ioc):
-        return self.db.is_malicious(ioc)
+        return self.index.contains(ioc)
+
+    def lookup_many(self, iocs):
+        """Batch check against the in-memory index. Returns {ioc: ioc_type} for hits."""
+        return self.index.lookup_many(iocs)
 
 if __name__ == "__main__":
     ti = ThreatIntel()
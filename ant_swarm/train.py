@@ -0,0 +1,151 @@
+import os
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from ant_swarm.core.simulation import build_match, quiet_agent_logging, EPISODE_LENGTH
+from ant_swarm.memory.checkpoint import load_table
+from ant_swarm.agents import blue_defender
+from ant_swarm.red import red_teamer
+
+logger = logging.getLogger("Trainer")
+
+
+def _match_worker(match_id, conn, seed, episode_length):
+    """
+    Runs one independent match (own artifact dir, own HiveState) per process.
+    Receives master tables, trains for a round, sends the tables back.
+    """
+    quiet_agent_logging()
+    random.seed(seed)
+    artifact_dir = tempfile.mkdtemp(prefix=f"war_room_match{match_id}_")
+    try:
+        engine = build_match(artifact_dir)
+        blue, red = engine.agents
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            (blue_table, red_table), episodes = msg
+            blue_table.reset_visits()
+            red_table.reset_visits()
+            blue.q_table, red.q_table = blue_table, red_table
+            stats = engine.run_episodes(episodes, episode_length)
+            conn.send(((blue.q_table, red.q_table), stats))
+    finally:
+        conn.close()
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+
+
+class SelfPlayTrainer:
+    """
+    Runs N headless matches in separate processes and periodically merges
+    their Q-tables into a master copy (visit-count weighted), which is then
+    pushed back out for the next round.
+    """
+    def __init__(self, workers, episode_length=EPISODE_LENGTH, seed=None):
+        self.workers = workers
+        self.episode_length = episode_length
+        self.seed = seed
+        self.blue, self._blue_ckpt = load_table(blue_defender.Q_CHECKPOINT_FILE, blue_defender.Q_TABLE_FILE, blue_defender.ACTIONS)
+        self.red, self._red_ckpt = load_table(red_teamer.Q_CHECKPOINT_FILE, red_teamer.Q_TABLE_FILE, red_teamer.ACTIONS)
+        self._procs = []
+        self._conns = []
+
+    def start(self):
+        base_seed = self.seed if self.seed is not None else random.randrange(2**32)
+        for match_id in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_match_worker,
+                args=(match_id, child, base_seed + match_id, self.episode_length),
+                daemon=True
+            )
+            proc.start()
+            child.close()
+            self._procs.append(proc)
+            self._conns.append(parent)
+
+    def stop(self):
+        for conn in self._conns:
+            try: conn.send(None)
+            except (BrokenPipeError, OSError): pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+        self._procs, self._conns = [], []
+
+    def run_round(self, episodes):
+        """Trains every match for `episodes` episodes, then merges. Returns total episodes."""
+        for conn in self._conns:
+            conn.send(((self.blue, self.red), episodes))
+
+        blue_tables, red_tables, done = [], [], 0
+        for conn in self._conns:
+            (blue_table, red_table), stats = conn.recv()
+            blue_tables.append(blue_table)
+            red_tables.append(red_table)
+            done += stats["episodes"]
+
+        self.blue.merge(blue_tables)
+        self.red.merge(red_tables)
+        return done
+
+    def train(self, rounds, episodes):
+        """Returns (total episodes, elapsed seconds) excluding process start-up."""
+        self.start()
+        try:
+            start = time.perf_counter()
+            total = 0
+            for r in range(rounds):
+                total += self.run_round(episodes)
+                elapsed = time.perf_counter() - start
+                logger.info(f"Round {r + 1}/{rounds}: {total} episodes, {total / elapsed:,.0f} episodes/sec")
+            return total, time.perf_counter() - start
+        finally:
+            self.stop()
+
+    def save(self):
+        # Merges touch most cells; a fresh snapshot beats a large delta.
+        self._blue_ckpt.compact(self.blue)
+        self._red_ckpt.compact(self.red)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process self-play trainer")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rounds", type=int, default=10, help="merge rounds")
+    parser.add_argument("--episodes", type=int, default=200, help="episodes per worker per round")
+    parser.add_argument("--length", type=float, default=EPISODE_LENGTH, help="virtual seconds per episode")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--scaling", default=None, help="comma-separated worker counts to compare, e.g. 1,2,4")
+    parser.add_argument("--save", action="store_true", help="write merged tables back to the agents' checkpoints")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(name)s] %(levelname)s: %(message)s')
+
+    if args.scaling:
+        counts = [int(n) for n in args.scaling.split(",")]
+        base_rate = None
+        print(f"{'workers':>8} {'episodes':>9} {'eps/sec':>10} {'efficiency':>11}")
+        for n in counts:
+            total, elapsed = SelfPlayTrainer(n, args.length, args.seed).train(args.rounds, args.episodes)
+            rate = total / elapsed
+            # Efficiency relative to the first (smallest) worker count, per worker.
+            if base_rate is None:
+                base_rate = rate / n
+            print(f"{n:>8} {total:>9} {rate:>10,.0f} {rate / (base_rate * n):>10.0%}")
+        return
+
+    trainer = SelfPlayTrainer(args.workers, args.length, args.seed)
+    total, elapsed = trainer.train(args.rounds, args.episodes)
+    print(f"[Trainer] {args.workers} workers: {total} episodes in {elapsed:.2f}s ({total / elapsed:,.0f} episodes/sec)")
+    if args.save:
+        trainer.save()
+        print(f"[Trainer] Saved merged tables ({len(trainer.blue)} blue / {len(trainer.red)} red entries)")
+
+
+if __name__ == "__main__":
+    main()
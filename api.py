@@ -3,8 +3,15 @@ import subprocess
 import json
 import logging
 import time
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
+from ant_swarm.memory.checkpoint import read_stats
+from ant_swarm.core.shm_state import SharedStateReader
+from ant_swarm.core.metrics import MetricsReader
+from ant_swarm.tools.status_stream import StatusBroadcaster, file_signature, format_event
+from ant_swarm.tools.job_manager import JobManager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 app = Flask(__name__)
 CORS(app)
@@ -13,6 +20,13 @@ CORS(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("CyberMuzzleAPI")
 
+# Long-running tool scans run as background jobs; at most this many of each at once,
+# across all workers.
+TOOL_LIMITS = {"nmap": 2, "wifi": 1}
+# Spooled to disk so any pre-forked worker can answer for a job another one runs.
+JOB_SPOOL_DIR = os.environ.get("JOB_SPOOL_DIR", "/tmp/cyber_muzzle_jobs")
+jobs = JobManager(max_workers=4, tool_limits=TOOL_LIMITS, spool_dir=JOB_SPOOL_DIR)
+
 # --- UTILITIES ---
 
 def run_command(command_args, timeout=30):
@@ -59,6 +73,24 @@ def run_command(command_args, timeout=30):
             "error": str(e)
         }
 
+def job_response(job):
+    """
+    202 with the job's URLs. Passing ?wait=<seconds> blocks up to that long
+    and returns the finished result in run_command's shape instead.
+    """
+    wait = request.args.get('wait', type=float)
+    if wait and job.wait(min(wait, 30.0)):
+        result = job.result()
+        result["job_id"] = job.id
+        return jsonify(result)
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "stream_url": f"/api/jobs/{job.id}/stream"
+    }), 202
+
 # --- ENDPOINTS ---
 
 @app.route('/api/status', methods=['GET'])
@@ -66,7 +98,19 @@ def status():
     return jsonify({"status": "active", "version": "1.0.0", "mode": "LIVE"})
 
 def get_q_stats(filename):
-    filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    filepath = os.path.join(BASE_DIR, filename)
+
+    # Binary checkpoints carry precomputed stats in a fixed-size header.
+    header = read_stats(os.path.splitext(filepath)[0] + ".qck")
+    if header is not None:
+        if not header["entries"]:
+            return {"learned_states": 0, "avg_score": 0}
+        return {
+            "learned_states": header["entries"],
+            "avg_score": header["mean"],
+            "max_score": header["max"]
+        }
+
     if not os.path.exists(filepath):
         return {"learned_states": 0, "avg_score": 0}
     try:
@@ -83,28 +127,57 @@ def get_q_stats(filename):
     except:
         return {"learned_states": 0, "avg_score": 0}
 
+HIVE_FILE = os.path.join(BASE_DIR, "hive_state.json")
+WAR_FILE = os.path.join(BASE_DIR, "war_state.json")
+
+# Live hive state published by ant_swarm.main; one attachment per worker process.
+hive_reader = SharedStateReader()
+
+def read_hive_state():
+    """Shared-memory Hive State if the hive is running, else hive_state.json, else the legacy war_state."""
+    hive_file = HIVE_FILE
+    war_file = WAR_FILE
+
+    shared = hive_reader.read()
+    if shared is not None:
+        data = dict(shared["state"])
+        data['blue_alert_level'] = data['blue_level']
+        return data
+
+    data = {}
+    if os.path.exists(hive_file):
+        with open(hive_file, 'r') as f:
+            data = json.load(f)
+        # Map Hive fields to expected frontend fields if needed
+        if 'blue_level' in data: data['blue_alert_level'] = data['blue_level']
+    elif os.path.exists(war_file):
+        with open(war_file, 'r') as f:
+            data = json.load(f)
+    return data
+
+def _q_stat_paths(filename):
+    base = os.path.join(BASE_DIR, os.path.splitext(filename)[0])
+    return [base + ".json", base + ".qck", base + ".qck.log"]
+
+def _hive_signature():
+    hive_reader.read()
+    return (hive_reader.seq, file_signature([HIVE_FILE, WAR_FILE]))
+
+# One producer per worker process, shared by its /api/stream clients; started on first use.
+broadcaster = StatusBroadcaster({
+    "hive": (_hive_signature, read_hive_state),
+    "blue": (_q_stat_paths("blue_q_table.json"), lambda: get_q_stats("blue_q_table.json")),
+    "red": (_q_stat_paths("red_q_table.json"), lambda: get_q_stats("red_q_table.json")),
+})
+
 @app.route('/api/sentinel/status', methods=['GET'])
 def sentinel_status():
     """Reads the shared state and Blue Brain stats."""
-    # Try Hive State first, fall back to war_state
-    hive_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hive_state.json")
-    war_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "war_state.json")
-
     stats = get_q_stats("blue_q_table.json")
     try:
-        data = {}
-        if os.path.exists(hive_file):
-             with open(hive_file, 'r') as f:
-                data = json.load(f)
-             # Map Hive fields to expected frontend fields if needed
-             if 'blue_level' in data: data['blue_alert_level'] = data['blue_level']
-        elif os.path.exists(war_file):
-            with open(war_file, 'r') as f:
-                data = json.load(f)
-
         return jsonify({
             "success": True,
-            "data": data,
+            "data": read_hive_state(),
             "stats": stats
         })
     except Exception as e:
@@ -119,6 +192,28 @@ def red_status():
         "stats": stats
     })
 
+@app.route('/api/stream', methods=['GET'])
+def status_stream():
+    """
+    Server-Sent Events: a full "snapshot" event, then "hive", "blue" and
+    "red" events carrying only what changed.
+    """
+    broadcaster.start()
+    client = broadcaster.subscribe()
+    return Response(
+        stream_with_context(broadcaster.events(client)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Agent loop timings published by ant_swarm.main (this worker's own registry if none).
+metrics_reader = MetricsReader()
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text: per-phase and per-action OODA latency histograms, cycle and overrun counters."""
+    return Response(metrics_reader.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 # 1. WiFi Operations
 @app.route('/api/wifi/scan', methods=['POST'])
 def wifi_scan():
@@ -126,14 +221,11 @@ def wifi_scan():
     Real implementation using nmcli or iwlist.
     Note: Requires sudo/root in real environment for some commands.
     """
-    # Attempt to use nmcli first as it's common and structured
-    res = run_command(["nmcli", "-t", "-f", "SSID,BSSID,SIGNAL,SECURITY", "dev", "wifi"])
-
-    if not res['success']:
-        # Fallback to iwlist (requires parsing)
-        res = run_command(["iwlist", "wlan0", "scan"])
-
-    return jsonify(res)
+    # Attempt to use nmcli first as it's common and structured,
+    # falling back to iwlist (requires parsing)
+    job = jobs.submit("wifi", ["nmcli", "-t", "-f", "SSID,BSSID,SIGNAL,SECURITY", "dev", "wifi"],
+                      fallbacks=[["iwlist", "wlan0", "scan"]])
+    return job_response(job)
 
 @app.route('/api/wifi/capture', methods=['POST'])
 def wifi_capture():
@@ -189,8 +281,46 @@ def network_scan():
     # nmap -F [target] (Fast scan)
     cmd = ["nmap", "-F", "-oX", "-", target]
 
-    res = run_command(cmd)
-    return jsonify(res)
+    return job_response(jobs.submit("nmap", cmd))
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Job state plus stdout lines from ?since=<offset> onwards."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Unknown or expired job"}), 404
+    return jsonify({"success": True, **job.to_dict(request.args.get('since', 0, type=int))})
+
+@app.route('/api/jobs/<job_id>/stream', methods=['GET'])
+def job_stream(job_id):
+    """Server-Sent Events: one "output" event per stdout line, then "done" with the result."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Unknown or expired job"}), 404
+    since = request.args.get('since', 0, type=int)
+
+    def events():
+        offset = since
+        while True:
+            for line in job.follow(offset, timeout=15.0):
+                offset += 1
+                yield format_event("output", line, offset)
+            if job.done:
+                break
+            yield ": keep-alive\n\n"
+        yield format_event("done", {**job.result(), "status": job.status})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def job_cancel(job_id):
+    if not jobs.cancel(job_id):
+        return jsonify({"success": False, "error": "Job not running"}), 404
+    return jsonify({"success": True, "job_id": job_id})
 
 # 3. Web Operations
 @app.route('/api/web/scan', methods=['POST'])
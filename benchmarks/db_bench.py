@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+DatabaseManager micro-benchmark.
+Compares ops/sec per method with connect-per-call (the old behaviour,
+pooled=False) against pooled WAL connections (pooled=True).
+
+    python benchmarks/db_bench.py [--seconds 0.5] [--iocs 10000] [--readers 4]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.db_manager import DatabaseManager
+
+
+def rate(fn, seconds):
+    """Calls fn repeatedly for ~seconds and returns calls per second."""
+    fn()  # warm-up (connection, statement cache)
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(16):
+            fn()
+        count += 16
+        now = time.perf_counter()
+        if now >= deadline:
+            return count / (now - start)
+
+
+def concurrent_read_rate(db, readers, seconds):
+    """Aggregate is_malicious/sec from `readers` threads while one thread writes."""
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def reader(i):
+        while not stop.is_set():
+            db.is_malicious("10.0.0.1")
+            counts[i] += 1
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            db.log_event("bench", "WRITE", str(n))
+            n += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads: t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads: t.join()
+    return sum(counts) / seconds
+
+
+def run(pooled, workdir, args):
+    path = os.path.join(workdir, f"bench_{'pooled' if pooled else 'legacy'}.db")
+    db = DatabaseManager(path, pooled=pooled)
+    db.add_iocs([f"10.{i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(args.iocs)], "ip", "bench")
+    db.set_state("defcon", 3)
+
+    batch = [f"172.16.{i // 256}.{i % 256}" for i in range(100)]
+    results = {
+        "get_state": rate(lambda: db.get_state("defcon"), args.seconds),
+        "set_state": rate(lambda: db.set_state("defcon", 2), args.seconds),
+        "log_event": rate(lambda: db.log_event("blue", "SCAN", "bench"), args.seconds),
+        "is_malicious": rate(lambda: db.is_malicious("10.0.1.1"), args.seconds),
+        "count_iocs": rate(db.count_iocs, args.seconds),
+        "get_random_ioc": rate(lambda: db.get_random_ioc("ip"), args.seconds),
+        "sample_iocs(16)": rate(lambda: db.sample_iocs("ip", 16), args.seconds),
+        "add_iocs(100)": rate(lambda: db.add_iocs(batch, "ip", "bench"), args.seconds),
+        f"is_malicious x{args.readers} readers + writer": concurrent_read_rate(db, args.readers, args.seconds),
+    }
+    db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=0.5, help="time budget per method")
+    parser.add_argument("--iocs", type=int, default=10000, help="IOCs preloaded into the table")
+    parser.add_argument("--readers", type=int, default=4, help="reader threads in the contention test")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="war_room_dbbench_")
+    try:
+        before = run(False, workdir, args)
+        after = run(True, workdir, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'method':<36} {'before ops/s':>13} {'after ops/s':>13} {'speedup':>8}")
+    for name in before:
+        b, a = before[name], after[name]
+        print(f"{name:<36} {b:>13,.0f} {a:>13,.0f} {a / b:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
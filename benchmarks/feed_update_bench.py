@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Threat feed update benchmark.
+Serves synthetic feeds from a local HTTP server and times a full
+ThreatIntel.update_feeds() with parsing inline on the fetch threads
+(1 worker) and in process pools of increasing size.
+
+    python benchmarks/feed_update_bench.py [--feeds 8] [--lines 200000] [--workers 1,2,4]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools import threat_intel
+from ant_swarm.tools.threat_intel import ThreatIntel
+
+FIRST_OCTETS = (11, 23, 45, 61, 77, 89, 101, 131, 141, 151, 181, 201)
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """/<feed>/<lines>: an IPSum-style list, distinct per feed."""
+    protocol_version = "HTTP/1.0"
+
+    def do_GET(self):
+        _, feed, lines = self.path.split('/')
+        feed, lines = int(feed), int(lines)
+        self.send_response(200)
+        self.end_headers()
+        first = FIRST_OCTETS[feed % len(FIRST_OCTETS)]
+        for start in range(0, lines, 5000):
+            rows = "".join(f"{first}.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}\t{i % 9}\n"
+                           for i in range(start, min(start + 5000, lines)))
+            self.wfile.write(rows.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def run(workers, feeds, workdir):
+    path = os.path.join(workdir, f"run_{workers}")
+    os.makedirs(path)
+    ThreatIntel._indexes.clear()
+    with mock.patch.dict(os.environ, {"ACE_DB_PATH": os.path.join(path, "simulation.db")}):
+        ti = ThreatIntel(cache_path=os.path.join(path, "cache.json"))
+        with mock.patch.object(threat_intel.config, "THREAT_FEEDS", feeds), mock.patch("builtins.print"):
+            start = time.perf_counter()
+            report = ti.update_feeds(parse_workers=workers)
+            elapsed = time.perf_counter() - start
+        parse = sum(f["parse_s"] for f in report["feeds"])
+        return elapsed, parse, ti.db.count_iocs()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=8, help="number of synthetic feeds")
+    parser.add_argument("--lines", type=int, default=200000, help="lines per feed")
+    parser.add_argument("--workers", default=None,
+                        help="comma-separated parse worker counts (default: 1,2,4.. up to the CPU count)")
+    args = parser.parse_args()
+
+    if args.workers:
+        counts = [int(w) for w in args.workers.split(',')]
+    else:
+        cpus = os.cpu_count() or 1
+        counts = sorted({1, cpus} | {2 ** i for i in range(1, 8) if 2 ** i < cpus})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    feeds = {f"Synthetic_{i}": f"{base}/{i}/{args.lines}" for i in range(args.feeds)}
+
+    workdir = tempfile.mkdtemp(prefix="war_room_feedbench_")
+    print(f"{args.feeds} feeds x {args.lines:,} lines, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'total s':>9} {'parse s':>9} {'IOCs':>10} {'speedup':>8}")
+    baseline = None
+    try:
+        for workers in counts:
+            elapsed, parse, iocs = run(workers, feeds, workdir)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {parse:>9.2f} {iocs:>10,} {baseline / elapsed:>7.2f}x")
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the simulation, learning and intel hot paths.
+Stdlib only. Each benchmark is timed in several rounds, each long enough
+to swamp timer noise; the median round is reported. Results can be saved
+as a JSON baseline, and a later run compared against it: any benchmark
+whose median time per op grew by more than --threshold is flagged and
+the run exits non-zero.
+
+    python benchmarks/run.py                          # run everything, print a table
+    python benchmarks/run.py --quick -k entropy       # small inputs, matching benchmarks only
+    python benchmarks/run.py --save                   # write benchmarks/baseline.json
+    python benchmarks/run.py --compare --threshold 0.15
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import fnmatch
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.10
+ROUNDS = 5
+MIN_ROUND_TIME = 0.2
+ENTROPY_SIZES = "1K,64K,1M,16M,100M"
+QUICK_ENTROPY_SIZES = "1K,64K,1M"
+SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+SUITES = []
+
+
+def suite(fn):
+    """Registers a benchmark factory: fn(ctx) returns [(name, op, items_per_op)]."""
+    SUITES.append(fn)
+    return fn
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    if text[-1:] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def measure(op, rounds=ROUNDS, min_time=MIN_ROUND_TIME):
+    """
+    Seconds per call of `op` for each of `rounds` rounds. The calls per
+    round are calibrated (1, 2, 5, 10, ...) so that a round lasts at least
+    `min_time`, as timeit.autorange does.
+    """
+    op()  # warm-up: caches, connections, lazy imports
+    number = 1
+    while True:
+        for factor in (1, 2, 5):
+            n = number * factor
+            start = time.perf_counter()
+            for _ in range(n):
+                op()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                samples = [elapsed / n]
+                for _ in range(rounds - 1):
+                    start = time.perf_counter()
+                    for _ in range(n):
+                        op()
+                    samples.append((time.perf_counter() - start) / n)
+                return samples, n
+        number *= 10
+
+
+def summarize(samples, number, items):
+    median = statistics.median(samples)
+    return {
+        "median_s": median,
+        "min_s": min(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": len(samples),
+        "number": number,
+        "items_per_op": items,
+        "items_per_sec": items / median if median else 0.0,
+    }
+
+
+class Context:
+    """Scratch space for one run: a temp directory (holding the DB) and cleanup callbacks."""
+    def __init__(self, quick, entropy_sizes, pattern="*"):
+        self.quick = quick
+        self.entropy_sizes = entropy_sizes
+        self.pattern = pattern
+        self.workdir = tempfile.mkdtemp(prefix="ant_swarm_bench_")
+        self._cleanups = []
+        # Agents and ThreatIntel open their database here, not the repo's.
+        db_env = mock.patch.dict(os.environ, {"ACE_DB_PATH": self.path("simulation.db")})
+        db_env.start()
+        self.on_close(db_env.stop)
+
+    def wants(self, *names):
+        """True if any of `names` is selected (glob or substring match), so setup can be skipped."""
+        return any(fnmatch.fnmatch(name, self.pattern) or self.pattern in name for name in names)
+
+    def path(self, *parts):
+        return os.path.join(self.workdir, *parts)
+
+    def on_close(self, fn):
+        self._cleanups.append(fn)
+
+    def close(self):
+        for fn in reversed(self._cleanups):
+            try: fn()
+            except Exception as e: print(f"[bench] cleanup failed: {e}", file=sys.stderr)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+# --- BENCHMARKS ---
+
+@suite
+def ooda_cycles(ctx):
+    from ant_swarm.core.simulation import build_match
+
+    if not ctx.wants("ooda.blue_cycle", "ooda.red_cycle", "ooda.episode"):
+        return []
+    artifact_dir = ctx.path("artifacts")
+    os.makedirs(artifact_dir)
+    engine = build_match(artifact_dir, seed=1)
+    blue, red = engine.agents
+    return [
+        ("ooda.blue_cycle", blue.step, 1),
+        ("ooda.red_cycle", red.step, 1),
+        ("ooda.episode", lambda: (engine.reset(), engine.run(30.0)), 50),
+    ]
+
+
+@suite
+def q_learning(ctx):
+    from ant_swarm.agents.blue_defender import BlueDefender
+    from ant_swarm.red.red_teamer import RedTeamer
+
+    if not ctx.wants("learn.blue_q_update", "learn.red_q_update"):
+        return []
+    blue = BlueDefender(watch_dir=ctx.path())
+    red = RedTeamer(target_dir=ctx.path())
+    blue.autosave = red.autosave = False
+    states = [blue.q_table.state_id(f"{level}_{count}") for level in range(1, 6) for count in range(20)]
+    blue_actions, red_actions = blue.actions, red.actions
+
+    def blue_learn():
+        for i, state_id in enumerate(states):
+            blue._learn(state_id, blue_actions[i % len(blue_actions)], i % 30)
+
+    def red_learn():
+        for i in range(len(states)):
+            state = str(i % 5 + 1)
+            red._learn(state, red_actions[i % len(red_actions)], i % 30, state)
+
+    return [
+        ("learn.blue_q_update", blue_learn, len(states)),
+        ("learn.red_q_update", red_learn, len(states)),
+    ]
+
+
+@suite
+def entropy(ctx):
+    from ant_swarm.tools.entropy import EntropyScorer
+
+    # cache_size=0: every call really reads and histograms the file.
+    scorer = EntropyScorer(cache_size=0)
+    benches = []
+    for label in ctx.entropy_sizes:
+        if not ctx.wants(f"entropy.score_{label}"):
+            continue
+        size = parse_size(label)
+        path = ctx.path(f"entropy_{label}.bin")
+        with open(path, "wb") as f:
+            remaining = size
+            while remaining:
+                chunk = min(remaining, 1024 * 1024)
+                f.write(os.urandom(chunk))
+                remaining -= chunk
+        benches.append((f"entropy.score_{label}", lambda p=path: scorer.score(p), size))
+    return benches
+
+
+@suite
+def threat_lookups(ctx):
+    from ant_swarm.tools.threat_intel import ThreatIntel
+
+    if not ctx.wants("intel.is_known_threat", "intel.lookup_many", "intel.get_c2_ip"):
+        return []
+    count = 20000 if ctx.quick else 200000
+    ti = ThreatIntel(cache_path=ctx.path("feed_cache.json"))
+    ti.db.add_iocs([f"45.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(count)], "ip", "bench")
+    ti.db.add_iocs(["203.0.113.0/24", "2001:db8::/32"], "cidr", "bench")
+    ti.rebuild_index()
+    probes = ([f"45.0.{i >> 8 & 255}.{i & 255}" for i in range(500)] +      # exact hits
+              [f"203.0.113.{i & 255}" for i in range(250)] +               # CIDR hits
+              [f"8.{i >> 8 & 255}.{i & 255}.1" for i in range(250)])       # misses
+
+    def lookups():
+        for ioc in probes:
+            ti.is_known_threat(ioc)
+
+    return [
+        ("intel.is_known_threat", lookups, len(probes)),
+        ("intel.lookup_many", lambda: ti.lookup_many(probes), len(probes)),
+        ("intel.get_c2_ip", ti.get_c2_ip, 1),
+    ]
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@suite
+def feed_parsing(ctx):
+    from ant_swarm.tools.threat_intel import ThreatIntel
+
+    if not ctx.wants("feed.fetch_parse_ip", "feed.fetch_parse_domain"):
+        return []
+    lines = 5000 if ctx.quick else 50000
+    fixtures = ctx.path("fixtures")
+    os.makedirs(fixtures)
+    with open(os.path.join(fixtures, "ipsum.txt"), "w") as f:
+        f.write("# IPsum-style fixture\n")
+        for i in range(lines):
+            f.write(f"{61 + i % 7}.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}\t{i % 9}\n")
+    with open(os.path.join(fixtures, "domains.csv"), "w") as f:
+        for i in range(lines):
+            f.write(f'"{i}","host{i}.bench-{i % 97}.example","phishing"\n')
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                 lambda *a, **kw: _QuietHandler(*a, directory=fixtures, **kw))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ctx.on_close(lambda: (server.shutdown(), server.server_close()))
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    ti = ThreatIntel()
+    ti.cache = None   # always download and parse; never short-circuit on validators
+
+    def fetch(name, url):
+        def op():
+            with mock.patch("builtins.print"):
+                report = ti._fetch_single_feed(name, url)
+            if report["status"] != "updated":
+                raise RuntimeError(f"{name}: {report['status']}")
+        return op
+
+    return [
+        ("feed.fetch_parse_ip", fetch("Bench IP feed", base + "/ipsum.txt"), lines),
+        ("feed.fetch_parse_domain", fetch("Bench domain feed", base + "/domains.csv"), lines),
+    ]
+
+
+@suite
+def sessions(ctx):
+    import random
+    import utils
+    from ant_swarm.tools.session_store import SessionStore
+
+    threads = 8
+    population = 10000 if ctx.quick else 100000
+    names = ["session.manage_session", f"session.manage_session_x{threads}_threads",
+             f"session.touch_{population // 1000}k"]
+    if not ctx.wants(*names):
+        return []
+    # Point manage_session at a scratch store so the real sessions.db is never touched.
+    utils.close_session_store()
+    patch = mock.patch.multiple(utils, SESSION_DB=ctx.path("sessions.db"),
+                                SESSION_FILE=ctx.path("sessions.json"))
+    patch.start()
+    ctx.on_close(lambda: (utils.close_session_store(), patch.stop()))
+
+    pool = ThreadPoolExecutor(max_workers=threads)
+    ctx.on_close(pool.shutdown)
+    sids = [f"bench_user_{i}" for i in range(threads * 4)]
+
+    def contended():
+        list(pool.map(utils.manage_session, sids))
+
+    # A store already holding `population` live sessions: touch cost must not grow with it.
+    store = SessionStore(ctx.path("population.db"))
+    ctx.on_close(store.close)
+    now = time.time()
+    with store._transaction() as conn:
+        conn.executemany("INSERT INTO sessions VALUES (?, ?, ?, 'active', ?, ?)",
+                         ((f"user_{i}", now, now, 1800, now + 1800) for i in range(population)))
+    rng = random.Random(1)
+
+    return [
+        (names[0], lambda: utils.manage_session("bench_user_0"), 1),
+        (names[1], contended, len(sids)),
+        (names[2], lambda: store.touch(f"user_{rng.randrange(population)}"), 1),
+    ]
+
+
+# --- BASELINES ---
+
+def run(pattern="*", quick=False, entropy_sizes=None, rounds=ROUNDS, min_time=MIN_ROUND_TIME, out=sys.stdout):
+    """Runs every benchmark matching `pattern`. Returns the results document."""
+    sizes = (entropy_sizes or (QUICK_ENTROPY_SIZES if quick else ENTROPY_SIZES)).split(",")
+    results = {}
+    ctx = Context(quick, sizes, pattern)
+    try:
+        for factory in SUITES:
+            for name, op, items in factory(ctx):
+                if not ctx.wants(name):
+                    continue
+                samples, number = measure(op, rounds, min_time)
+                results[name] = summarize(samples, number, items)
+                print(format_row(name, results[name]), file=out, flush=True)
+    finally:
+        ctx.close()
+    return {
+        "meta": {
+            "created": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def format_row(name, result):
+    return (f"{name:<40} {result['median_s'] * 1e6:>14,.1f} us/op "
+            f"{result['items_per_sec']:>16,.0f} items/s  (±{result['stdev_s'] / result['median_s'] * 100:.1f}%)"
+            if result["median_s"] else f"{name:<40} {'-':>14}")
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    [(name, baseline median, current median, change)] for benchmarks in
+    both documents, and the subset whose median time per op grew by more
+    than `threshold` (0.10 = 10% slower).
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not base["median_s"]:
+            continue
+        change = result["median_s"] / base["median_s"] - 1.0
+        rows.append((name, base["median_s"], result["median_s"], change))
+    regressions = [row for row in rows if row[3] > threshold]
+    return rows, regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(document, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="*", help="glob or substring of benchmark names to run")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs for a fast smoke run")
+    parser.add_argument("--entropy-sizes", default=None,
+                        help=f"comma-separated file sizes (default {ENTROPY_SIZES}; quick {QUICK_ENTROPY_SIZES})")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help="timed rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=MIN_ROUND_TIME, help="minimum seconds per round")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="store results as the baseline (default benchmarks/baseline.json)")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="compare against a saved baseline and exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a benchmark counts as regressed (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    baseline = load(args.compare) if args.compare else None
+    document = run(args.filter, args.quick, args.entropy_sizes, args.rounds, args.min_time)
+    if args.output:
+        save(document, args.output)
+    if args.save:
+        save(document, args.save)
+        print(f"\nBaseline saved to {args.save}")
+
+    if baseline is None:
+        return 0
+    rows, regressions = compare(baseline, document, args.threshold)
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, before, after, change in rows:
+        flag = "  REGRESSION" if change > args.threshold else ""
+        print(f"{name:<40} {before * 1e6:>10,.1f}us {after * 1e6:>10,.1f}us {change:>+8.1%}{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond {args.threshold:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
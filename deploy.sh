@@ -6,6 +6,7 @@ pkill -f "python blue_brain.py"
 pkill -f "python red_brain.py"
 pkill -f "ant_swarm.main"
 pkill -f "python api.py"
+pkill -f "gunicorn.*api:app"
 kill $(lsof -t -i :5173) 2>/dev/null
 kill $(lsof -t -i :3000) 2>/dev/null
 kill $(lsof -t -i :5000) 2>/dev/null
@@ -15,9 +16,12 @@ echo "[*] Starting Ant Swarm Hive (Sentinel + Red Team)..."
 nohup python -m ant_swarm.main > logs/hive.log 2>&1 &
 echo "    PID: $!"
 
-# Start Backend API
-echo "[*] Starting Cyber Muzzle API..."
-nohup python api.py > logs/api.log 2>&1 &
+# Start Backend API (pre-fork workers; each reads hive state from shared memory)
+# gthread workers keep long-lived /api/stream connections from pinning a process.
+API_WORKERS=${API_WORKERS:-4}
+echo "[*] Starting Cyber Muzzle API ($API_WORKERS workers)..."
+nohup gunicorn --workers "$API_WORKERS" --worker-class gthread --threads 16 \
+    --bind 0.0.0.0:5000 --timeout 0 api:app > logs/api.log 2>&1 &
 echo "    PID: $!"
 
 # Start Frontend
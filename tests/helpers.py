@@ -0,0 +1,18 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+
+def scratch_db(test):
+    """
+    Gives `test` a temp directory and points every DatabaseManager (so the
+    agents' and ThreatIntel's too) at simulation.db inside it until the test
+    ends. Returns the directory.
+    """
+    workdir = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+    patch = mock.patch.dict(os.environ, {"ACE_DB_PATH": os.path.join(workdir, "simulation.db")})
+    patch.start()
+    test.addCleanup(patch.stop)
+    return workdir
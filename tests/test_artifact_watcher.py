@@ -0,0 +1,101 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.artifact_watcher import ArtifactWatcher
+from tests.helpers import scratch_db
+
+
+def touch(path):
+    with open(path, 'w') as f:
+        f.write("x")
+
+
+def inotify_fds():
+    fds = set()
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}") == "anon_inode:inotify":
+                fds.add(int(fd))
+        except OSError:
+            pass
+    return fds
+
+
+class WatcherCases:
+
+    use_inotify = True
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        touch(os.path.join(self.dir, "malware_old.sh"))
+        self.watcher = ArtifactWatcher(self.dir, use_inotify=self.use_inotify)
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_initial_scan(self):
+        self.assertEqual(self.watcher.snapshot().all, (os.path.join(self.dir, "malware_old.sh"),))
+
+    def test_tracks_changes_and_categories(self):
+        touch(os.path.join(self.dir, "malware_webshell_1.php"))
+        touch(os.path.join(self.dir, ".sys_shadow_1"))
+        touch(os.path.join(self.dir, "unrelated.txt"))
+        os.remove(os.path.join(self.dir, "malware_old.sh"))
+
+        snap = self.watcher.snapshot()
+        self.assertEqual(snap.all, (os.path.join(self.dir, "malware_webshell_1.php"),
+                                    os.path.join(self.dir, ".sys_shadow_1")))
+        self.assertEqual(snap.web, (os.path.join(self.dir, "malware_webshell_1.php"),))
+        self.assertEqual(snap.wifi, ())
+
+    def test_new_artifact_wakes_listener(self):
+        woke = threading.Event()
+        self.watcher.on_new = woke.set
+        self.watcher.start()
+        touch(os.path.join(self.dir, "malware_bait_2.sh"))
+        self.assertTrue(woke.wait(2.0))
+
+
+class TestInotifyWatcher(WatcherCases, unittest.TestCase):
+    use_inotify = True
+
+
+class TestPollingWatcher(WatcherCases, unittest.TestCase):
+    use_inotify = False
+
+
+class TestBlueDefenderWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = scratch_db(self)
+
+    def test_stop_releases_the_inotify_fd(self):
+        from ant_swarm.agents.blue_defender import BlueDefender
+        from ant_swarm.core.scheduler import Scheduler
+
+        before = inotify_fds()
+        agent = BlueDefender(self.workdir,
+                             checkpoint_path=os.path.join(self.workdir, "blue.qck"),
+                             json_path=os.path.join(self.workdir, "blue.json"))
+        if agent.watcher.backend != "inotify":
+            self.skipTest("inotify unavailable")
+        self.assertEqual(len(inotify_fds() - before), 1)
+
+        agent.scheduler = Scheduler()  # never started: no cycles run
+        agent.start()
+        agent.stop()
+        self.assertEqual(inotify_fds() - before, set())
+        # Still usable after stop(), by polling the directory.
+        touch(os.path.join(self.workdir, "malware_late.sh"))
+        self.assertEqual(agent.watcher.snapshot().all, (os.path.join(self.workdir, "malware_late.sh"),))
+
+
+if __name__ == '__main__':
+    unittest.main()
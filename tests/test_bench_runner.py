@@ -0,0 +1,45 @@
+import sys
+import os
+import io
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import run as bench
+
+
+def doc(**medians):
+    return {"results": {name: {"median_s": m} for name, m in medians.items()}}
+
+
+class TestBenchRunner(unittest.TestCase):
+
+    def test_compare_flags_only_regressions_beyond_threshold(self):
+        baseline = doc(fast=1.0, steady=1.0, slow=1.0, removed=1.0)
+        current = doc(fast=0.5, steady=1.05, slow=1.2, added=1.0)
+        rows, regressions = bench.compare(baseline, current, threshold=0.10)
+        self.assertEqual({r[0] for r in rows}, {"fast", "steady", "slow"})
+        self.assertEqual([r[0] for r in regressions], ["slow"])
+        self.assertAlmostEqual(regressions[0][3], 0.2)
+
+    def test_measure_calibrates_round_length(self):
+        calls = []
+        samples, number = bench.measure(lambda: calls.append(1), rounds=3, min_time=0.001)
+        self.assertEqual(len(samples), 3)
+        self.assertGreater(number, 1)
+        self.assertGreaterEqual(len(calls), 3 * number)
+
+    def test_parse_size(self):
+        self.assertEqual(bench.parse_size("1K"), 1024)
+        self.assertEqual(bench.parse_size("100M"), 100 * 1024 ** 2)
+        self.assertEqual(bench.parse_size("512"), 512)
+
+    def test_filtered_run_skips_other_suites(self):
+        out = io.StringIO()
+        document = bench.run("entropy.score_1K", quick=True, rounds=2, min_time=0.001, out=out)
+        self.assertEqual(list(document["results"]), ["entropy.score_1K"])
+        self.assertIn("entropy.score_1K", out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.memory.q_table import QTable
+from ant_swarm.memory.checkpoint import QCheckpoint, read_stats, load_table, convert
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ACTIONS = ["A", "B_C", "D"]
+
+
+class TestQCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "q.qck")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_table(self):
+        table = QTable(ACTIONS)
+        table.set(table.state_id("1_0"), 0, 2.0)
+        table.set(table.state_id("1_1"), 1, -4.0)
+        table.extra["1_0_RETIRED"] = 9.0
+        return table
+
+    def test_deltas_replay_over_base(self):
+        table = self.make_table()
+        ckpt = QCheckpoint(self.path)
+        ckpt.save(table)  # first save writes the base
+        self.assertFalse(os.path.exists(ckpt.log_path))
+
+        table.update(table.state_id("2_0"), 2, 10.0, 0.5)
+        ckpt.save(table)
+        self.assertTrue(os.path.exists(ckpt.log_path))
+
+        loaded = QCheckpoint(self.path).load(ACTIONS)
+        self.assertEqual(loaded.to_dict(), table.to_dict())
+        self.assertEqual(loaded.dirty, set())
+
+    def test_stats_from_header_and_trailer(self):
+        table = self.make_table()
+        ckpt = QCheckpoint(self.path)
+        ckpt.compact(table)
+        self.assertEqual(read_stats(self.path), {"states": 2, "entries": 3, "mean": 7.0 / 3, "max": 9.0})
+
+        table.set(table.state_id("1_1"), 2, 20.0)
+        ckpt.save(table)
+        stats = read_stats(self.path)
+        self.assertEqual(stats["entries"], 4)
+        self.assertEqual(stats["max"], 20.0)
+
+    def test_torn_delta_is_ignored(self):
+        table = self.make_table()
+        ckpt = QCheckpoint(self.path)
+        ckpt.compact(table)
+        expected = table.to_dict()
+
+        table.set(table.state_id("1_0"), 0, 50.0)
+        ckpt.save(table)
+        with open(ckpt.log_path, 'r+b') as f:
+            f.truncate(os.path.getsize(ckpt.log_path) - 30)
+
+        self.assertEqual(QCheckpoint(self.path).load(ACTIONS).to_dict(), expected)
+
+    def test_saves_after_torn_delta_survive_reload(self):
+        table = self.make_table()
+        ckpt = QCheckpoint(self.path)
+        ckpt.save(table)
+        table.update(table.state_id("2_0"), 2, 10.0, 0.5)
+        ckpt.save(table)
+        with open(ckpt.log_path, 'ab') as f:
+            f.write(b'QDLT\xff\x00')  # crash mid-append
+
+        ckpt = QCheckpoint(self.path)
+        table = ckpt.load(ACTIONS)
+        table.set(table.state_id("3_0"), 1, 7.0)
+        ckpt.save(table)
+
+        loaded = QCheckpoint(self.path).load(ACTIONS)
+        self.assertEqual(loaded.get(loaded.state_id("3_0"), 1), 7.0)
+        self.assertEqual(loaded.to_dict(), table.to_dict())
+
+    def test_stale_log_after_compaction_is_dropped(self):
+        table = self.make_table()
+        ckpt = QCheckpoint(self.path)
+        ckpt.compact(table)
+        table.set(table.state_id("1_0"), 0, -1.0)
+        ckpt.save(table)
+        with open(ckpt.log_path, 'rb') as f:
+            stale_log = f.read()
+
+        table.set(table.state_id("1_0"), 0, 3.0)
+        ckpt.compact(table)
+        # Simulate a crash between the rename and the log removal.
+        with open(ckpt.log_path, 'wb') as f:
+            f.write(stale_log)
+
+        loaded = QCheckpoint(self.path).load(ACTIONS)
+        self.assertEqual(loaded.get(loaded.state_id("1_0"), 0), 3.0)
+
+    def test_compacts_when_log_outgrows_base(self):
+        table = self.make_table()
+        ckpt = QCheckpoint(self.path, min_compact_bytes=0)
+        ckpt.compact(table)
+        for i in range(20):
+            table.set(table.state_id(f"s{i}"), 0, float(i))
+            ckpt.save(table)
+        self.assertLess(os.path.getsize(ckpt.log_path) if os.path.exists(ckpt.log_path) else 0,
+                        os.path.getsize(self.path))
+        self.assertEqual(QCheckpoint(self.path).load(ACTIONS).to_dict(), table.to_dict())
+
+    def test_convert_legacy_json(self):
+        red_actions = ["T1046_RECON", "T1027_OBFUSCATE", "T1003_ROOTKIT", "T1589_LURK",
+                       "T1046_WIFI_SCAN", "T1046_NET_SCAN", "T1190_WEB_EXPLOIT",
+                       "T1071_C2_BEACON", "T1547_PERSIST"]
+        json_path = os.path.join(BASE_DIR, "red_q_table.json")
+        with open(json_path) as f:
+            original = json.load(f)
+
+        self.assertEqual(convert(json_path, self.path, red_actions), len(original))
+        table, _ = load_table(self.path, json_path, red_actions)
+        self.assertEqual(table.to_dict(), original)
+        self.assertEqual(read_stats(self.path)["entries"], len(original))
+
+    def test_load_from_json_writes_nothing_until_saved(self):
+        json_path = os.path.join(self.tmp.name, "q.json")
+        self.make_table().save(json_path)
+
+        table, ckpt = load_table(self.path, json_path, ACTIONS)
+        self.assertFalse(os.path.exists(self.path))
+        ckpt.save(table)   # first save writes the whole table as the base
+        self.assertEqual(QCheckpoint(self.path).load(ACTIONS).to_dict(), self.make_table().to_dict())
+
+    def test_save_after_corrupt_base_rewrites_it(self):
+        json_path = os.path.join(self.tmp.name, "q.json")
+        self.make_table().save(json_path)
+        table = self.make_table()
+        ckpt = QCheckpoint(self.path)
+        ckpt.save(table)
+        table.set(table.state_id("2_0"), 0, 1.0)
+        ckpt.save(table)
+        with open(self.path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+
+        table, ckpt = load_table(self.path, json_path, ACTIONS)
+        self.assertEqual(table.to_dict(), self.make_table().to_dict())
+        for i in range(5):
+            table.update(table.state_id(f"{i}_9"), 1, 4.0, 0.5)
+            ckpt.save(table)
+
+        loaded, _ = load_table(self.path, json_path, ACTIONS)
+        self.assertEqual(loaded.to_dict(), table.to_dict())
+        self.assertEqual(len(loaded), len(self.make_table()) + 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
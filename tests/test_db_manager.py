@@ -0,0 +1,46 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.db_manager import DatabaseManager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestDefaultPath(unittest.TestCase):
+
+    def setUp(self):
+        # Never touch the real database: only the resolved path matters here.
+        patch = mock.patch.object(DatabaseManager, "_init_db")
+        patch.start()
+        self.addCleanup(patch.stop)
+        env = mock.patch.dict(os.environ)
+        env.start()
+        self.addCleanup(env.stop)
+        os.environ.pop("ACE_DB_PATH", None)
+
+    def test_default_path_ignores_the_working_directory(self):
+        here = DatabaseManager().db_path
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(workdir)
+        there = DatabaseManager().db_path
+
+        self.assertEqual(here, there)
+        self.assertTrue(os.path.isabs(there))
+        self.assertEqual(os.path.realpath(there), os.path.realpath(os.path.join(REPO_ROOT, "simulation.db")))
+
+    def test_env_overrides_the_default(self):
+        os.environ["ACE_DB_PATH"] = "/tmp/elsewhere.db"
+        self.assertEqual(DatabaseManager().db_path, "/tmp/elsewhere.db")
+        self.assertEqual(DatabaseManager("explicit.db").db_path, "explicit.db")
+
+
+if __name__ == "__main__":
+    unittest.main()
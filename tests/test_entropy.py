@@ -0,0 +1,66 @@
+import sys
+import os
+import math
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.entropy import EntropyScorer, shannon_entropy
+
+
+def reference_entropy(data):
+    entropy = 0
+    for x in range(256):
+        p_x = float(data.count(x.to_bytes(1, 'little'))) / len(data)
+        if p_x > 0:
+            entropy += - p_x * math.log(p_x, 2)
+    return entropy
+
+
+class TestEntropy(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_matches_reference(self):
+        for data in (b"a", b"<?php system($_GET['cmd']); ?>", os.urandom(4096)):
+            self.assertAlmostEqual(shannon_entropy(data), reference_entropy(data), places=9)
+        self.assertAlmostEqual(shannon_entropy("aabb"), 1.0)
+        self.assertEqual(shannon_entropy(b""), 0)
+
+    def test_chunked_file_scoring(self):
+        data = os.urandom(10_000) + b"\x00" * 5_000
+        path = self.write("blob.bin", data)
+        scorer = EntropyScorer(chunk_size=1024)  # forces many chunks
+        self.assertAlmostEqual(scorer.score(path), reference_entropy(data), places=9)
+
+    def test_cache_hits_until_file_changes(self):
+        path = self.write("a.bin", b"abcd")
+        scorer = EntropyScorer()
+        self.assertAlmostEqual(scorer.score(path), 2.0)
+        scorer.score(path)
+        self.assertEqual((scorer.hits, scorer.misses), (1, 1))
+
+        self.write("a.bin", b"aaaaaaaa")  # new size invalidates the key
+        self.assertEqual(scorer.score(path), 0)
+        self.assertEqual(scorer.misses, 2)
+
+    def test_batch_and_missing_files(self):
+        a = self.write("a.bin", b"ab")
+        empty = self.write("empty.bin", b"")
+        scores = EntropyScorer().score_many([a, empty, os.path.join(self.tmp.name, "gone")])
+        self.assertEqual(list(scores.values()), [1.0, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
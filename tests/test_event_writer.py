@@ -0,0 +1,71 @@
+import sys
+import os
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.db_manager import DatabaseManager
+from ant_swarm.tools.event_writer import EventLogWriter
+
+
+class FakeBus:
+    def __init__(self):
+        self.subscribers = {}
+
+    def subscribe(self, event_type, callback):
+        self.subscribers.setdefault(event_type, []).append(callback)
+
+    def publish(self, event_type, data=None):
+        for callback in self.subscribers.get(event_type, []):
+            callback(data)
+
+
+class TestEventLogWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "events.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def rows(self):
+        with self.db._connection() as conn:
+            return conn.execute('SELECT team, action FROM event_log ORDER BY id').fetchall()
+
+    def test_bus_events_are_batched_to_db(self):
+        writer = EventLogWriter(self.db, batch_size=50, flush_interval=0.05)
+        bus = FakeBus()
+        writer.subscribe(bus)
+        writer.start()
+        for _ in range(120):
+            bus.publish("ATTACK_LAUNCHED", {"action": "T1003_ROOTKIT", "impact": 5})
+        bus.publish("THREAT_MITIGATED", {"count": 1, "action": "WEB_WAF"})
+        self.assertTrue(writer.flush())
+        writer.stop()
+
+        rows = self.rows()
+        self.assertEqual(len(rows), 121)
+        self.assertEqual(rows[0], ("red", "T1003_ROOTKIT"))
+        self.assertEqual(rows[-1], ("blue", "WEB_WAF"))
+        metrics = writer.metrics()
+        self.assertEqual(metrics["written"], 121)
+        self.assertLess(metrics["flushes"], 121)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    def test_drops_when_saturated(self):
+        writer = EventLogWriter(self.db, max_queue=10)  # not started: nothing drains
+        accepted = [writer.log("red", "X", "") for _ in range(15)]
+        self.assertEqual(accepted.count(False), 5)
+        self.assertEqual(writer.metrics()["dropped"], 5)
+        self.assertEqual(writer.metrics()["queue_depth"], 10)
+
+        writer.start()
+        writer.stop()  # drains the backlog on the way out
+        self.assertEqual(len(self.rows()), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
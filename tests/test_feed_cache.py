@@ -0,0 +1,106 @@
+import sys
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools import threat_intel
+from ant_swarm.tools.feed_cache import FeedCache
+from ant_swarm.tools.threat_intel import ThreatIntel
+from tests.helpers import scratch_db
+
+FEEDS = {
+    "/etag": (b"8.8.8.8\n1.1.1.1\n", '"v1"', True),
+    "/lastmod": (b"9.9.9.9\n", None, True),
+    "/static": (b"4.4.4.4\n", None, False),   # ignores validators entirely
+}
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        body, etag, conditional = FEEDS[self.path]
+        self.requests.append(self.path)
+        if conditional and ((etag and self.headers.get("If-None-Match") == etag) or
+                            (not etag and self.headers.get("If-Modified-Since") == LAST_MODIFIED)):
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if etag:
+            self.send_header("ETag", etag)
+        elif conditional:
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConditionalFetch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ConditionalHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.feeds = {f"Feed{path}": base + path for path in FEEDS}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.workdir = scratch_db(self)
+        ThreatIntel._indexes.clear()
+        self.cache_path = os.path.join(self.workdir, "threat_feed_cache.json")
+        self.patch = mock.patch.object(threat_intel.config, "THREAT_FEEDS", self.feeds)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        ThreatIntel._indexes.clear()
+
+    def _update(self):
+        with mock.patch("builtins.print"):
+            return ThreatIntel(cache_path=self.cache_path).update_feeds()
+
+    def test_second_run_skips_unchanged_feeds(self):
+        first = self._update()
+        self.assertEqual([f["status"] for f in first["feeds"]], ["updated"] * 3)
+        self.assertEqual(first["hit_rate"], 0.0)
+
+        cache = FeedCache(self.cache_path)
+        self.assertEqual(cache.get("Feed/etag", self.feeds["Feed/etag"])["etag"], '"v1"')
+        self.assertEqual(cache.get("Feed/etag", self.feeds["Feed/etag"])["count"], 2)
+        self.assertIsNone(cache.get("Feed/etag", "http://elsewhere/"))
+
+        with mock.patch.object(ThreatIntel, "rebuild_index") as rebuild, \
+             mock.patch("ant_swarm.tools.db_manager.DatabaseManager.add_iocs") as add_iocs:
+            second = self._update()
+        statuses = {f["name"]: f["status"] for f in second["feeds"]}
+        self.assertEqual(statuses, {"Feed/etag": "not_modified",
+                                    "Feed/lastmod": "not_modified",
+                                    "Feed/static": "unchanged"})
+        self.assertEqual(second["hit_rate"], 1.0)
+        add_iocs.assert_not_called()
+        rebuild.assert_not_called()
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(self.cache_path, "w") as f:
+            f.write("{not json")
+        report = self._update()
+        self.assertEqual(report["hits"], 0)
+        self.assertEqual(report["errors"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import sys
+import os
+import io
+import threading
+import tracemalloc
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools import feed_parser, threat_intel
+from ant_swarm.tools.threat_intel import ThreatIntel
+from tests.helpers import scratch_db
+
+FIRST_OCTETS = (11, 23, 45, 61, 77, 89, 101, 131, 141, 151, 181, 201)
+
+
+def synthetic_ip(i):
+    return f"{FIRST_OCTETS[i % len(FIRST_OCTETS)]}.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serves /ips/<n> as an IPSum-style feed, generated on the fly."""
+
+    def do_GET(self):
+        count = int(self.path.rsplit('/', 1)[1])
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.end_headers()
+        self.wfile.write(b"# synthetic feed\n10.0.0.1\t9\n")
+        for start in range(0, count, 1000):
+            rows = "".join(f"{synthetic_ip(i)}\t{i % 7}\n" for i in range(start, min(start + 1000, count)))
+            self.wfile.write(rows.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFeedParser(unittest.TestCase):
+
+    def test_iter_lines_handles_split_characters(self):
+        data = "alpha\nbéta\r\ngamma".encode()
+        lines = list(feed_parser.iter_lines(io.BytesIO(data), chunk_size=3))
+        self.assertEqual(lines, ["alpha", "béta", "gamma"])
+
+    def test_iter_lines_caps_line_length(self):
+        lines = list(feed_parser.iter_lines(io.BytesIO(b"x" * 25), chunk_size=4, max_line=10))
+        self.assertEqual("".join(lines), "x" * 25)
+        self.assertTrue(all(len(line) <= 10 for line in lines))
+
+    def test_extract_by_type(self):
+        self.assertEqual(feed_parser.extract("8.8.8.8 10.0.0.1 1.1.1.1", "ip"), ["8.8.8.8", "1.1.1.1"])
+        self.assertEqual(feed_parser.extract('1,"evil.example.com",x', "domain"), ["evil.example.com"])
+        self.assertEqual(feed_parser.extract("# evil.example.com", "domain"), [])
+        self.assertEqual(feed_parser.extract("sha256: " + "a" * 64, "hash"), ["a" * 64])
+        self.assertEqual(feed_parser.classify("MalwareBazaar"), "hash")
+        self.assertEqual(feed_parser.classify("OpenPhish"), "domain")
+
+    def test_batches_are_bounded(self):
+        lines = (synthetic_ip(i) for i in range(2500))
+        sizes = [len(b) for b in feed_parser.iter_batches(lines, "ip", batch_size=1000)]
+        self.assertEqual(sizes, [1000, 1000, 500])
+
+
+    def test_chunks_end_on_line_boundaries(self):
+        data = "".join(f"{synthetic_ip(i)}\n" for i in range(1000)).encode()
+        chunks = list(feed_parser.iter_chunks(io.BytesIO(data), chunk_size=1000))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), data)
+        self.assertTrue(all(c.endswith(b"\n") for c in chunks))
+
+        iocs, elapsed = feed_parser.parse_chunk(chunks[0] + chunks[0], "ip")
+        self.assertEqual(len(iocs), chunks[0].count(b"\n"))
+        self.assertGreaterEqual(elapsed, 0.0)
+
+
+class TestStreamingIngestion(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.workdir = scratch_db(self)
+        self.db_path = os.path.join(self.workdir, "simulation.db")
+        ThreatIntel._indexes.clear()
+        # tracemalloc sees every thread; keep the index watcher from rebuilding mid-ingest.
+        patch = mock.patch.object(threat_intel, "INDEX_CHECK_INTERVAL", 3600)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        ThreatIntel._indexes.clear()
+
+    def _ingest(self, count):
+        ti = ThreatIntel(batch_size=2000, cache_path=os.path.join(self.workdir, "cache.json"))
+        with mock.patch("builtins.print"):
+            tracemalloc.start()
+            result = ti._fetch_single_feed("IPSum_Aggregator", f"{self.base}/ips/{count}")
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return ti, result, peak
+
+    def test_feed_is_ingested_in_full(self):
+        ti, result, _ = self._ingest(12345)
+        self.assertEqual(result["status"], "updated")
+        self.assertEqual(result["added"], 12345)
+        self.assertEqual(ti.db.count_iocs(), 12345)
+        self.assertFalse(ti.db.is_malicious("10.0.0.1"))
+
+    def test_process_pool_matches_inline_parse(self):
+        feeds = {f"Feed{i}": f"{self.base}/ips/{n}" for i, n in enumerate((3000, 0, 7000))}
+        totals = {}
+        for workers in (1, 2):
+            ThreatIntel._indexes.clear()
+            if os.path.exists(self.db_path):
+                os.remove(self.db_path)
+            ti = ThreatIntel(batch_size=1000, cache_path=os.path.join(self.workdir, f"cache{workers}.json"))
+            with mock.patch.object(threat_intel.config, "THREAT_FEEDS", feeds), \
+                 mock.patch.object(feed_parser, "PARSE_CHUNK_SIZE", 16 * 1024), \
+                 mock.patch("builtins.print"):
+                report = ti.update_feeds(parse_workers=workers)
+            totals[workers] = ({f["name"]: (f["status"], f["added"]) for f in report["feeds"]}, ti.db.count_iocs())
+            self.assertEqual(report["parse_workers"], workers)
+        self.assertEqual(totals[1], totals[2])
+        self.assertEqual(totals[2][1], 7000)
+        self.assertEqual(totals[2][0]["Feed1"], ("updated", 0))
+
+    def test_peak_memory_independent_of_feed_size(self):
+        _, _, small = self._ingest(5000)
+        ThreatIntel._indexes.clear()
+        os.remove(self.db_path)
+        _, result, large = self._ingest(50000)
+        self.assertEqual(result["added"], 50000)
+        # Ten times the feed must not mean ten times the memory.
+        self.assertLess(large, small * 1.5 + 256 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
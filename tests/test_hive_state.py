@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.core.hive import HiveState, HivePersister
+
+
+class TestHiveState(unittest.TestCase):
+
+    def setUp(self):
+        self.hive = HiveState()
+        self.hive.reset()
+
+    def tearDown(self):
+        self.hive.reset()
+
+    def test_snapshots_are_immutable_and_versioned(self):
+        before = self.hive.snapshot()
+        self.hive.update_defcon(3)
+        after = self.hive.snapshot()
+
+        self.assertEqual(after.version, before.version + 1)
+        self.assertEqual(before.state["defcon"], 5)
+        self.assertEqual(after.state["defcon"], 3)
+        with self.assertRaises(TypeError):
+            after.state["defcon"] = 1
+
+    def test_get_state_is_a_mutable_copy(self):
+        self.hive.set_threats(["/tmp/a.sh"])
+        state = self.hive.get_state()
+        self.assertIsInstance(state, dict)
+        self.assertEqual(json.loads(json.dumps(state))["active_threats"], ["/tmp/a.sh"])
+        state["defcon"] = 1
+        state["active_threats"].append("/tmp/b.sh")
+        self.assertEqual(self.hive.get_state()["defcon"], 5)
+        self.assertEqual(self.hive.snapshot().state["active_threats"], ("/tmp/a.sh",))
+
+    def test_unchanged_value_keeps_version(self):
+        self.hive.update_mood("AGGRESSIVE")
+        version = self.hive.version
+        self.hive.update_mood("AGGRESSIVE")
+        self.assertEqual(self.hive.version, version)
+
+    def test_wait_for_version(self):
+        version = self.hive.version
+        timer = threading.Timer(0.05, self.hive.update_defcon, args=(2,))
+        timer.start()
+        snap = self.hive.wait_for_version(version, timeout=2.0)
+        timer.join()
+        self.assertGreater(snap.version, version)
+        self.assertEqual(snap.state["defcon"], 2)
+
+        # Times out with the unchanged snapshot
+        snap = self.hive.wait_for_version(snap.version, timeout=0.01)
+        self.assertEqual(snap.version, self.hive.version)
+
+
+class TestHivePersister(unittest.TestCase):
+
+    def setUp(self):
+        self.hive = HiveState()
+        self.hive.reset()
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "hive_state.json")
+
+    def tearDown(self):
+        self.hive.reset()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_writes_only_on_change_and_coalesces(self):
+        persister = HivePersister(self.path, self.hive, coalesce=0.05, min_interval=0.0)
+        persister.start()
+        try:
+            deadline = time.time() + 2.0
+            while persister.writes < 1 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(persister.writes, 1)
+
+            for level in (4, 3, 2, 1):
+                self.hive.update_defcon(level)
+            target = self.hive.version
+            deadline = time.time() + 2.0
+            while persister.written_version < target and time.time() < deadline:
+                time.sleep(0.01)
+
+            # The burst of four updates was coalesced into a single write
+            self.assertEqual(persister.writes, 2)
+            time.sleep(0.1)
+            self.assertEqual(persister.writes, 2)
+        finally:
+            persister.stop()
+
+        with open(self.path) as f:
+            state = json.load(f)
+        self.assertEqual(state["defcon"], 1)
+        self.assertEqual(state["active_threats"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.db_manager import DatabaseManager
+from ant_swarm.tools.ioc_index import IOCIndex, CIDRTrie
+from ant_swarm.tools import threat_intel
+from ant_swarm.tools.threat_intel import ThreatIntel
+from tests.helpers import scratch_db
+
+ROWS = [
+    ("203.0.113.7", "ip"),
+    ("evil.example", "domain"),
+    ("a" * 64, "hash"),
+    ("198.51.100.0/24", "cidr"),
+    ("2001:db8:abcd::/48", "cidr"),
+]
+
+
+class TestIOCIndex(unittest.TestCase):
+
+    def test_exact_and_range_lookups(self):
+        index = IOCIndex.build(ROWS)
+        self.assertEqual(index.lookup("203.0.113.7"), "ip")
+        self.assertEqual(index.lookup("evil.example"), "domain")
+        self.assertEqual(index.lookup("198.51.100.42"), "cidr")
+        self.assertEqual(index.lookup("2001:db8:abcd:12::1"), "cidr")
+        self.assertIsNone(index.lookup("198.51.101.1"))
+        self.assertIsNone(index.lookup("good.example"))
+        self.assertEqual(len(index), 5)
+
+    def test_lookup_many(self):
+        index = IOCIndex.build(ROWS)
+        hits = index.lookup_many(["203.0.113.7", "8.8.8.8", "198.51.100.1", "203.0.113.7"])
+        self.assertEqual(hits, {"203.0.113.7": "ip", "198.51.100.1": "cidr"})
+
+    def test_trie_prefix_edges(self):
+        trie = CIDRTrie()
+        trie.add("10.0.0.0/8")
+        trie.add("192.0.2.1/32")
+        self.assertTrue(trie.match(4, int.from_bytes(bytes([10, 255, 255, 255]), 'big')))
+        self.assertFalse(trie.match(4, int.from_bytes(bytes([11, 0, 0, 0]), 'big')))
+        self.assertTrue(trie.match(4, int.from_bytes(bytes([192, 0, 2, 1]), 'big')))
+        self.assertFalse(trie.match(4, int.from_bytes(bytes([192, 0, 2, 2]), 'big')))
+        self.assertFalse(trie.match(6, 1))
+
+
+class TestSampling(unittest.TestCase):
+
+    def test_index_sample_is_uniform_over_type(self):
+        ips = [f"203.0.113.{i}" for i in range(10)]
+        index = IOCIndex.build([(ip, "ip") for ip in ips] + ROWS)
+        draws = Counter(index.sample("ip", 11000))
+        self.assertEqual(set(draws), set(ips) | {"203.0.113.7"})
+        self.assertTrue(all(700 < n < 1300 for n in draws.values()))
+        self.assertIn(index.choice("domain"), {"evil.example"})
+        self.assertEqual(index.sample("url", 3), [])
+        self.assertIsNone(index.choice("url"))
+
+    def test_db_sample_rejects_other_types_and_gaps(self):
+        workdir = tempfile.mkdtemp()
+        try:
+            db = DatabaseManager(db_path=os.path.join(workdir, "simulation.db"))
+            db.add_iocs([f"gone{i}.example" for i in range(200)], "domain", "test")
+            db.add_iocs(["198.51.100.1", "198.51.100.2"], "ip", "test")
+            db.add_iocs([f"late{i}.example" for i in range(200)], "domain", "test")
+            with db._writer() as conn:
+                conn.execute("DELETE FROM threat_intel WHERE ioc LIKE 'gone%'")
+            sample = db.sample_iocs("ip", 50)
+            self.assertEqual(len(sample), 50)
+            self.assertEqual(set(sample), {"198.51.100.1", "198.51.100.2"})
+            self.assertIn(db.get_random_ioc("domain"), {f"late{i}.example" for i in range(200)})
+            self.assertIsNone(db.get_random_ioc("hash"))
+            self.assertEqual(db.sample_iocs("hash", 5), [])
+            db.close()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def test_db_sample_of_sparse_type_is_uniform_without_scans(self):
+        workdir = tempfile.mkdtemp()
+        try:
+            db = DatabaseManager(db_path=os.path.join(workdir, "simulation.db"))
+            db.add_iocs(["198.51.100.1"], "ip", "test")
+            db.add_iocs([f"d{i}.example" for i in range(20000)], "domain", "test")
+            db.add_iocs(["198.51.100.2"], "ip", "test")
+            statements = []
+            with db._connection() as conn:
+                conn.set_trace_callback(statements.append)
+            draws = Counter(db.sample_iocs("ip", 2000))
+            self.assertEqual(set(draws), {"198.51.100.1", "198.51.100.2"})
+            self.assertTrue(all(800 < n < 1200 for n in draws.values()))
+            self.assertFalse([s for s in statements if "OFFSET" in s])
+
+            db.add_iocs(["198.51.100.3"], "ip", "test")   # new generation: the cached ids reload
+            self.assertIn("198.51.100.3", db.sample_iocs("ip", 500))
+            db.close()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+class TestIndexRefresh(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = scratch_db(self)
+        ThreatIntel._indexes.clear()
+
+    def tearDown(self):
+        ThreatIntel._indexes.clear()
+
+    def test_writes_from_another_connection_invalidate_index(self):
+        ti = ThreatIntel(cache_path=os.path.join(self.workdir, "cache.json"))
+        self.assertFalse(ti.is_known_threat("203.0.113.9"))
+        self.assertFalse(ti.refresh_index())
+
+        # A separate, unpooled manager stands in for the feed-update CLI process.
+        other = DatabaseManager(db_path=ti.db.db_path, pooled=False)
+        other.add_iocs(["203.0.113.9"], "ip", "cli")
+        self.assertTrue(ti.refresh_index())
+        self.assertTrue(ti.is_known_threat("203.0.113.9"))
+
+        other.prune_source("cli", cutoff=float("inf"))
+        self.assertTrue(ti.refresh_index())
+        self.assertFalse(ti.is_known_threat("203.0.113.9"))
+
+    def test_empty_writes_leave_the_generation_alone(self):
+        db = DatabaseManager(db_path=os.path.join(self.workdir, "simulation.db"))
+        before = db.ioc_generation()
+        db.add_ioc_groups([([], "ip", "a"), ([], "domain", "b")])
+        db.add_iocs([], "ip", "a")
+        self.assertEqual(db.ioc_generation(), before)
+        db.add_ioc_groups([([], "ip", "a"), (["203.0.113.9"], "ip", "b")])
+        self.assertNotEqual(db.ioc_generation(), before)
+
+    def test_lookups_never_query_the_db(self):
+        ti = ThreatIntel(cache_path=os.path.join(self.workdir, "cache.json"))
+        with mock.patch.object(ti.db, "ioc_generation", side_effect=AssertionError), \
+             mock.patch.object(ti.db, "iter_iocs", side_effect=AssertionError):
+            self.assertFalse(ti.is_known_threat("203.0.113.9"))
+            self.assertEqual(ti.lookup_many(["203.0.113.9"]), {})
+
+    def test_watcher_rebuilds_in_the_background(self):
+        with mock.patch.object(threat_intel, "INDEX_CHECK_INTERVAL", 0.01):
+            ti = ThreatIntel(cache_path=os.path.join(self.workdir, "cache.json"))
+            DatabaseManager(db_path=ti.db.db_path, pooled=False).add_iocs(["203.0.113.9"], "ip", "cli")
+            deadline = time.monotonic() + 5
+            while not ti.is_known_threat("203.0.113.9") and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertTrue(ti.is_known_threat("203.0.113.9"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.db_manager import DatabaseManager, BASE_CONFIDENCE
+from ant_swarm.tools.ioc_maintenance import IOCMaintenance, confidence_bands
+
+DAY = 86400.0
+NOW = 1_000_000_000.0
+
+
+class TestIOCMaintenance(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.workdir, "simulation.db")
+        self.db = DatabaseManager(db_path=self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _add(self, iocs, source, age):
+        self.db.add_iocs(iocs, "domain", source)
+        with self.db._writer() as conn:
+            conn.executemany('UPDATE threat_intel SET last_seen=? WHERE ioc=?',
+                             [(NOW - age, ioc) for ioc in iocs])
+
+    def _column(self, sql, *args):
+        with self.db._connection() as conn:
+            return [row[0] for row in conn.execute(sql, args)]
+
+    def _maintenance(self, **kwargs):
+        kwargs.setdefault("default_ttl", 30 * DAY)
+        kwargs.setdefault("half_life", 3 * DAY)
+        return IOCMaintenance(self.db, pause=0, **kwargs)
+
+    def test_bands_cover_every_age(self):
+        bands = confidence_bands(3 * DAY)
+        self.assertEqual(bands[0][0], 0.0)
+        self.assertEqual(bands[0][2], BASE_CONFIDENCE)
+        self.assertEqual(bands[-1][2], 0)
+        for (_, upper, _), (lower, _, _) in zip(bands, bands[1:]):
+            self.assertEqual(upper, lower)
+        for age in (0, DAY, 3 * DAY, 6 * DAY, 40 * DAY):
+            expected = round(BASE_CONFIDENCE * 0.5 ** (age / (3 * DAY)))
+            band = next(c for lo, hi, c in bands if lo <= age < hi)
+            self.assertEqual(band, expected)
+
+    def test_decay_follows_half_life(self):
+        self._add(["fresh.example.com"], "feed", 0)
+        self._add(["old.example.com"], "feed", 3 * DAY)
+        self._add(["ancient.example.com"], "feed", 25 * DAY)
+        self._maintenance().decay(NOW)
+        confidence = dict(zip(self._column('SELECT ioc FROM threat_intel ORDER BY id'),
+                              self._column('SELECT confidence FROM threat_intel ORDER BY id')))
+        self.assertEqual(confidence["fresh.example.com"], BASE_CONFIDENCE)
+        self.assertEqual(confidence["old.example.com"], BASE_CONFIDENCE // 2)
+        self.assertEqual(confidence["ancient.example.com"], 0)
+
+    def test_prune_uses_per_source_ttl_in_chunks(self):
+        stale = [f"stale{i}.example.com" for i in range(25)]
+        self._add(stale, "short", 2 * DAY)
+        self._add(["kept.example.com"], "short", 0)
+        self._add(["long.example.com"], "long", 2 * DAY)
+        calls = []
+        prune = self.db.prune_source
+        self.db.prune_source = lambda *a, **kw: calls.append(kw["limit"]) or prune(*a, **kw)
+
+        maint = self._maintenance(source_ttls={"short": DAY}, chunk_size=10)
+        self.assertEqual(maint.prune(NOW), 25)
+        self.assertEqual(sorted(self._column('SELECT ioc FROM threat_intel')),
+                         ["kept.example.com", "long.example.com"])
+        self.assertGreaterEqual(len(calls), 3)
+        self.assertTrue(all(limit == 10 for limit in calls))
+
+    def test_touch_source_refreshes_last_ingest_only(self):
+        self._add(["a.example.com", "b.example.com"], "feed", DAY)
+        self._add(["gone.example.com"], "feed", 5 * DAY)
+        self._add(["other.example.com"], "elsewhere", DAY)
+        touched = self.db.touch_source("feed", since=NOW - 2 * DAY, now=NOW, limit=1)
+        self.assertEqual(touched, 2)
+        self.assertEqual(self._column('SELECT ioc FROM threat_intel WHERE last_seen=? ORDER BY ioc', NOW),
+                         ["a.example.com", "b.example.com"])
+
+    def test_incremental_vacuum_returns_pages(self):
+        self._add([f"host{i}.{'x' * 40}.example.com" for i in range(5000)], "feed", 60 * DAY)
+        before = self.db.storage_stats()
+        stats = self._maintenance(vacuum_pages=16).run_once(now=NOW)
+        self.assertEqual(stats["pruned"], 5000)
+        self.assertEqual(stats["iocs"], 0)
+        self.assertGreater(stats["freed_pages"], 0)
+        self.assertEqual(stats["free_pages"], 0)
+        self.assertLess(stats["pages"], before["pages"])
+
+    def test_legacy_database_is_converted_only_on_request(self):
+        legacy = os.path.join(self.workdir, "legacy.db")
+        conn = sqlite3.connect(legacy)
+        conn.execute('CREATE TABLE t (x)')
+        conn.commit()
+        conn.close()
+        db = DatabaseManager(db_path=legacy)
+        # The hive's maintenance pass never runs the blocking full VACUUM itself.
+        IOCMaintenance(db, pause=0).run_once(now=NOW)
+        self.assertFalse(db.incremental_vacuum_enabled())
+        self.assertEqual(db.incremental_vacuum(16), 0)
+
+        self.assertTrue(db.enable_incremental_vacuum())
+        self.assertFalse(db.enable_incremental_vacuum())
+        with db._connection() as conn:
+            self.assertEqual(conn.execute('PRAGMA auto_vacuum').fetchone()[0], 2)
+
+    def test_on_pruned_called_only_when_rows_removed(self):
+        pruned = []
+        self._add(["recent.example.com"], "feed", 0)
+        maint = self._maintenance(on_pruned=pruned.append)
+        maint.run_once(now=NOW)
+        self.assertEqual(pruned, [])
+        self._add(["stale.example.com"], "feed", 60 * DAY)
+        maint.run_once(now=NOW)
+        self.assertEqual(pruned, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
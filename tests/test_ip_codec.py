@@ -0,0 +1,115 @@
+import sys
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import ipaddress
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools import ip_codec
+from ant_swarm.tools.db_manager import DatabaseManager
+from ant_swarm.tools.feed_parser import extract, classify
+
+
+def reference_is_public(ip):
+    """The validation ThreatIntel used before the range tables."""
+    try:
+        ip_obj = ipaddress.ip_address(ip)
+        if ip_obj.is_private or ip_obj.is_loopback or ip_obj.is_link_local or ip_obj.is_multicast or ip_obj.is_reserved:
+            return False
+        return str(ip) != "0.0.0.0"
+    except ValueError:
+        return False
+
+
+class TestIPValidation(unittest.TestCase):
+
+    def test_matches_ipaddress_at_range_boundaries(self):
+        for version, tables in ip_codec.TABLES.items():
+            top = (1 << (32 if version == 4 else 128)) - 1
+            cls = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+            for table in (tables.blocked, tables.private):
+                for first, last in zip(table.starts, table.ends):
+                    for value in (first - 1, first, first + 1, last - 1, last, last + 1):
+                        if 0 <= value <= top:
+                            ip = str(cls(value))
+                            self.assertEqual(ip_codec.is_public_ip(ip), reference_is_public(ip), ip)
+
+    def test_matches_ipaddress_on_random_addresses(self):
+        rng = random.Random(1234)
+        for _ in range(20000):
+            for ip in (str(ipaddress.IPv4Address(rng.getrandbits(32))),
+                       str(ipaddress.IPv6Address(rng.getrandbits(128)))):
+                self.assertEqual(ip_codec.is_public_ip(ip), reference_is_public(ip), ip)
+
+    def test_rejects_malformed(self):
+        for ip in ("", "1.2.3", "256.1.1.1", "01.2.3.4", "8.8.8.8 ", "example.com", "0.0.0.0"):
+            self.assertFalse(ip_codec.is_public_ip(ip), ip)
+
+    def test_networks(self):
+        self.assertEqual(ip_codec.parse_network("8.8.8.9/24"), (4, 0x08080800, 0x080808FF))
+        self.assertIsNone(ip_codec.parse_network("8.8.8.8/33"))
+        self.assertTrue(ip_codec.is_public_network("8.8.8.0/24"))
+        self.assertFalse(ip_codec.is_public_network("10.0.0.0/8"))
+        self.assertFalse(ip_codec.is_public_network("0.0.0.0/0"))
+        self.assertEqual(extract("8.8.8.0/24 10.0.0.0/8 1.1.1.1", "cidr"), ["8.8.8.0/24", "1.1.1.1"])
+
+    def test_cidrs_only_from_cidr_feeds_as_whole_tokens(self):
+        self.assertEqual(classify("Spamhaus_CIDR"), "cidr")
+        self.assertEqual(classify("CINS_Army"), "ip")
+        # An IP feed keeps just the address; a path after it is not a prefix length.
+        self.assertEqual(extract("8.8.8.0/24", "ip"), ["8.8.8.0"])
+        self.assertEqual(extract("http://1.2.3.4/8/payload.sh", "ip"), ["1.2.3.4"])
+        self.assertEqual(extract("http://1.2.3.4/8/payload.sh", "cidr"), [])
+        self.assertEqual(extract("8.8.8.0/24x,9.9.9.0/24;", "cidr"), ["9.9.9.0/24"])
+
+
+class TestIPColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "sim.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_ingest_encodes_ranges(self):
+        db = DatabaseManager(self.path)
+        db.add_iocs(["8.8.8.8", "8.8.4.4", "9.9.9.9", "8.8.8.0/24", "2001:4860::8888"], "ip", "test")
+        db.add_iocs(["evil.example.com"], "domain", "test")
+
+        self.assertEqual(sorted(db.iocs_in_network("8.8.0.0/16")),
+                         [("8.8.4.4", "ip"), ("8.8.8.0/24", "cidr"), ("8.8.8.8", "ip")])
+        self.assertEqual(sorted(db.matching_iocs("8.8.8.8")), [("8.8.8.0/24", "cidr"), ("8.8.8.8", "ip")])
+        self.assertEqual(db.matching_iocs("8.8.8.200"), [("8.8.8.0/24", "cidr")])
+        self.assertEqual(db.iocs_in_network("2001:4860::/32"), [("2001:4860::8888", "ip")])
+        self.assertEqual(db.matching_iocs("1.2.3.4"), [])
+
+    def test_legacy_rows_are_backfilled(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('''
+            CREATE TABLE threat_intel (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ioc TEXT UNIQUE NOT NULL,
+                ioc_type TEXT NOT NULL,
+                source TEXT,
+                last_seen REAL,
+                confidence INTEGER DEFAULT 50
+            )''')
+        conn.executemany('INSERT INTO threat_intel (ioc, ioc_type, source, last_seen) VALUES (?, ?, ?, 0)',
+                         [("8.8.8.8", "ip", "old"), ("8.8.8.0/24", "ip", "old"), ("abc", "hash", "old")])
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(self.path)
+        self.assertEqual(sorted(db.matching_iocs("8.8.8.8")), [("8.8.8.0/24", "cidr"), ("8.8.8.8", "ip")])
+        with db._connection() as conn:
+            self.assertIsNone(conn.execute("SELECT ip_lo FROM threat_intel WHERE ioc='abc'").fetchone()[0])
+        self.assertTrue(db.get_state("schema.ip_columns_backfilled"))
+
+
+if __name__ == '__main__':
+    unittest.main()
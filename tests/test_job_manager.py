@@ -0,0 +1,201 @@
+import sys
+import os
+import time
+import json
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.job_manager import JobManager, SpooledJob, DONE, FAILED, CANCELLED
+
+PY = sys.executable
+
+
+def script(code):
+    return [PY, "-c", code]
+
+
+class TestJobManager(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs = JobManager(max_workers=4, tool_limits={"slow": 1}, default_limit=2, timeout=10)
+
+    def tearDown(self):
+        self.jobs.shutdown()
+
+    def test_submit_returns_immediately_and_completes(self):
+        start = time.monotonic()
+        job = self.jobs.submit("echo", script("import time; time.sleep(0.3); print('hello')"))
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertFalse(job.done)
+        self.assertTrue(job.wait(10))
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(job.result(), {"success": True, "output": "hello", "error": ""})
+
+    def test_output_streams_incrementally(self):
+        job = self.jobs.submit("echo", script(
+            "import sys, time\n"
+            "for i in range(3):\n"
+            "    print(i, flush=True); time.sleep(0.1)"))
+        seen = []
+        for line in job.follow(timeout=10):
+            seen.append((line, job.done))
+        self.assertEqual([l for l, _ in seen], ["0", "1", "2"])
+        # The first line arrived while the job was still running
+        self.assertFalse(seen[0][1])
+
+    def test_identical_requests_are_deduplicated_and_cached(self):
+        cmd = script("import time; time.sleep(0.2); print('x')")
+        first = self.jobs.submit("echo", cmd)
+        second = self.jobs.submit("echo", cmd)
+        self.assertIs(first, second)
+        first.wait(10)
+        self.assertIs(self.jobs.submit("echo", cmd), first)
+        self.assertEqual(self.jobs.stats["deduped"], 1)
+        self.assertEqual(self.jobs.stats["cached"], 1)
+        self.assertEqual(self.jobs.stats["started"], 1)
+
+    def test_cache_expires_after_ttl(self):
+        jobs = JobManager(result_ttl=0.0)
+        try:
+            cmd = script("print('x')")
+            first = jobs.submit("echo", cmd)
+            first.wait(10)
+            time.sleep(0.01)
+            second = jobs.submit("echo", cmd)
+            self.assertIsNot(first, second)
+            self.assertIsNone(jobs.get(first.id))
+            second.wait(10)
+        finally:
+            jobs.shutdown()
+
+    def test_per_tool_limit(self):
+        running = []
+        jobs = [self.jobs.submit("slow", script(f"import time; time.sleep(0.2); print({i})")) for i in range(3)]
+        deadline = time.monotonic() + 10
+        while not all(j.done for j in jobs) and time.monotonic() < deadline:
+            running.append(sum(1 for j in jobs if j.status == "running"))
+            time.sleep(0.01)
+        self.assertTrue(all(j.status == DONE for j in jobs))
+        self.assertEqual(max(running), 1)
+
+    def test_fallback_and_missing_command(self):
+        job = self.jobs.submit("wifi", ["definitely-not-a-real-binary"], fallbacks=[script("print('fallback')")])
+        job.wait(10)
+        self.assertEqual(job.result()["output"], "fallback")
+
+        # A failed command's stdout streams but is not part of the fallback's result.
+        job = self.jobs.submit("wifi", script("print('partial'); raise SystemExit(1)"),
+                               fallbacks=[script("print('fallback')")])
+        job.wait(10)
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(job.result()["output"], "fallback")
+        self.assertEqual(job.to_dict()["output"], ["partial", "fallback"])
+
+        job = self.jobs.submit("wifi", ["definitely-not-a-real-binary"])
+        job.wait(10)
+        self.assertEqual(job.status, FAILED)
+        self.assertIn("Command not found", job.error)
+
+    def test_timeout_and_cancel(self):
+        job = self.jobs.submit("echo", script("import time; time.sleep(30)"), timeout=0.2)
+        job.wait(10)
+        self.assertEqual(job.status, FAILED)
+        self.assertIn("Timed out", job.error)
+
+        job = self.jobs.submit("echo", script("import time; time.sleep(30)"))
+        while job.process is None and not job.done:
+            time.sleep(0.01)
+        self.assertTrue(self.jobs.cancel(job.id))
+        job.wait(10)
+        self.assertEqual(job.status, CANCELLED)
+
+    def test_spooled_job_visible_to_other_managers(self):
+        spool = tempfile.mkdtemp()
+        owner = JobManager(spool_dir=spool)
+        other = JobManager(spool_dir=spool)
+        try:
+            job = owner.submit("echo", script("print('a'); print('b')"))
+            job.wait(10)
+            view = other.get(job.id)
+            self.assertIsInstance(view, SpooledJob)
+            self.assertEqual(view.status, DONE)
+            self.assertEqual(view.to_dict(since=1)["output"], ["b"])
+            self.assertEqual(list(view.follow()), ["a", "b"])
+            self.assertIsNone(other.get("../../etc/passwd"))
+            self.assertFalse(other.cancel(job.id))   # already finished
+
+            job = owner.submit("echo", script("import time; print('x', flush=True); time.sleep(30)"))
+            self.assertEqual(next(job.follow(timeout=10)), "x")
+            self.assertTrue(other.cancel(job.id))
+            self.assertTrue(job.wait(10))
+            self.assertEqual(job.status, CANCELLED)
+            self.assertEqual(other.get(job.id).status, CANCELLED)
+        finally:
+            owner.shutdown()
+            other.shutdown()
+            shutil.rmtree(spool, ignore_errors=True)
+
+
+    def test_limits_and_dedup_span_processes_sharing_a_spool(self):
+        spool = tempfile.mkdtemp()
+        a = JobManager(tool_limits={"slow": 1}, spool_dir=spool)
+        b = JobManager(tool_limits={"slow": 1}, spool_dir=spool)
+        try:
+            cmd = script("import time; time.sleep(0.5); print('a')")
+            first = a.submit("slow", cmd)
+            second = b.submit("slow", script("print('b')"))
+            joined = b.submit("slow", cmd)
+            self.assertIsInstance(joined, SpooledJob)
+            self.assertEqual(joined.id, first.id)
+            self.assertEqual(b.stats["deduped"], 1)
+
+            running = []
+            deadline = time.monotonic() + 10
+            while not (first.done and second.done) and time.monotonic() < deadline:
+                running.append((first.status == "running") + (second.status == "running"))
+                time.sleep(0.01)
+            self.assertEqual((first.status, second.status), (DONE, DONE))
+            self.assertEqual(max(running), 1)
+            self.assertGreater(second.started, first.finished)
+        finally:
+            a.shutdown()
+            b.shutdown()
+            shutil.rmtree(spool, ignore_errors=True)
+
+    def test_spool_expires_without_new_submits(self):
+        spool = tempfile.mkdtemp()
+        jobs = JobManager(result_ttl=0.1, spool_dir=spool)
+        try:
+            job = jobs.submit("echo", script("print('x')"))
+            job.wait(10)
+            deadline = time.monotonic() + 5
+            while os.listdir(spool) != [".lock"] and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self.assertEqual(os.listdir(spool), [".lock"])
+        finally:
+            jobs.shutdown()
+            shutil.rmtree(spool, ignore_errors=True)
+
+    def test_job_of_a_dead_worker_reads_as_failed(self):
+        spool = tempfile.mkdtemp()
+        try:
+            dead = subprocess.Popen(script("pass"))
+            dead.wait()
+            job_id = "ab" * 16
+            with open(os.path.join(spool, job_id + ".json"), "w") as f:
+                json.dump({"job_id": job_id, "pid": dead.pid, "status": "running", "finished": None,
+                           "error": ""}, f)
+            view = SpooledJob.load(spool, job_id)
+            self.assertEqual(view.status, FAILED)
+            self.assertEqual(list(view.follow(timeout=5)), [])
+            self.assertTrue(view.wait(0))
+        finally:
+            shutil.rmtree(spool, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
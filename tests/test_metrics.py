@@ -0,0 +1,124 @@
+import sys
+import os
+import uuid
+import random
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.core.ooda import OODALoop
+from ant_swarm.core.metrics import (Histogram, MetricsRegistry, MetricsPublisher, MetricsReader,
+                                    bucket_index, bucket_bounds, render_prometheus, registry)
+
+
+class SlowAgent(OODALoop):
+    def __init__(self, name, cycle_time, delays):
+        super().__init__(name, cycle_time=cycle_time)
+        self.delays = delays
+
+    def decide(self, orientation):
+        return ("SCAN" if len(self.delays) % 2 else "IGNORE", orientation)
+
+    def act(self, decision):
+        self.delays.pop()
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_buckets_are_contiguous_and_tight(self):
+        previous_high = -1
+        for index in range(bucket_index(10 ** 12) + 1):
+            low, high = bucket_bounds(index)
+            self.assertEqual(low, previous_high + 1)
+            self.assertLessEqual(high - low, max(1, low) / 32)
+            previous_high = high
+        for value in [0, 1, 31, 32, 63, 64, 1000, 123456789, 2 ** 40 + 7]:
+            h = Histogram()
+            h.record(value)
+            (index, count), = h.counts.items()
+            self.assertEqual(index, bucket_index(value))
+            low, high = bucket_bounds(index)
+            self.assertTrue(low <= value <= high)
+
+    def test_percentiles_within_resolution(self):
+        random.seed(3)
+        values = [random.randint(1000, 10 ** 9) for _ in range(20000)]
+        h = Histogram()
+        for v in values:
+            h.record(v)
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * len(values)) - 1]
+            self.assertAlmostEqual(h.percentile(q) / exact, 1.0, delta=0.04)
+        self.assertEqual(h.percentile(1.0), max(values))
+        self.assertEqual(Histogram.from_dict(h.to_dict()).percentile(0.9), h.percentile(0.9))
+
+
+class TestAgentMetrics(unittest.TestCase):
+
+    def setUp(self):
+        registry.clear()
+
+    def test_step_records_phases_actions_and_overruns(self):
+        agent = SlowAgent("Timed", cycle_time=1e-9, delays=[0, 0, 0])
+        for _ in range(3):
+            agent.step()
+        m = agent.metrics
+        self.assertEqual(m.cycles, 3)
+        self.assertEqual(m.overruns, 3)   # every cycle exceeds a 1ns budget
+        self.assertEqual({p: h.count for p, h in m.phases.items()},
+                         {"observe": 3, "orient": 3, "decide": 3, "act": 3, "cycle": 3})
+        self.assertEqual({a: h.count for a, h in m.actions.items()}, {"SCAN": 2, "IGNORE": 1})
+
+    def test_errors_counted_and_reraised(self):
+        agent = SlowAgent("Failing", cycle_time=1.0, delays=[])
+        with self.assertRaises(IndexError):
+            agent.step()
+        self.assertEqual(agent.metrics.errors, 1)
+        self.assertEqual(agent.metrics.cycles, 0)
+
+    def test_prometheus_text(self):
+        reg = MetricsRegistry()
+        m = reg.agent('Blue"1', 1.0)
+        m.record_cycle(0, 1000, 2000, 3000, 2 * 10 ** 9, action="HEURISTIC_SCAN")
+        text = render_prometheus(reg.snapshot())
+        self.assertIn('ooda_cycles_total{agent="Blue\\"1"} 1', text)
+        self.assertIn('ooda_cycle_overruns_total{agent="Blue\\"1"} 1', text)
+        self.assertIn('ooda_action_duration_seconds_count{agent="Blue\\"1",action="HEURISTIC_SCAN"} 1', text)
+        buckets = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+                   if line.startswith('ooda_phase_duration_seconds_bucket{agent="Blue\\"1",phase="act"')]
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertEqual(buckets[-1], 1)
+        # act took ~2s: not in the 1s bucket, in the 2.5s one.
+        self.assertIn('phase="act",le="1.0"} 0', text)
+        self.assertIn('phase="act",le="2.5"} 1', text)
+        for line in text.splitlines():
+            self.assertTrue(line.startswith("#") or len(line.rsplit(" ", 1)) == 2)
+
+
+class TestMetricsSharing(unittest.TestCase):
+
+    def test_reader_prefers_published_snapshot(self):
+        name = f"test_metrics_{uuid.uuid4().hex[:8]}"
+        published = MetricsRegistry()
+        published.agent("Hive", 1.0).record_cycle(0, 1, 2, 3, 4, "OBSERVE")
+        local = MetricsRegistry()
+        local.agent("Worker", 1.0)
+        idle = MetricsReader(name, fallback=local)
+        self.assertEqual(list(idle.snapshot()["agents"]), ["Worker"])
+        idle.reader.close()
+
+        publisher = MetricsPublisher(published, name=name, interval=60)
+        publisher.start()
+        reader = MetricsReader(name, fallback=local)
+        try:
+            text = reader.render()
+            self.assertIn('ooda_cycles_total{agent="Hive"} 1', text)
+            self.assertNotIn("Worker", text)
+        finally:
+            reader.reader.close()
+            publisher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.memory.q_table import QTable
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BLUE_ACTIONS = ["SIGNATURE_SCAN", "HEURISTIC_SCAN", "OBSERVE", "IGNORE",
+                "WIFI_DEFENSE", "WEB_WAF", "NET_IDS", "NETWORK_HUNT"]
+RED_ACTIONS = ["T1046_RECON", "T1027_OBFUSCATE", "T1003_ROOTKIT", "T1589_LURK",
+               "T1046_WIFI_SCAN", "T1046_NET_SCAN", "T1190_WEB_EXPLOIT",
+               "T1071_C2_BEACON", "T1547_PERSIST"]
+
+
+class TestQTable(unittest.TestCase):
+
+    def assertRoundTrip(self, filename, actions):
+        with open(os.path.join(BASE_DIR, filename)) as f:
+            original = json.load(f)
+        table = QTable.from_dict(original, actions)
+        self.assertEqual(table.to_dict(), original)
+        self.assertEqual(len(table), len(original))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, filename)
+            table.save(path)
+            self.assertEqual(QTable.load(path, actions).to_dict(), original)
+
+    def test_round_trip_blue(self):
+        self.assertRoundTrip("blue_q_table.json", BLUE_ACTIONS)
+
+    def test_round_trip_red(self):
+        self.assertRoundTrip("red_q_table.json", RED_ACTIONS)
+
+    def test_unknown_actions_are_preserved(self):
+        table = QTable.from_dict({"1_0_RETIRED_ACTION": 2.5, "1_0_IGNORE": -1.0}, BLUE_ACTIONS)
+        self.assertEqual(table.to_dict(), {"1_0_IGNORE": -1.0, "1_0_RETIRED_ACTION": 2.5})
+
+    def test_argmax_and_update(self):
+        table = QTable(["A", "B", "C"])
+        sid = table.state_id("s")
+        self.assertEqual(table.argmax(sid), 0)  # all-zero row: first action wins
+        table.update(sid, 2, 10.0, 0.5)
+        self.assertEqual(table.get(sid, 2), 5.0)
+        self.assertEqual(table.argmax(sid), 2)
+        self.assertEqual(table.row_max(sid), 5.0)
+        self.assertEqual(table.to_dict(), {"s_C": 5.0})
+
+    def test_visit_weighted_merge(self):
+        master = QTable(["A", "B"])
+        master.set(master.state_id("s"), 1, 7.0)
+
+        w1, w2 = QTable(["A", "B"]), QTable(["A", "B"])
+        for _ in range(3):
+            w1.update(w1.state_id("s"), 0, 4.0, 1.0)
+        w2.update(w2.state_id("s"), 0, 8.0, 1.0)
+
+        master.merge([w1, w2])
+        sid = master.state_id("s")
+        self.assertEqual(master.get(sid, 0), (4.0 * 3 + 8.0) / 4)
+        self.assertEqual(master.get(sid, 1), 7.0)  # unvisited cell keeps master value
+        self.assertEqual(master.visits[sid * master.width], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import sys
+import os
+import time
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.core.ooda import OODALoop
+from ant_swarm.core.scheduler import Scheduler
+
+PERIOD = 0.05
+
+
+class TickAgent(OODALoop):
+    def __init__(self, name):
+        super().__init__(name, cycle_time=PERIOD)
+        self.ticks = []
+
+    def act(self, decision):
+        self.ticks.append(time.monotonic())
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = Scheduler(workers=2).start()
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_period_holds_despite_work(self):
+        starts = []
+
+        def work():
+            starts.append(time.monotonic())
+            time.sleep(PERIOD * 0.6)
+
+        task = self.scheduler.add(work, PERIOD, name="work")
+        time.sleep(PERIOD * 10.5)
+        task.cancel()
+        # Fixed rate: the n-th start is n periods after the first, not n * (period + work).
+        drift = starts[-1] - starts[0] - (len(starts) - 1) * PERIOD
+        self.assertGreaterEqual(len(starts), 9)
+        self.assertLess(abs(drift), PERIOD * 0.5)
+        self.assertEqual(task.stats.skipped, 0)
+        self.assertEqual(task.stats.lag.count, len(starts))
+
+    def test_overrun_skips_missed_periods_and_never_overlaps(self):
+        active = []
+        overlaps = []
+
+        def slow():
+            if active: overlaps.append(True)
+            active.append(1)
+            time.sleep(PERIOD * 2.5)
+            active.pop()
+
+        task = self.scheduler.add(slow, PERIOD, name="slow")
+        time.sleep(PERIOD * 8)
+        task.cancel()
+        self.assertEqual(overlaps, [])
+        self.assertGreaterEqual(task.stats.skipped, 2)
+        self.assertLessEqual(task.runs, 4)
+
+    def test_wake_runs_early(self):
+        ran = threading.Event()
+        task = self.scheduler.add(ran.set, 60.0, name="rare", delay=60.0)
+        self.assertFalse(ran.wait(0.1))
+        task.wake()
+        self.assertTrue(ran.wait(1.0))
+        self.assertEqual(task.runs, 1)
+
+    def test_failing_task_keeps_its_schedule(self):
+        calls = []
+
+        def boom():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        task = self.scheduler.add(boom, PERIOD, name="boom")
+        time.sleep(PERIOD * 3.5)
+        task.cancel()
+        self.assertGreaterEqual(len(calls), 3)
+
+    def test_agents_share_one_scheduler(self):
+        agents = [TickAgent(f"tick_{i}") for i in range(6)]
+        for agent in agents:
+            agent.scheduler = self.scheduler
+            agent.start()
+        time.sleep(PERIOD * 6.5)
+        for agent in agents:
+            agent.stop()
+        counts = [len(agent.ticks) for agent in agents]
+        self.assertTrue(all(6 <= c <= 8 for c in counts), counts)
+        stats = self.scheduler.stats()
+        self.assertEqual(stats, {})   # stopped agents are removed
+        self.assertGreater(agents[0].metrics.lag.count, 0)
+        after = [len(agent.ticks) for agent in agents]
+        time.sleep(PERIOD * 2)
+        self.assertEqual([len(agent.ticks) for agent in agents], after)
+
+    def test_agent_wake_cuts_wait_short(self):
+        agent = TickAgent("sleepy")
+        agent.cycle_time = 60.0
+        agent.scheduler = self.scheduler
+        agent.start()
+        time.sleep(0.1)
+        self.assertEqual(len(agent.ticks), 1)   # first cycle runs immediately
+        agent.wake()
+        time.sleep(0.1)
+        self.assertEqual(len(agent.ticks), 2)
+        self.assertIn("sleepy", self.scheduler.stats())
+        agent.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
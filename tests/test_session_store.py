@@ -0,0 +1,95 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.session_store import SessionStore
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.store = SessionStore(os.path.join(self.workdir, "sessions.db"), sweep_batch=10)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_touch_keeps_created_at(self):
+        first = self.store.touch("alice", timeout=60, now=1000.0)
+        second = self.store.touch("alice", timeout=120, now=1030.0)
+        self.assertEqual(first, {"created_at": 1000.0, "last_accessed": 1000.0, "status": "active", "timeout": 60})
+        self.assertEqual(second["created_at"], 1000.0)
+        self.assertEqual(second["last_accessed"], 1030.0)
+        self.assertEqual(second["timeout"], 120)
+
+    def test_expired_session_is_recreated(self):
+        self.store.touch("alice", timeout=10, now=1000.0)
+        again = self.store.touch("alice", timeout=10, now=1011.0)
+        self.assertEqual(again["created_at"], 1011.0)
+
+    def test_sweep_is_batched_and_only_removes_expired(self):
+        for i in range(25):
+            self.store.touch(f"old_{i}", timeout=10, now=1000.0)
+        self.store.touch("fresh", timeout=1000, now=1000.0)
+        self.assertEqual(len(self.store), 26)
+
+        # Each touch removes at most one batch of expired sessions.
+        self.store.touch("trigger", timeout=1000, now=2000.0)
+        self.assertEqual(len(self.store), 26 - 10 + 1)
+        self.assertEqual(self.store.sweep(now=2000.0), 15)
+        self.assertEqual(sorted(self.store.all()), ["fresh", "trigger"])
+        self.assertEqual(self.store.sweep(now=2000.0), 0)
+
+    def test_import_legacy_json(self):
+        legacy = os.path.join(self.workdir, "sessions.json")
+        with open(legacy, "w") as f:
+            json.dump({"bob": {"created_at": 5.0, "last_accessed": 50.0, "status": "active", "timeout": 30},
+                       "broken": "not a dict"}, f)
+        self.store.touch("bob", timeout=60, now=40.0)
+        self.assertEqual(self.store.import_json(legacy), 0)   # never overwrites
+        self.store.touch("carol", now=40.0)
+        other = SessionStore(os.path.join(self.workdir, "other.db"))
+        try:
+            self.assertEqual(other.import_json(legacy), 1)
+            self.assertEqual(other.get("bob")["created_at"], 5.0)
+            self.assertIsNone(other.get("broken"))
+        finally:
+            other.close()
+
+    def test_timeout_keeps_its_type(self):
+        self.assertIs(type(self.store.touch("alice", timeout=1800, now=1.0)["timeout"]), int)
+        self.assertIs(type(self.store.get("alice")["timeout"]), int)
+        self.assertEqual(self.store.touch("bob", timeout=2.5, now=1.0)["timeout"], 2.5)
+
+    def test_json_file_mirrors_the_store(self):
+        legacy = os.path.join(self.workdir, "sessions.json")
+        store = SessionStore(os.path.join(self.workdir, "mirrored.db"), json_path=legacy)
+        try:
+            store.touch("alice", timeout=60, now=1000.0)
+            store.touch("bob", timeout=10, now=1000.0)
+            with open(legacy) as f:
+                self.assertEqual(json.load(f)["alice"]["timeout"], 60)
+            store.touch("carol", timeout=60, now=1020.0)   # sweeps bob
+            with open(legacy) as f:
+                self.assertEqual(sorted(json.load(f)), ["alice", "carol"])
+
+            os.remove(legacy)   # clears the store, as it did with the JSON backend
+            store.touch("dave", now=1030.0)
+            self.assertEqual(list(store.all()), ["dave"])
+        finally:
+            store.close()
+
+    def test_close_reopens_on_next_use(self):
+        self.store.touch("alice", now=1.0)
+        self.store.close()
+        self.assertIn("alice", self.store.all())
+
+
+if __name__ == '__main__':
+    unittest.main()
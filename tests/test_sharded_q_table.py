@@ -0,0 +1,151 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.memory.q_table import QTable
+from ant_swarm.memory.checkpoint import QCheckpoint
+from ant_swarm.memory.sharded import ShardedQTable, SharedQTable
+from tests.helpers import scratch_db
+
+ACTIONS = ["A", "B_C", "D"]
+
+
+class TestShardedQTable(unittest.TestCase):
+
+    def test_matches_plain_table(self):
+        """Same updates, same values: sharding only changes where rows live."""
+        plain, sharded = QTable(ACTIONS), ShardedQTable(ACTIONS, shards=4)
+        for i in range(50):
+            state = f"{i % 5}_{i % 7}"
+            for table in (plain, sharded):
+                table.update(table.state_id(state), i % 3, float(i), 0.4)
+
+        for state in plain.states:
+            p, s = plain.state_id(state), sharded.state_id(state)
+            self.assertEqual(list(sharded.row(s)), list(plain.row(p)))
+            self.assertEqual(sharded.argmax(s), plain.argmax(p))
+            self.assertEqual(sharded.row_max(s), plain.row_max(p))
+        self.assertEqual(sharded.to_dict(), plain.to_dict())
+        self.assertEqual(len(sharded), len(plain))
+        self.assertEqual(sharded.total_updates, 50)
+
+    def test_state_id_encodes_shard(self):
+        table = ShardedQTable(ACTIONS, shards=8)
+        sid = table.state_id("3_2")
+        self.assertEqual(sid % 8, table.shard_of("3_2"))
+        self.assertEqual(table.state_id("3_2"), sid)
+
+    def test_concurrent_updates_not_lost(self):
+        """Threads hammering overlapping states lose no updates or visits."""
+        table = ShardedQTable(ACTIONS, shards=4)
+        per_thread, threads = 2000, 8
+
+        def work(n):
+            for i in range(per_thread):
+                table.update(table.state_id(f"s{(i + n) % 10}"), i % 3, 1.0, 0.1)
+
+        workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+        for t in workers: t.start()
+        for t in workers: t.join()
+
+        snapshot = table.snapshot()
+        self.assertEqual(table.total_updates, per_thread * threads)
+        self.assertEqual(sum(snapshot.visits), per_thread * threads)
+        self.assertEqual(len(snapshot.states), 10)
+
+    def test_from_table_round_trip(self):
+        plain = QTable(ACTIONS)
+        plain.set(plain.state_id("1_0"), 0, 2.0)
+        plain.update(plain.state_id("1_1"), 1, -4.0, 0.5)
+        plain.extra["1_0_RETIRED"] = 9.0
+
+        snapshot = ShardedQTable.from_table(plain, shards=3).snapshot()
+        self.assertEqual(snapshot.to_dict(), plain.to_dict())
+        self.assertEqual(sorted(snapshot.visits), sorted(plain.visits))
+        self.assertEqual(snapshot.dirty, set())
+
+    def test_snapshot_takes_dirty_cells_once(self):
+        table = ShardedQTable(ACTIONS, shards=4)
+        table.set(table.state_id("a"), 2, 1.0)
+        table.set(table.state_id("b"), 0, 2.0)
+
+        first = table.snapshot(take_dirty=True)
+        cells = {(first.states[i // 3], i % 3) for i in first.dirty}
+        self.assertEqual(cells, {("a", 2), ("b", 0)})
+        self.assertEqual(table.snapshot(take_dirty=True).dirty, set())
+
+
+class TestSharedQTable(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.ckpt = os.path.join(self.tmp, "q.qck")
+        self.json = os.path.join(self.tmp, "q.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_saves_deltas_and_reloads(self):
+        memory = SharedQTable(self.ckpt, self.json, ACTIONS, shards=4)
+        q = memory.table
+        q.update(q.state_id("1_0"), 0, 10.0, 0.5)
+        self.assertTrue(memory.save())       # first save writes the base
+        q.update(q.state_id("2_0"), 1, 4.0, 0.5)
+        self.assertTrue(memory.save())       # then a delta
+        self.assertTrue(os.path.exists(QCheckpoint(self.ckpt).log_path))
+
+        reloaded = SharedQTable(self.ckpt, self.json, ACTIONS, shards=2)
+        self.assertEqual(reloaded.table.to_dict(), {"1_0_A": 5.0, "2_0_B_C": 2.0})
+
+    def test_non_blocking_save_skips_while_saving(self):
+        memory = SharedQTable(self.ckpt, self.json, ACTIONS)
+        with memory._save_lock:
+            self.assertFalse(memory.save(blocking=False))
+        self.assertTrue(memory.save(blocking=False))
+
+    def test_failed_save_keeps_cells_dirty(self):
+        memory = SharedQTable(self.ckpt, self.json, ACTIONS, shards=2)
+        memory.save()
+        q = memory.table
+        q.set(q.state_id("x"), 1, 3.0)
+        memory.checkpoint.path = os.path.join(self.tmp, "missing", "q.qck")
+        with self.assertRaises(OSError):
+            memory.save()
+
+        memory.checkpoint.path = self.ckpt
+        self.assertTrue(memory.save())
+        reloaded = SharedQTable(self.ckpt, self.json, ACTIONS)
+        self.assertEqual(reloaded.table.to_dict(), {"x_B_C": 3.0})
+
+
+class TestSwarm(unittest.TestCase):
+
+    def setUp(self):
+        self.artifact_dir = tempfile.mkdtemp()
+        self.workdir = scratch_db(self)
+
+    def tearDown(self):
+        shutil.rmtree(self.artifact_dir, ignore_errors=True)
+
+    def test_team_shares_one_table(self):
+        from ant_swarm.core.simulation import build_match
+
+        engine = build_match(self.artifact_dir, seed=3, blue=3, red=2, memory_dir=self.workdir)
+        blues, reds = engine.agents[:3], engine.agents[3:]
+        self.assertEqual([a.agent_name for a in blues], ["BlueDefender-1", "BlueDefender-2", "BlueDefender-3"])
+        self.assertTrue(all(a.q_table is blues[0].q_table for a in blues))
+        self.assertTrue(all(a.q_table is reds[0].q_table for a in reds))
+
+        engine.run(3.0)
+        # Blue cycles at 1.0s, Red at 1.5s: every step is one learning update.
+        self.assertEqual(blues[0].q_table.total_updates, 3 * 3)
+        self.assertEqual(reds[0].q_table.total_updates, 2 * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import sys
+import os
+import uuid
+import threading
+import unittest
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.core.hive import HiveState
+from ant_swarm.core.shm_state import SharedStateWriter, SharedStateReader, SharedHivePublisher
+
+
+def _read_in_child(name, out):
+    reader = SharedStateReader(name)
+    out.put(reader.read())
+    reader.close()
+
+
+class TestSharedState(unittest.TestCase):
+
+    def setUp(self):
+        self.name = f"ant_swarm_test_{uuid.uuid4().hex[:8]}"
+        self.writer = SharedStateWriter(self.name, size=4096)
+        self.reader = SharedStateReader(self.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_round_trip_and_cached_parse(self):
+        self.assertIsNone(self.reader.read())
+        self.writer.publish({"defcon": 3})
+        first = self.reader.read()
+        self.assertEqual(first, {"defcon": 3})
+        # Unchanged sequence returns the already-decoded value
+        self.assertIs(self.reader.read(), first)
+
+    def test_oversized_payload_rejected(self):
+        self.assertFalse(self.writer.publish({"blob": "x" * 8192}))
+
+    def test_reader_sees_writer_close(self):
+        self.writer.publish({"defcon": 4})
+        self.assertIsNotNone(self.reader.read())
+        self.writer.close()
+        self.assertIsNone(self.reader.read())
+
+    def test_other_process_reads(self):
+        self.writer.publish({"defcon": 2, "mood": "AGGRESSIVE"})
+        ctx = multiprocessing.get_context("spawn")
+        out = ctx.Queue()
+        proc = ctx.Process(target=_read_in_child, args=(self.name, out))
+        proc.start()
+        value = out.get(timeout=30)
+        proc.join(30)
+        self.assertEqual(value, {"defcon": 2, "mood": "AGGRESSIVE"})
+
+    def test_concurrent_reads_are_consistent(self):
+        done = threading.Event()
+
+        def write():
+            for i in range(5000):
+                self.writer.publish({"a": i, "b": i, "pad": "y" * (i % 200)})
+            done.set()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        reads = 0
+        while not done.is_set():
+            value = self.reader.read()
+            if value is not None:
+                self.assertEqual(value["a"], value["b"])
+                reads += 1
+        thread.join()
+        self.assertGreater(reads, 0)
+
+
+class TestSharedHivePublisher(unittest.TestCase):
+
+    def test_publishes_each_version(self):
+        hive = HiveState()
+        hive.reset()
+        name = f"ant_swarm_test_{uuid.uuid4().hex[:8]}"
+        publisher = SharedHivePublisher(hive, name, size=4096)
+        reader = SharedStateReader(name)
+        publisher.start()
+        try:
+            hive.update_defcon(2)
+            snap = hive.snapshot()
+            for _ in range(200):
+                value = reader.read()
+                if value and value["version"] == snap.version:
+                    break
+                threading.Event().wait(0.01)
+            self.assertEqual(value["state"]["defcon"], 2)
+            self.assertEqual(value["state"]["active_threats"], [])
+        finally:
+            reader.close()
+            publisher.stop()
+            hive.reset()
+
+
+if __name__ == '__main__':
+    unittest.main()
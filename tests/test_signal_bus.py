@@ -0,0 +1,79 @@
+import sys
+import os
+import time
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.core.hive import SignalBus, HiveState
+
+
+class TestSignalBus(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = SignalBus()
+        self.subscriptions = []
+
+    def tearDown(self):
+        self.bus.disable_async()
+        for topic, callback in self.subscriptions:
+            self.bus.unsubscribe(topic, callback)
+
+    def subscribe(self, topic, callback):
+        self.bus.subscribe(topic, callback)
+        self.subscriptions.append((topic, callback))
+
+    def test_sync_delivery_and_unsubscribe(self):
+        seen = []
+        self.subscribe("TEST_SYNC", seen.append)
+        self.bus.publish("TEST_SYNC", 1)
+        self.bus.unsubscribe("TEST_SYNC", seen.append)
+        self.bus.publish("TEST_SYNC", 2)
+        self.assertEqual(seen, [1])
+        self.assertEqual(self.bus.stats()["TEST_SYNC"]["published"], 2)
+
+    def test_slow_subscriber_does_not_block_publisher(self):
+        release = threading.Event()
+        fast_seen = []
+        self.subscribe("TEST_ASYNC", lambda data: release.wait(2))
+        self.subscribe("TEST_ASYNC", fast_seen.append)
+        self.bus.enable_async(workers=2)
+
+        start = time.perf_counter()
+        for i in range(20):
+            self.bus.publish("TEST_ASYNC", i)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        deadline = time.monotonic() + 2
+        while len(fast_seen) < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(fast_seen, list(range(20)))  # per-subscriber order kept
+        self.assertGreater(self.bus.stats()["TEST_ASYNC"]["queue_depth"], 0)
+        release.set()
+
+    def test_full_queue_drops_and_counts(self):
+        release = threading.Event()
+        self.subscribe("TEST_DROP", lambda data: release.wait(2))
+        self.bus.enable_async(workers=1, queue_size=5)
+        for i in range(20):
+            self.bus.publish("TEST_DROP", i)
+        release.set()
+        self.bus.disable_async()
+
+        stats = self.bus.stats()["TEST_DROP"]
+        self.assertGreater(stats["dropped"], 0)
+        self.assertEqual(stats["delivered"] + stats["dropped"], 20)
+
+    def test_hive_publishes_outside_state_lock(self):
+        got_state = []
+        self.subscribe("MOOD_CHANGE", lambda mood: got_state.append(HiveState().get_state()["mood"]))
+        hive = HiveState()
+        old = hive.get_state()["mood"]
+        hive.update_mood("AGGRESSIVE")  # would deadlock if published under the lock
+        hive.update_mood(old)
+        self.assertEqual(got_state, ["AGGRESSIVE", old])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.core.ooda import OODALoop
+from ant_swarm.core.simulation import SimulationEngine, build_match
+from tests.helpers import scratch_db
+
+
+class CountingAgent(OODALoop):
+    def __init__(self, name, cycle_time):
+        super().__init__(name, cycle_time=cycle_time)
+        self.ticks = []
+
+    def act(self, decision):
+        self.ticks.append(self.clock())
+
+
+class TestSimulationEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.artifact_dir = tempfile.mkdtemp()
+        self.workdir = scratch_db(self)
+
+    def tearDown(self):
+        shutil.rmtree(self.artifact_dir, ignore_errors=True)
+
+    def test_relative_cadence(self):
+        """Agents step at their own cycle_time on the virtual clock."""
+        fast = CountingAgent("fast", 1.0)
+        slow = CountingAgent("slow", 1.5)
+        engine = SimulationEngine([fast, slow], self.artifact_dir)
+        engine.run(30.0)
+
+        self.assertEqual(len(fast.ticks), 30)
+        self.assertEqual(len(slow.ticks), 20)
+        self.assertEqual(slow.ticks[:3], [0.0, 1.5, 3.0])
+        self.assertEqual(engine.clock.now, 30.0)
+
+    def test_episodes_reset_artifacts(self):
+        """Each episode starts from an empty artifact directory."""
+        engine = build_match(self.artifact_dir, seed=7, memory_dir=self.workdir)
+        stats = engine.run_episodes(5, episode_length=6.0)
+
+        self.assertEqual(stats["episodes"], 5)
+        self.assertEqual(stats["steps"], 5 * (6 + 4))
+        engine.reset()
+        self.assertEqual(os.listdir(self.artifact_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ant_swarm.tools.status_stream import StatusBroadcaster, diff, format_event
+
+
+class TestStatusBroadcaster(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "hive_state.json")
+        self.loads = 0
+        self._write({"defcon": 5, "mood": "NEUTRAL"})
+        self.broadcaster = StatusBroadcaster({"hive": ([self.path], self._load)})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _write(self, state):
+        with open(self.path, 'w') as f:
+            json.dump(state, f)
+        # Make sure the signature moves even on coarse-mtime filesystems.
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000 * (self.loads + 1)))
+
+    def _load(self):
+        self.loads += 1
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _drain(self, client):
+        items = []
+        while not client.queue.empty():
+            items.append(client.queue.get_nowait())
+        return items
+
+    def test_unchanged_source_is_not_reread(self):
+        self.broadcaster.poll()
+        for _ in range(10):
+            self.assertEqual(self.broadcaster.poll(), 0)
+        self.assertEqual(self.loads, 1)
+
+    def test_failed_load_is_retried(self):
+        failures = [OSError("busy")]
+
+        def flaky():
+            if failures:
+                raise failures.pop()
+            return {"defcon": 4}
+
+        broadcaster = StatusBroadcaster({"hive": (lambda: "same", flaky)})
+        self.assertEqual(broadcaster.poll(), 0)
+        self.assertEqual(broadcaster.poll(), 1)
+        self.assertEqual(broadcaster.snapshot(), {"hive": {"defcon": 4}})
+
+    def test_clients_share_one_read_and_get_deltas(self):
+        self.broadcaster.poll()
+        clients = [self.broadcaster.subscribe() for _ in range(50)]
+
+        self._write({"defcon": 3, "mood": "NEUTRAL"})
+        self.assertEqual(self.broadcaster.poll(), 1)
+        self.assertEqual(self.loads, 2)
+
+        for client in clients:
+            (_, event, snap), (_, name, delta) = self._drain(client)
+            self.assertEqual(event, "snapshot")
+            self.assertEqual(snap["hive"]["defcon"], 5)
+            self.assertEqual(name, "hive")
+            self.assertEqual(delta, {"defcon": 3})
+
+    def test_slow_client_resyncs(self):
+        broadcaster = StatusBroadcaster({"hive": ([self.path], self._load)}, client_queue_size=2)
+        client = broadcaster.subscribe()
+        for level in (4, 3, 2):
+            self._write({"defcon": level})
+            broadcaster.poll()
+        items = self._drain(client)
+        self.assertEqual(items[0][1], "snapshot")
+        # Snapshot plus the deltas after it still add up to the latest state
+        state = dict(items[0][2]["hive"])
+        for _, name, delta in items[1:]:
+            state.update(delta)
+        self.assertEqual(state["defcon"], 2)
+        self.assertGreater(client.dropped, 0)
+
+    def test_event_stream_unsubscribes_on_close(self):
+        client = self.broadcaster.subscribe()
+        events = self.broadcaster.events(client, heartbeat=0.01)
+        self.assertTrue(next(events).startswith("retry:"))
+        self.assertIn("event: snapshot", next(events))
+        self.assertEqual(next(events), ": keep-alive\n\n")
+        events.close()
+        self.assertEqual(self.broadcaster.client_count, 0)
+
+    def test_diff_and_format(self):
+        self.assertEqual(diff({"a": 1, "b": 2}, {"a": 1, "c": 3}), {"c": 3, "b": None})
+        self.assertEqual(format_event("red", {"x": 1}, 7), 'id: 7\nevent: red\ndata: {"x":1}\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
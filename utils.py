@@ -1,13 +1,19 @@
 import os
 import fcntl
 import logging
-import math
 import random
-import json
-import time
+import threading
+
+from ant_swarm.tools.entropy import shannon_entropy
+from ant_swarm.tools.session_store import SessionStore, DEFAULT_SESSION_TIMEOUT
 
 # Constants
-DEFAULT_SESSION_TIMEOUT = 1800  # 30 minutes
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SESSION_DB = os.path.join(BASE_DIR, 'sessions.db')
+SESSION_FILE = os.path.join(BASE_DIR, 'sessions.json')  # seeds an empty store; rewritten on every touch
+
+_store = None
+_store_lock = threading.Lock()
 
 # Utility functions
 
@@ -30,11 +36,7 @@ def safe_file_read(file_path):
 
 def calculate_entropy(data):
     """Calculate the entropy of a string of data."""
-    if len(data) == 0:
-        return 0
-    probabilities = [float(data.count(x)) / len(data) for x in set(data)]
-    entropy = -sum(p * math.log2(p) for p in probabilities)
-    return entropy
+    return shannon_entropy(data)
 
 
 def setup_logging(log_file_path):
@@ -44,6 +46,27 @@ def setup_logging(log_file_path):
                         format='%(asctime)s %(levelname)s:%(message)s')
 
 
+def _session_store():
+    """The process-wide SessionStore, created (and seeded from a legacy sessions.json) on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = SessionStore(SESSION_DB, json_path=SESSION_FILE)
+            if not len(store) and os.path.exists(SESSION_FILE):
+                store.import_json(SESSION_FILE)
+            _store = store
+        return _store
+
+
+def close_session_store():
+    """Closes the session store's connections; the next call reopens it."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+
 def manage_session(session_id, timeout=DEFAULT_SESSION_TIMEOUT):
     """
     Manage a user session given a session ID.
@@ -58,61 +81,6 @@ def manage_session(session_id, timeout=DEFAULT_SESSION_TIMEOUT):
     if not session_id or not isinstance(session_id, str):
         raise ValueError("Invalid session_id provided.")
 
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    session_file = os.path.join(base_dir, 'sessions.json')
-
-    # Atomic create/open with locking using low-level OS flags
-    # O_CREAT | O_RDWR ensures file exists and is open for read/write without race conditions
-    fd = os.open(session_file, os.O_RDWR | os.O_CREAT, 0o644)
-
-    with os.fdopen(fd, 'r+') as file:
-        try:
-            # Exclusive lock to prevent race conditions
-            fcntl.flock(file, fcntl.LOCK_EX)
-
-            # Read and parse
-            try:
-                content = file.read()
-                sessions = json.loads(content) if content else {}
-            except json.JSONDecodeError:
-                # Handle corrupt file by resetting or logging
-                logging.error("Corrupt session file. Resetting.")
-                sessions = {}
-
-            current_time = time.time()
-
-            # Garbage Collection: Remove expired sessions
-            sessions_to_remove = []
-            for sid, data in sessions.items():
-                session_timeout = data.get('timeout', DEFAULT_SESSION_TIMEOUT)
-                if current_time - data.get('last_accessed', 0) > session_timeout:
-                    sessions_to_remove.append(sid)
-
-            for sid in sessions_to_remove:
-                del sessions[sid]
-
-            # Handle current session
-            if session_id in sessions:
-                # Update existing session
-                sessions[session_id]['last_accessed'] = current_time
-                sessions[session_id]['status'] = 'active'
-                sessions[session_id]['timeout'] = timeout
-            else:
-                # Create new session
-                sessions[session_id] = {
-                    'created_at': current_time,
-                    'last_accessed': current_time,
-                    'status': 'active',
-                    'timeout': timeout
-                }
-
-            # Write back
-            file.seek(0)
-            json.dump(sessions, file, indent=4)
-            file.truncate()
-
-            return sessions[session_id]
-
-        finally:
-            # Always unlock
-            fcntl.flock(file, fcntl.LOCK_UN)
+    # One indexed row upsert plus a bounded sweep of expired sessions,
+    # in a single transaction that also serializes other processes.
+    return _session_store().touch(session_id, timeout)